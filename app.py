@@ -1,10 +1,31 @@
 import os
-import cv2
+import sys
 import time
-import customtkinter as ctk
-from tkinter import messagebox
-from PIL import Image
+STARTUP_TIME = time.perf_counter()  # acuan --profile-startup, sebelum import berat
+import cv2
+import json
+import math
+import mmap
+import queue
+import hashlib
+import sqlite3
+import shutil
+import argparse
+import itertools
+import threading
+import numpy as np
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing import Pool
 from datetime import datetime
+from inference.detect import MODEL_PATH, InferenceWorker, YoloDetector, draw_detections
+from inference.checklist import PackChecklist, describe_event
+
+try:
+    # Opsional: encoder JPEG lebih cepat (pip install PyTurboJPEG + libjpeg-turbo)
+    from turbojpeg import TurboJPEG
+except ImportError:
+    TurboJPEG = None
 
 # ---------------------------------------------------
 # --------------- Konfigurasi Awal ------------------
@@ -21,12 +42,2273 @@ RESOLUTIONS = {
 CANVAS_WIDTH = 640
 CANVAS_HEIGHT = 480
 
-# Pastikan folder penyimpanan ada
-os.makedirs(SAVE_DIR, exist_ok=True)
+# Cache hasil deteksi kamera (dipakai ulang saat startup)
+CACHE_DIR = ".cache"
+CAMERA_CACHE_FILE = os.path.join(CACHE_DIR, "cameras.json")
+CAMERA_CACHE_TTL = 24 * 60 * 60  # detik
+MAX_CAMERAS_TESTED = 5
+CAMERA_REOPEN_DELAY = 2.0  # detik antar percobaan membuka ulang kamera yang terputus
+
+# Profil capture: kandidat FOURCC dicoba berurutan, hasil terbaik disimpan per kamera/resolusi
+CAPTURE_FPS = 30
+CAPTURE_BUFFER_SIZE = 1
+FOURCC_CANDIDATES = ["MJPG", "YUYV"]  # FOURCC awal driver ikut dicoba di akhir
+PROFILE_SAMPLE_FRAMES = 10
+CAPTURE_PROFILES_FILE = os.path.join(CACHE_DIR, "capture_profiles.json")
+
+# Jumlah frame terakhir yang disimpan di ring buffer grabber
+FRAME_BUFFER_SIZE = 4
+
+# Format simpan gambar: opsi kualitas/kompresi dan rentangnya
+IMAGE_FORMATS = {
+    "jpg": {"ext": ".jpg", "option": "Quality", "default": 95, "range": (0, 100)},
+    "png": {"ext": ".png", "option": "Compression", "default": 3, "range": (0, 9)},
+    "webp": {"ext": ".webp", "option": "Quality", "default": 90, "range": (1, 100)},
+}
+
+# Manifest capture (append-only, SQLite) di samping gambar
+MANIFEST_FILE = os.path.join(SAVE_DIR, "manifest.sqlite")
+MANIFEST_BATCH = 50          # commit tiap N baris ...
+MANIFEST_FLUSH_INTERVAL = 1  # ... atau tiap N detik
+
+# Deduplikasi: frame dengan jarak Hamming dHash <= threshold dianggap duplikat
+DEDUP_THRESHOLD = 6
+DEDUP_MAX_CONSECUTIVE = 100   # burst berhenti jika scene tidak berubah selama N frame berturut-turut
+DEDUP_DIR = os.path.join(os.path.dirname(SAVE_DIR), "duplicates")
+
+# Capture berbasis trigger: simpan hanya saat scene berubah
+TRIGGER_SIZE = (64, 48)        # frame grayscale kecil untuk deteksi perubahan
+TRIGGER_ALPHA = 0.05           # laju update background (running average)
+TRIGGER_PIXEL_DIFF = 25        # selisih intensitas minimum per piksel
+TRIGGER_THRESHOLD = 0.02       # fraksi piksel berubah untuk memicu capture
+TRIGGER_COOLDOWN = 1.0         # detik minimum antar capture
+TRIGGER_MAX_INTERVAL = 300     # tetap simpan satu frame tiap N detik (0 = nonaktif)
+
+# Spool: frame mentah ditulis ke ring file memory-mapped, di-encode belakangan
+SPOOL_FILE = os.path.join(SAVE_DIR, ".spool", "frames.spool")
+SPOOL_SIZE_MB = 1024
+
+# Galeri: thumbnail disimpan di cache berdasarkan isi file (sha1)
+THUMB_SIZE = (128, 96)
+THUMB_CACHE_DIR = os.path.join(CACHE_DIR, "thumbs")
+THUMB_MEMORY_ITEMS = 512     # thumbnail yang disimpan di memori (LRU)
+THUMB_WORKERS = 4
+GALLERY_CELL = (140, 108)    # ukuran sel grid galeri (px)
+
+# Instrumentasi: jumlah sampel per tahap (jendela bergulir) dan batas event trace
+PROFILER_WINDOW = 600
+PROFILER_TRACE_LIMIT = 200_000
+PROFILER_BINS_MS = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, float("inf")]
+
+# Sumber default untuk `bench` (tanpa kamera)
+BENCH_SOURCE = "synthetic:1280x720@0"
+
+# Writer pool untuk menyimpan gambar di background
+WRITER_WORKERS = 2
+WRITER_QUEUE_SIZE = 32
+WRITER_POLICIES = ["block", "drop-oldest", "spill"]
+WRITER_POLICY = "spill"
+SPILL_DIR = os.path.join(SAVE_DIR, ".spill")
 
 # ==== CustomTkinter Config ====
-ctk.set_appearance_mode("light")
-ctk.set_default_color_theme("blue")
+# Modul GUI (customtkinter, tkinter, PIL) baru dimuat lewat load_gui_modules(),
+# sehingga perintah headless/benchmark tidak ikut menanggung waktu importnya.
+ctk = messagebox = Image = ImageTk = None
+
+
+def load_gui_modules():
+    global ctk, messagebox, Image, ImageTk
+    if ctk is None:
+        import customtkinter
+        from tkinter import messagebox as tk_messagebox
+        from PIL import Image as pil_image, ImageTk as pil_image_tk
+        customtkinter.set_appearance_mode("light")
+        customtkinter.set_default_color_theme("blue")
+        ctk, messagebox, Image, ImageTk = customtkinter, tk_messagebox, pil_image, pil_image_tk
+
+
+# ---------------------------------------------------
+# ------------------ Instrumentasi ------------------
+# ---------------------------------------------------
+class _NullSpan:
+    """Span kosong yang dipakai ulang saat profiler mati (tanpa alokasi/timer)."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Profiler:
+    """Timer per tahap hot path dengan histogram bergulir, counter, gauge, dan trace.
+
+    Pemakaian: `with PROFILER.span("cap.read"): ...`. Saat `enabled` False,
+    `span()` mengembalikan NULL_SPAN dan `count()`/`gauge()` langsung kembali,
+    sehingga biaya di hot path hanya satu pengecekan atribut.
+    """
+    def __init__(self, enabled=False, window=PROFILER_WINDOW, trace_limit=PROFILER_TRACE_LIMIT):
+        self.enabled = enabled
+        self.tracing = False
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.totals = {}
+        self.counters = {}
+        self.gauges = {}
+        self.events = deque(maxlen=trace_limit)
+        self.origin = time.perf_counter()
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, start, end):
+        with self.lock:
+            window = self.samples.get(name)
+            if window is None:
+                window = self.samples[name] = deque(maxlen=self.window)
+            window.append(end - start)
+            self.totals[name] = self.totals.get(name, 0) + 1
+            if self.tracing:
+                self.events.append((name, start, end - start, threading.get_ident()))
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.gauges[name] = value
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.totals.clear()
+            self.counters.clear()
+            self.gauges.clear()
+            self.events.clear()
+            self.origin = time.perf_counter()
+
+    def histogram(self, name, bins=PROFILER_BINS_MS):
+        """Jumlah sampel per bucket (ms) dari jendela bergulir satu tahap."""
+        with self.lock:
+            values = np.asarray(self.samples.get(name, ()), dtype=np.float64) * 1000
+        counts, _ = np.histogram(values, bins=bins)
+        return counts.tolist()
+
+    def summary(self):
+        with self.lock:
+            samples = {name: list(window) for name, window in self.samples.items() if window}
+            totals = dict(self.totals)
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        stages = {}
+        for name, values in samples.items():
+            stages[name] = dict(summarize_timings(values), count=totals[name], histogram=self.histogram(name))
+        return {"stages": stages, "counters": counters, "gauges": gauges}
+
+    def overlay_text(self):
+        """Ringkasan singkat untuk panel info (p50/p99 per tahap)."""
+        summary = self.summary()
+        lines = [
+            f"{name}: {stat['p50_ms']:.1f}/{stat['p99_ms']:.1f} ms"
+            for name, stat in sorted(summary["stages"].items())
+        ]
+        lines += [f"{name}: {value}" for name, value in sorted(summary["counters"].items())]
+        lines += [f"{name}: {value}" for name, value in sorted(summary["gauges"].items())]
+        return "\n".join(lines) or "Belum ada data"
+
+    def export_trace(self, path):
+        """Simpan event ke format Chrome trace (chrome://tracing / Perfetto) + ringkasan."""
+        with self.lock:
+            events = list(self.events)
+            origin = self.origin
+        pid = os.getpid()
+        trace = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": round((start - origin) * 1e6, 1),
+                "dur": round(duration * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, duration, tid in events
+        ]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "otherData": self.summary()}, f)
+        return len(trace)
+
+
+# Profiler global; diaktifkan lewat --profile atau dari panel GUI
+PROFILER = Profiler()
+
+
+class StartupTimer:
+    """Waktu startup GUI (ms sejak app.py mulai diimport) untuk --profile-startup."""
+    def __init__(self, start=STARTUP_TIME):
+        self.start = start
+        self.marks = {}
+
+    def mark(self, name):
+        # Hanya kejadian pertama yang dicatat
+        self.marks.setdefault(name, (time.perf_counter() - self.start) * 1000)
+
+    def report(self):
+        return " | ".join(f"{name}: {ms:.0f} ms" for name, ms in self.marks.items())
+
+
+STARTUP = StartupTimer()
+
+
+# ---------------------------------------------------
+# ----------------- Pipeline Kamera -----------------
+# ---------------------------------------------------
+def open_camera(camera_id):
+    """Buka kamera dengan backend yang dipakai aplikasi (DirectShow hanya ada di Windows)."""
+    backend = cv2.CAP_DSHOW if sys.platform == "win32" else cv2.CAP_ANY
+    return cv2.VideoCapture(camera_id, backend)
+
+
+def probe_camera(camera_id):
+    """Cek apakah kamera bisa dibuka (dipanggil dari thread background)."""
+    cap = open_camera(camera_id)
+    try:
+        return cap.isOpened()
+    finally:
+        cap.release()
+
+
+def release_camera(cap, grabber=None):
+    """Hentikan grabber lalu lepaskan kamera (bisa lambat, jalankan off-thread)."""
+    if grabber is not None and not grabber.stop() and grabber.defer_release():
+        return  # thread pembaca masih di dalam cap.read(); kamera dilepas olehnya
+    if cap is not None and cap.isOpened():
+        cap.release()
+
+
+def load_camera_cache(path=CAMERA_CACHE_FILE):
+    """Kembalikan (daftar ID kamera, masih segar?) dari cache di disk."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        cameras = [str(c) for c in data["cameras"]]
+        fresh = time.time() - float(data["updated"]) < CAMERA_CACHE_TTL
+        return cameras, fresh
+    except (OSError, ValueError, KeyError, TypeError):
+        return [], False
+
+
+def save_camera_cache(cameras, path=CAMERA_CACHE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"cameras": sorted(cameras, key=int), "updated": time.time()}, f)
+
+
+class CameraDiscovery:
+    """Deteksi kamera secara paralel di background dengan cache di disk.
+
+    Cache yang masih segar langsung dipakai tanpa probing. Jika cache basi
+    atau tidak ada, semua indeks diuji paralel dan `on_found(camera_id)`
+    dipanggil begitu tiap kamera menjawab. Kamera dari cache yang ternyata
+    gagal dibuka dihapus lewat `forget()` (revalidasi lazy).
+
+    Kamera yang sedang dipakai aplikasi (`in_use`) tidak di-probe: dengan
+    DirectShow membuka perangkat yang sibuk bisa gagal, padahal kameranya ada.
+    """
+    def __init__(self, max_tested=MAX_CAMERAS_TESTED, cache_path=CAMERA_CACHE_FILE):
+        self.max_tested = max_tested
+        self.cache_path = cache_path
+        self.cameras, self.fresh = load_camera_cache(cache_path)
+        self.lock = threading.Lock()
+
+    def start(self, on_found=None, on_done=None, in_use=()):
+        """Mulai probing background jika cache tidak segar."""
+        if self.fresh:
+            if on_done is not None:
+                on_done(list(self.cameras))
+            return
+        threading.Thread(
+            target=self._probe_all, args=(on_found, on_done, {str(c) for c in in_use}),
+            name="CameraDiscovery", daemon=True
+        ).start()
+
+    def _probe_all(self, on_found, on_done, in_use):
+        # Kamera yang sedang terbuka sudah terbukti ada; tidak perlu (dan tidak aman) di-probe
+        found = sorted(in_use, key=int)
+        with ThreadPoolExecutor(max_workers=self.max_tested) as pool:
+            futures = {
+                pool.submit(probe_camera, i): str(i)
+                for i in range(self.max_tested) if str(i) not in in_use
+            }
+            for future in as_completed(futures):
+                try:
+                    ok = future.result()
+                except Exception:
+                    ok = False
+                if ok:
+                    found.append(futures[future])
+                    if on_found is not None:
+                        on_found(futures[future])
+
+        with self.lock:
+            self.cameras = sorted(found, key=int)
+            self.fresh = True
+            save_camera_cache(self.cameras, self.cache_path)
+        if on_done is not None:
+            on_done(list(self.cameras))
+
+    def forget(self, camera_id):
+        """Hapus kamera yang gagal dibuka dari cache."""
+        with self.lock:
+            camera_id = str(camera_id)
+            if camera_id in self.cameras:
+                self.cameras.remove(camera_id)
+                save_camera_cache(self.cameras, self.cache_path)
+
+
+def load_capture_profiles(path=CAPTURE_PROFILES_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_capture_profiles(profiles, path=CAPTURE_PROFILES_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2)
+
+
+# Profil terbaik per "kamera@WxH", format mirip RESOLUTIONS
+CAPTURE_PROFILES = load_capture_profiles()
+
+
+def profile_key(camera_id, width, height):
+    return f"{camera_id}@{width}x{height}"
+
+
+def fourcc_to_str(value):
+    value = int(value)
+    text = "".join(chr((value >> 8 * i) & 0xFF) for i in range(4)).strip("\x00")
+    return text or "?"
+
+
+def apply_capture_profile(cap, width, height, fourcc=None, fps=CAPTURE_FPS, buffersize=CAPTURE_BUFFER_SIZE):
+    """Set FOURCC, resolusi, fps, dan ukuran buffer driver (FOURCC harus lebih dulu)."""
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffersize:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffersize)
+
+
+def measure_capture(cap, sample_frames=PROFILE_SAMPLE_FRAMES, warmup=3, on_frame=None):
+    """Ukur fps dan waktu baca nyata dengan membaca beberapa frame.
+
+    `on_frame(frame)` menerima setiap frame yang terbaca (misal untuk tetap mengisi preview).
+    """
+    for _ in range(warmup):
+        ret, frame = cap.read()
+        if ret and on_frame is not None:
+            on_frame(frame)
+    read_times = []
+    frame = None
+    start = time.perf_counter()
+    for _ in range(sample_frames):
+        t = time.perf_counter()
+        ret, frame = cap.read()
+        read_times.append(time.perf_counter() - t)
+        if not ret:
+            return None
+        if on_frame is not None:
+            on_frame(frame)
+    elapsed = time.perf_counter() - start
+    return {
+        "measured_fps": round(sample_frames / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": round(float(np.median(read_times)) * 1000, 2),
+        "width": frame.shape[1],
+        "height": frame.shape[0],
+    }
+
+
+def negotiate_capture_profile(cap, width, height, fps=CAPTURE_FPS, buffersize=CAPTURE_BUFFER_SIZE,
+                              on_frame=None, on_progress=None):
+    """Coba tiap FOURCC kandidat, pilih yang menghasilkan resolusi benar dengan fps tertinggi.
+
+    FOURCC bawaan driver (dibaca sebelum negosiasi) ikut dicoba jika belum ada di kandidat.
+    `on_progress(fourcc, nomor, total)` dipanggil sebelum tiap kandidat diukur.
+    """
+    candidates = list(FOURCC_CANDIDATES)
+    default_fourcc = fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC))
+    # Hanya kode 4 karakter yang bisa di-set ulang (sebagian backend melaporkan angka format)
+    if len(default_fourcc) == 4 and default_fourcc not in candidates:
+        candidates.append(default_fourcc)
+
+    best, best_score = None, None
+    for i, fourcc in enumerate(candidates, 1):
+        if on_progress is not None:
+            on_progress(fourcc, i, len(candidates))
+        apply_capture_profile(cap, width, height, fourcc, fps, buffersize)
+        measured = measure_capture(cap, on_frame=on_frame)
+        if measured is None:
+            continue
+        size_ok = (measured["width"], measured["height"]) == (width, height)
+        score = (size_ok, measured["measured_fps"])
+        if best_score is None or score > best_score:
+            best_score = score
+            best = dict(
+                measured,
+                fourcc=fourcc,
+                actual_fourcc=fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+                fps=fps,
+                buffersize=buffersize,
+            )
+
+    if best is not None:
+        apply_capture_profile(cap, width, height, best["fourcc"], fps, buffersize)
+    return best
+
+
+def configure_capture(cap, camera_id, width, height, renegotiate=False, on_frame=None, on_progress=None):
+    """Terapkan profil tersimpan untuk kamera/resolusi ini, atau negosiasikan yang baru.
+
+    Harus dipanggil saat tidak ada thread lain yang membaca `cap`
+    (sebelum grabber dijalankan, atau sambil memegang `grabber.cap_lock`;
+    gunakan `on_frame=grabber.feed` agar preview tetap berjalan selama negosiasi).
+    """
+    if isinstance(cap, FrameSource):
+        # Sumber sintetis/replay: cukup set resolusi (fps mengikuti spec sumber)
+        apply_capture_profile(cap, width, height, fps=None, buffersize=None)
+        return None
+
+    key = profile_key(camera_id, width, height)
+    profile = CAPTURE_PROFILES.get(key)
+    if profile and not renegotiate:
+        apply_capture_profile(cap, width, height, profile["fourcc"], profile["fps"], profile["buffersize"])
+        return profile
+
+    profile = negotiate_capture_profile(cap, width, height, on_frame=on_frame, on_progress=on_progress)
+    if profile is None:
+        apply_capture_profile(cap, width, height)
+        return None
+    CAPTURE_PROFILES[key] = profile
+    save_capture_profiles(CAPTURE_PROFILES)
+    return profile
+
+
+def describe_profile(profile):
+    if profile is None:
+        return "default"
+    return f"{profile['actual_fourcc']} {profile['width']}x{profile['height']} @ {profile['measured_fps']:.1f} fps"
+
+
+def process_frame(frame, mode="Default", brightness=0):
+    """Proses frame: mirror dan brightness (dipakai GUI dan mode headless)."""
+    # Mirror jika dipilih
+    if mode == "Mirror":
+        frame = cv2.flip(frame, 1)
+
+    # Brightness adjustment
+    return cv2.convertScaleAbs(frame, alpha=1.0, beta=brightness)
+
+
+class FramePreprocessor:
+    """Versi `process_frame` tanpa alokasi per frame untuk preview.
+
+    - brightness memakai LUT 256 entri yang di-cache per nilai (cv2.LUT)
+    - flip dan konversi warna ditulis ke buffer yang sudah dialokasikan
+    - resize dilewati jika ukuran frame sudah sama dengan target
+    - hasil BGR ditulis bergantian ke dua buffer (double buffer), sehingga
+      frame sebelumnya tetap utuh selama satu tick tanpa `.copy()`
+    """
+    def __init__(self, size=(CANVAS_WIDTH, CANVAS_HEIGHT)):
+        self.size = size
+        self.luts = {}
+        self.resized = None
+        self.buffers = [None, None]
+        self.index = 0
+        self.rgb = None
+
+    def lut(self, brightness):
+        table = self.luts.get(brightness)
+        if table is None:
+            # Dibangun dengan convertScaleAbs agar hasilnya identik dengan process_frame
+            table = cv2.convertScaleAbs(np.arange(256, dtype=np.uint8), alpha=1.0, beta=brightness)
+            self.luts[brightness] = table
+        return table
+
+    @staticmethod
+    def _ensure(buffer, shape):
+        if buffer is None or buffer.shape != shape:
+            return np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def process(self, frame, mode="Default", brightness=0):
+        """Kembalikan (bgr, rgb). Keduanya buffer internal; salin jika perlu disimpan lama."""
+        width, height = self.size
+        if frame.shape[1] == width and frame.shape[0] == height:
+            src = frame
+        else:
+            self.resized = self._ensure(self.resized, (height, width, frame.shape[2]))
+            src = cv2.resize(frame, (width, height), dst=self.resized)
+
+        self.index ^= 1
+        out = self.buffers[self.index] = self._ensure(self.buffers[self.index], src.shape)
+        lut = self.lut(brightness)
+        if mode == "Mirror":
+            cv2.flip(src, 1, dst=out)
+            cv2.LUT(out, lut, dst=out)
+        else:
+            cv2.LUT(src, lut, dst=out)
+
+        self.rgb = self._ensure(self.rgb, out.shape)
+        cv2.cvtColor(out, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return out, self.rgb
+
+    def process_native(self, frame, mode="Default", brightness=0):
+        """Proses frame di resolusi asli untuk disimpan (array baru, aman diserahkan ke writer)."""
+        out = cv2.LUT(frame, self.lut(brightness))
+        if mode == "Mirror":
+            cv2.flip(out, 1, dst=out)
+        return out
+
+
+class MotionTrigger:
+    """Deteksi perubahan scene dengan background running-average pada frame mini.
+
+    `update(frame, now)` mengembalikan "motion" jika fraksi piksel yang berubah
+    melewati `threshold`, "interval" jika sudah `max_interval` detik tanpa
+    capture, atau None. Setelah trigger ada jeda `cooldown` detik. Frame pertama
+    hanya menjadi background awal (tidak memicu capture).
+    """
+    def __init__(self, threshold=TRIGGER_THRESHOLD, cooldown=TRIGGER_COOLDOWN,
+                 max_interval=TRIGGER_MAX_INTERVAL, alpha=TRIGGER_ALPHA, size=TRIGGER_SIZE):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_interval = max_interval
+        self.alpha = alpha
+        self.size = size
+        self.background = None
+        self.small = None
+        self.last_trigger = None
+        self.score = 0.0
+        self.frames = 0
+        self.triggers = 0
+
+    def update(self, frame, now=None):
+        now = time.time() if now is None else now
+        self.frames += 1
+        self.small = cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY) if self.small.ndim == 3 else self.small
+        if self.background is None:
+            # Frame pertama hanya menjadi background; interval dihitung sejak trigger aktif
+            self.background = gray.astype(np.float32)
+            self.last_trigger = now
+            return None
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        self.score = np.count_nonzero(diff > TRIGGER_PIXEL_DIFF) / diff.size
+        cv2.accumulateWeighted(gray, self.background, self.alpha)
+
+        if now - self.last_trigger < self.cooldown:
+            return None
+        if self.score >= self.threshold:
+            return self._fire(now, "motion")
+        if self.max_interval and now - self.last_trigger >= self.max_interval:
+            return self._fire(now, "interval")
+        return None
+
+    def _fire(self, now, reason):
+        self.last_trigger = now
+        self.triggers += 1
+        return reason
+
+    def stats(self):
+        return {"frames": self.frames, "triggers": self.triggers, "score": self.score}
+
+
+TimedFrame = namedtuple("TimedFrame", ["seq", "timestamp", "image"])
+
+
+class FrameGrabber:
+    """Thread pembaca kamera dengan ring buffer frame terbaru.
+
+    Thread ini satu-satunya yang memanggil `cap.read()`, sehingga pembacaan
+    kamera yang blocking tidak lagi menahan main loop Tk. Konsumen (preview,
+    capture_loop) mengambil frame lewat `latest()` atau `get_frame(seq)`.
+    """
+    def __init__(self, cap, buffer_size=FRAME_BUFFER_SIZE, max_failures=30):
+        self.cap = cap
+        self.buffer = deque(maxlen=buffer_size)
+        self.max_failures = max_failures
+        self.lock = threading.Lock()
+        self.cap_lock = threading.Lock()  # lindungi cap.read() vs cap.set()
+        self.new_frame = threading.Condition(self.lock)
+        self.thread = None
+        self.running = False
+        self.failed = False
+        self.exited = False
+        self.release_on_exit = False
+
+        # Statistik
+        self.seq = 0              # nomor frame terakhir yang diterima
+        self.last_consumed = 0    # nomor frame terakhir yang diambil konsumen
+        self.last_captured = 0    # nomor frame terakhir yang disimpan capture
+        self.dropped_frames = 0   # frame tertimpa sebelum sempat diambil
+        self.stale_reads = 0      # capture menyimpan frame yang sudah pernah disimpan
+        self.fps = 0.0            # fps kamera terukur (rata-rata eksponensial)
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        """Hentikan thread pembaca. Kembalikan False jika thread belum selesai dalam `timeout`."""
+        self.running = False
+        with self.new_frame:
+            self.new_frame.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                return False  # referensi disimpan: cap masih dipakai cap.read()
+            self.thread = None
+        return True
+
+    def defer_release(self):
+        """Minta thread pembaca melepas kamera saat keluar. False jika thread sudah keluar."""
+        with self.lock:
+            if self.exited:
+                return False
+            self.release_on_exit = True
+            return True
+
+    def set_property(self, prop, value):
+        """Atur properti kamera tanpa bentrok dengan thread pembaca."""
+        with self.cap_lock:
+            return self.cap.set(prop, value)
+
+    def _run(self):
+        failures = 0
+        while self.running:
+            with self.cap_lock, PROFILER.span("cap.read"):
+                ret, frame = self.cap.read()
+            if not ret:
+                failures += 1
+                PROFILER.count("read_failures")
+                if failures >= self.max_failures:
+                    self.failed = True
+                    break
+                time.sleep(0.01)
+                continue
+            failures = 0
+            self._push(frame, time.time())
+
+        with self.new_frame:
+            self.running = False
+            self.exited = True
+            release = self.release_on_exit
+            self.new_frame.notify_all()
+        if release:
+            self.cap.release()
+
+    def feed(self, frame):
+        """Masukkan frame yang dibaca pihak lain (pemegang `cap_lock`) ke buffer."""
+        self._push(frame, time.time())
+
+    def _push(self, frame, timestamp):
+        with self.new_frame:
+            # Frame paling lama akan tertimpa; hitung sebagai drop jika belum dibaca
+            if len(self.buffer) == self.buffer.maxlen and self.buffer[0].seq > self.last_consumed:
+                self.dropped_frames += 1
+                PROFILER.count("frames_dropped")
+            if self.buffer:
+                interval = timestamp - self.buffer[-1].timestamp
+                if interval > 0:
+                    instant = 1.0 / interval
+                    self.fps = instant if self.fps == 0 else 0.9 * self.fps + 0.1 * instant
+            self.seq += 1
+            self.buffer.append(TimedFrame(self.seq, timestamp, frame))
+            self.new_frame.notify_all()
+
+    def latest(self):
+        """Ambil frame terbaru (bisa sama dengan panggilan sebelumnya)."""
+        with self.lock:
+            if not self.buffer:
+                return None
+            item = self.buffer[-1]
+            self.last_consumed = max(self.last_consumed, item.seq)
+            return item
+
+    def mark_captured(self, seq):
+        """Catat frame `seq` disimpan capture; dihitung stale jika frame itu sudah pernah disimpan."""
+        with self.lock:
+            if seq <= self.last_captured:
+                self.stale_reads += 1
+                PROFILER.count("stale_reads")
+            self.last_captured = max(self.last_captured, seq)
+
+    def get_frame(self, seq):
+        """Ambil frame nomor `seq` jika masih ada di buffer."""
+        with self.lock:
+            for item in self.buffer:
+                if item.seq == seq:
+                    self.last_consumed = max(self.last_consumed, item.seq)
+                    return item
+        return None
+
+    def wait_for(self, after_seq, timeout=1.0):
+        """Tunggu sampai ada frame dengan nomor > `after_seq` (untuk pemanggil non-UI)."""
+        deadline = time.time() + timeout
+        with self.new_frame:
+            while self.running and (not self.buffer or self.buffer[-1].seq <= after_seq):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self.new_frame.wait(remaining)
+            if not self.buffer or self.buffer[-1].seq <= after_seq:
+                return None
+            item = self.buffer[-1]
+            self.last_consumed = max(self.last_consumed, item.seq)
+            return item
+
+    def stats(self):
+        with self.lock:
+            return {
+                "frames": self.seq,
+                "dropped": self.dropped_frames,
+                "stale": self.stale_reads,
+                "fps": self.fps,
+            }
+
+
+FrameSet = namedtuple("FrameSet", ["seq", "timestamp", "skew", "frames"])
+
+
+class MultiCameraGrabber:
+    """Grabber sinkron untuk beberapa kamera sekaligus.
+
+    Tiap kamera punya thread sendiri. Semua thread menunggu di barrier lalu
+    memanggil `cap.grab()` bersamaan (cepat, tanpa decode) sehingga selisih
+    waktu antar kamera kecil; `retrieve()` (decode) hanya dilakukan tiap
+    `period` detik (0 = setiap siklus), siklus lain cukup grab agar buffer
+    driver tetap kosong. Setelah semua kamera selesai, frame digabung menjadi
+    satu FrameSet dengan nomor urut bersama. Set yang tidak lengkap (ada kamera
+    gagal) dibuang. Exception di salah satu thread membatalkan barrier dan
+    disimpan di `error`.
+    """
+    def __init__(self, caps, buffer_size=FRAME_BUFFER_SIZE, max_failures=30, period=0.0):
+        self.caps = dict(caps)  # camera_id -> cap
+        self.period = period
+        self.next_retrieve = 0.0
+        self.retrieve_now = True
+        self.buffer = deque(maxlen=buffer_size)
+        self.max_failures = max_failures
+        self.lock = threading.Lock()
+        self.new_set = threading.Condition(self.lock)
+        self.pending = {}
+        self.failures = {cid: 0 for cid in self.caps}
+        self.barrier = threading.Barrier(len(self.caps), action=self._plan)
+        self.assembled = threading.Barrier(len(self.caps), action=self._assemble)
+        self.threads = []
+        self.running = False
+        self.failed = False
+        self.error = None
+
+        # Statistik
+        self.seq = 0
+        self.incomplete = 0
+        self.fps = 0.0
+        self.camera_fps = {cid: 0.0 for cid in self.caps}
+        self.last_grab = {}
+        self.skew_avg = 0.0
+        self.skew_max = 0.0
+
+    def start(self):
+        if not self.threads:
+            self.running = True
+            self.threads = [
+                threading.Thread(target=self._run, args=(cid,), name=f"MultiGrabber-{cid}", daemon=True)
+                for cid in self.caps
+            ]
+            for t in self.threads:
+                t.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        self.barrier.abort()
+        self.assembled.abort()
+        with self.new_set:
+            self.new_set.notify_all()
+        for t in self.threads:
+            t.join(timeout)
+        self.threads = []
+
+    def _run(self, camera_id):
+        cap = self.caps[camera_id]
+        try:
+            while self.running:
+                self.barrier.wait()
+                with PROFILER.span(f"cap.grab.{camera_id}"):
+                    ok = cap.grab()
+                timestamp = time.time()
+                frame = None
+                if ok and self.retrieve_now:
+                    with PROFILER.span(f"cap.retrieve.{camera_id}"):
+                        ok, frame = cap.retrieve()
+                self.pending[camera_id] = (timestamp, ok, frame)
+                self.assembled.wait()
+        except threading.BrokenBarrierError:
+            pass
+        except Exception as e:
+            # Tanpa abort, kamera lain menunggu di barrier selamanya
+            with self.new_set:
+                self.error = self.error or RuntimeError(f"Kamera {camera_id}: {e}")
+                self.failed = True
+                self.running = False
+                self.new_set.notify_all()
+            self.barrier.abort()
+            self.assembled.abort()
+
+    def _plan(self):
+        """Dipanggil sekali per siklus sebelum grab: tentukan apakah frame siklus ini di-decode."""
+        now = time.perf_counter()
+        self.retrieve_now = not self.period or now >= self.next_retrieve
+        if self.retrieve_now and self.period:
+            # Jadwal absolut; jika tertinggal lebih dari satu periode, mulai lagi dari sekarang
+            base = self.next_retrieve if self.next_retrieve > now - self.period else now
+            self.next_retrieve = base + self.period
+
+    def _assemble(self):
+        """Dipanggil sekali per siklus (oleh thread terakhir yang tiba di barrier)."""
+        frames = {}
+        stamps = []
+        for cid, (timestamp, ok, frame) in self.pending.items():
+            if not ok:
+                self.failures[cid] += 1
+                if self.failures[cid] >= self.max_failures:
+                    self.failed = True
+                    self.running = False
+                continue
+            self.failures[cid] = 0
+            previous = self.last_grab.get(cid)
+            if previous is not None and timestamp > previous:
+                instant = 1.0 / (timestamp - previous)
+                fps = self.camera_fps[cid]
+                self.camera_fps[cid] = instant if fps == 0 else 0.9 * fps + 0.1 * instant
+            self.last_grab[cid] = timestamp
+            frames[cid] = frame
+            stamps.append(timestamp)
+        self.pending = {}
+
+        if not self.retrieve_now:
+            return  # siklus grab saja, tidak ada set yang disimpan
+        if len(frames) < len(self.caps):
+            self.incomplete += 1
+            PROFILER.count("multi_incomplete")
+            return
+
+        skew = max(stamps) - min(stamps)
+        timestamp = min(stamps)
+        PROFILER.gauge("multi_skew_ms", skew * 1000)
+        with self.new_set:
+            if self.buffer:
+                interval = timestamp - self.buffer[-1].timestamp
+                if interval > 0:
+                    instant = 1.0 / interval
+                    self.fps = instant if self.fps == 0 else 0.9 * self.fps + 0.1 * instant
+            self.skew_avg = skew if self.seq == 0 else 0.9 * self.skew_avg + 0.1 * skew
+            self.skew_max = max(self.skew_max, skew)
+            self.seq += 1
+            self.buffer.append(FrameSet(self.seq, timestamp, skew, frames))
+            self.new_set.notify_all()
+
+    def wait_for(self, after_seq, timeout=1.0):
+        """Tunggu FrameSet dengan nomor > `after_seq`."""
+        deadline = time.time() + timeout
+        with self.new_set:
+            while self.running and (not self.buffer or self.buffer[-1].seq <= after_seq):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self.new_set.wait(remaining)
+            if not self.buffer or self.buffer[-1].seq <= after_seq:
+                return None
+            return self.buffer[-1]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "sets": self.seq,
+                "incomplete": self.incomplete,
+                "fps": self.fps,
+                "camera_fps": dict(self.camera_fps),
+                "skew_avg_ms": self.skew_avg * 1000,
+                "skew_max_ms": self.skew_max * 1000,
+            }
+
+
+class PreviewRenderer:
+    """Permukaan tampilan preview yang dipakai ulang.
+
+    Satu PhotoImage dibuat per ukuran canvas, lalu piksel frame berikutnya
+    ditulis ke dalamnya (`paste`) sehingga tidak ada objek image Tk baru
+    per frame.
+    """
+    def __init__(self, label):
+        self.label = label
+        self.photo = None
+        self.size = None
+        self.rendered = 0
+        self.skipped = 0
+
+    def render(self, frame_rgb):
+        height, width = frame_rgb.shape[:2]
+        img = Image.fromarray(frame_rgb)
+        if self.photo is None or self.size != (width, height):
+            self.photo = ImageTk.PhotoImage(img)
+            self.size = (width, height)
+            self.label.configure(image=self.photo)
+            self.label.image = self.photo
+        else:
+            self.photo.paste(img)
+        self.rendered += 1
+
+    def skip(self):
+        """Catat tick tanpa frame baru (tidak ada yang digambar)."""
+        self.skipped += 1
+
+    def next_delay_ms(self, camera_fps, min_ms=5, max_ms=50):
+        """Interval polling: setengah periode kamera, dibatasi min/max."""
+        if camera_fps <= 0:
+            return max_ms
+        return int(min(max_ms, max(min_ms, 500.0 / camera_fps)))
+
+
+# ---------------------------------------------------
+# ------------------ Sumber Frame -------------------
+# ---------------------------------------------------
+class FrameSource:
+    """Basis sumber frame non-kamera dengan antarmuka mirip cv2.VideoCapture.
+
+    Cukup `read`, `grab`/`retrieve`, `set`, `get`, `isOpened`, dan `release`,
+    sehingga bisa dipakai FrameGrabber, mode headless, dan benchmark tanpa webcam.
+    Frame diberikan sesuai `fps` (0 = secepatnya) dengan jadwal absolut.
+    """
+    def __init__(self, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, fps=CAPTURE_FPS):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.opened = True
+        self.frame_index = 0
+        self.start_time = None
+        self.grabbed = None
+
+    def isOpened(self):
+        return self.opened
+
+    def release(self):
+        self.opened = False
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = float(value)
+        else:
+            return False
+        return True
+
+    def get(self, prop):
+        return {
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+            cv2.CAP_PROP_FPS: self.fps,
+        }.get(prop, 0)
+
+    def _wait_next_frame(self):
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+        if self.fps > 0:
+            target = self.start_time + self.frame_index / self.fps
+            if target > now:
+                time.sleep(target - now)
+            elif now - target > 1.0:
+                # Terlalu tertinggal (misal setelah pause): mulai jadwal baru
+                self.start_time, self.frame_index = now, 0
+        self.frame_index += 1
+
+    def read(self, image=None):
+        if not self.opened:
+            return False, None
+        self._wait_next_frame()
+        frame = self.next_frame()
+        if frame is not None and image is not None and image.shape == frame.shape:
+            # Seperti cv2.VideoCapture.read(image): isi buffer milik pemanggil
+            np.copyto(image, frame)
+            frame = image
+        return frame is not None, frame
+
+    def grab(self):
+        ret, self.grabbed = self.read()
+        return ret
+
+    def retrieve(self):
+        frame, self.grabbed = self.grabbed, None
+        return frame is not None, frame
+
+    def next_frame(self):
+        raise NotImplementedError
+
+
+class SyntheticSource(FrameSource):
+    """Frame sintetis: gradien bergeser + kotak bergerak, resolusi dan fps bisa diatur."""
+    def __init__(self, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, fps=CAPTURE_FPS):
+        super().__init__(width, height, fps)
+        self.base = None
+
+    def next_frame(self):
+        if self.base is None or self.base.shape[:2] != (self.height, self.width):
+            x = np.linspace(0, 255, self.width, dtype=np.float32)
+            y = np.linspace(0, 255, self.height, dtype=np.float32)[:, None]
+            self.base = np.dstack([
+                np.broadcast_to(x, (self.height, self.width)),
+                np.broadcast_to(y, (self.height, self.width)),
+                np.full((self.height, self.width), 128, dtype=np.float32),
+            ]).astype(np.uint8)
+
+        i = self.frame_index
+        frame = np.roll(self.base, i * 4, axis=1)
+        size = max(8, min(self.width, self.height) // 6)
+        cx = (i * 7) % max(1, self.width - size)
+        cy = (i * 5) % max(1, self.height - size)
+        frame[cy:cy + size, cx:cx + size] = 255
+        return frame
+
+
+class ReplaySource(FrameSource):
+    """Putar ulang file video atau folder gambar (misal dataset/raw), berulang jika `loop`.
+
+    Frame di-resize ke resolusi yang diminta lewat `set()` agar perilakunya
+    sama seperti kamera.
+    """
+    IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+    def __init__(self, path, fps=CAPTURE_FPS, loop=True):
+        super().__init__(0, 0, fps)
+        self.path = path
+        self.loop = loop
+        self.video = None
+        self.files = []
+        self.position = 0
+        if os.path.isdir(path):
+            self.files = sorted(
+                os.path.join(path, n) for n in os.listdir(path) if n.lower().endswith(self.IMAGE_EXTENSIONS)
+            )
+            self.opened = bool(self.files)
+        else:
+            self.video = cv2.VideoCapture(path)
+            self.opened = self.video.isOpened()
+
+    def release(self):
+        super().release()
+        if self.video is not None:
+            self.video.release()
+
+    def _read_raw(self):
+        if self.video is not None:
+            ret, frame = self.video.read()
+            if not ret and self.loop:
+                self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.video.read()
+            return frame if ret else None
+
+        if self.position >= len(self.files):
+            if not self.loop:
+                return None
+            self.position = 0
+        frame = cv2.imread(self.files[self.position])
+        self.position += 1
+        return frame
+
+    def next_frame(self):
+        frame = self._read_raw()
+        if frame is None:
+            return None
+        if self.width and self.height and frame.shape[:2] != (self.height, self.width):
+            frame = cv2.resize(frame, (self.width, self.height))
+        return frame
+
+
+def parse_synthetic_spec(spec):
+    """Baca "synthetic[:WxH][@FPS]" menjadi (width, height, fps)."""
+    width, height, fps = CANVAS_WIDTH, CANVAS_HEIGHT, CAPTURE_FPS
+    rest = spec[len("synthetic"):].lstrip(":")
+    if "@" in rest:
+        rest, fps_text = rest.split("@", 1)
+        fps = float(fps_text)
+    if rest:
+        width, height = parse_resolution(rest)
+    return width, height, fps
+
+
+def source_resolution(res, spec=None):
+    """Resolusi capture: `--res` jika diberikan, lalu ukuran di spec synthetic:WxH, lalu 640x480."""
+    if res:
+        return res
+    spec = str(spec or "")
+    if spec.startswith("synthetic"):
+        size = spec[len("synthetic"):].lstrip(":").split("@", 1)[0]
+        if size:
+            return parse_resolution(size)
+    return RESOLUTIONS["640x480"]
+
+
+def open_source(spec):
+    """Buka sumber frame: ID kamera ("0"), "synthetic:1280x720@30", atau path video/folder gambar."""
+    spec = str(spec)
+    if spec.isdigit():
+        return open_camera(int(spec))
+    if spec.startswith("synthetic"):
+        return SyntheticSource(*parse_synthetic_spec(spec))
+    return ReplaySource(spec)
+
+
+# ---------------------------------------------------
+# --------------------- Encoder ---------------------
+# ---------------------------------------------------
+class ImageEncoder:
+    """Basis encoder gambar: `encode(frame)` menghasilkan bytes terkompresi."""
+    backend = ""
+    fmt = ""
+
+    def __init__(self, level=None):
+        spec = IMAGE_FORMATS[self.fmt]
+        low, high = spec["range"]
+        self.level = spec["default"] if level is None else min(high, max(low, int(level)))
+        self.ext = spec["ext"]
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def encode(self, frame):
+        raise NotImplementedError
+
+    def write(self, path, frame):
+        """Encode lalu tulis ke file; kembalikan jumlah byte."""
+        data = self.encode(frame)
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+
+    def describe(self):
+        return f"{self.fmt} ({IMAGE_FORMATS[self.fmt]['option'].lower()} {self.level}, {self.backend})"
+
+
+class OpenCVEncoder(ImageEncoder):
+    backend = "opencv"
+    flag = None
+
+    def encode(self, frame):
+        ok, buf = cv2.imencode(self.ext, frame, [self.flag, self.level])
+        if not ok:
+            raise ValueError(f"cv2.imencode gagal untuk {self.ext}")
+        return buf.tobytes()
+
+
+class OpenCVJPEGEncoder(OpenCVEncoder):
+    fmt = "jpg"
+    flag = cv2.IMWRITE_JPEG_QUALITY
+
+
+class OpenCVPNGEncoder(OpenCVEncoder):
+    fmt = "png"
+    flag = cv2.IMWRITE_PNG_COMPRESSION
+
+
+class OpenCVWebPEncoder(OpenCVEncoder):
+    fmt = "webp"
+    flag = cv2.IMWRITE_WEBP_QUALITY
+
+
+class TurboJPEGEncoder(ImageEncoder):
+    backend = "turbojpeg"
+    fmt = "jpg"
+    _jpeg = None
+
+    @classmethod
+    def available(cls):
+        if TurboJPEG is None:
+            return False
+        if cls._jpeg is None:
+            try:
+                cls._jpeg = TurboJPEG()
+            except (OSError, RuntimeError):
+                return False  # library libjpeg-turbo tidak ditemukan
+        return True
+
+    def encode(self, frame):
+        self.available()
+        return self._jpeg.encode(frame, quality=self.level)
+
+
+# Backend per format, urut dari yang paling diutamakan
+ENCODERS = {
+    "jpg": [TurboJPEGEncoder, OpenCVJPEGEncoder],
+    "png": [OpenCVPNGEncoder],
+    "webp": [OpenCVWebPEncoder],
+}
+
+
+def get_encoder(fmt="jpg", level=None, backend=None):
+    """Encoder tercepat yang tersedia untuk format ini (atau backend tertentu)."""
+    if fmt not in ENCODERS:
+        raise ValueError(f"Format gambar tidak dikenal: {fmt}")
+    for cls in ENCODERS[fmt]:
+        if (backend is None or cls.backend == backend) and cls.available():
+            return cls(level)
+    raise ValueError(f"Backend encoder {backend} tidak tersedia untuk format {fmt}")
+
+
+WriteJob = namedtuple("WriteJob", ["seq", "path", "frame", "encoder", "meta"])
+WriteResult = namedtuple("WriteResult", ["seq", "path", "ok", "error", "meta"])
+
+
+class ImageWriterPool:
+    """Worker pool untuk encode + simpan gambar di luar thread UI.
+
+    Job masuk lewat antrean terbatas. Jika antrean penuh, perilakunya
+    ditentukan oleh `policy`:
+      - "block"       : pemanggil menunggu sampai ada slot kosong
+      - "drop-oldest" : job paling lama dibuang (hasilnya dilaporkan gagal)
+      - "spill"       : frame mentah ditulis cepat ke `spill_dir` (.npy) dan
+                        di-encode nanti saat antrean kosong
+
+    `on_complete(WriteResult)` dipanggil dari thread worker untuk setiap job,
+    termasuk yang dibuang, sehingga pemanggil selalu bisa menghitung progres.
+    Jika `manifest` diberikan, setiap file yang tersimpan dicatat bersama
+    `meta` job (pengaturan capture), ukuran file, dimensi, dan perceptual hash.
+    """
+    def __init__(self, workers=WRITER_WORKERS, max_queue=WRITER_QUEUE_SIZE,
+                 policy=WRITER_POLICY, spill_dir=SPILL_DIR, on_complete=None, manifest=None):
+        if policy not in WRITER_POLICIES:
+            raise ValueError(f"Policy writer tidak dikenal: {policy}")
+        self.policy = policy
+        self.manifest = manifest
+        self.spill_dir = spill_dir
+        self.on_complete = on_complete
+        self.jobs = queue.Queue(maxsize=max_queue)
+        self.spilled = deque()
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1)
+        self.pending = 0
+        self.idle = threading.Condition(self.lock)
+        self.stats_counts = {
+            "submitted": 0, "written": 0, "dropped": 0, "spilled": 0, "failed": 0, "bytes": 0
+        }
+        self.threads = [
+            threading.Thread(target=self._worker, name=f"ImageWriter-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self.threads:
+            t.start()
+
+    def next_path(self, save_dir=SAVE_DIR, ext=".jpg", prefix="image"):
+        """Nama file unik dan urut: timestamp sub-detik + nomor urut monoton."""
+        seq = next(self.counter)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        return seq, os.path.join(save_dir, f"{prefix}_{timestamp}_{seq:06d}{ext}")
+
+    def submit(self, frame, save_dir=SAVE_DIR, encoder=None, meta=None, prefix="image"):
+        """Masukkan frame ke antrean simpan. Frame tidak disalin; jangan diubah setelahnya."""
+        encoder = encoder or get_encoder()
+        os.makedirs(save_dir, exist_ok=True)
+        seq, path = self.next_path(save_dir, encoder.ext, prefix)
+        job = WriteJob(seq, path, frame, encoder, meta)
+        with self.lock:
+            self.pending += 1
+            self.stats_counts["submitted"] += 1
+
+        PROFILER.gauge("write_queue", self.jobs.qsize() + len(self.spilled))
+        if self.policy == "block":
+            self.jobs.put(job)
+            return path
+
+        try:
+            self.jobs.put_nowait(job)
+            return path
+        except queue.Full:
+            pass
+
+        if self.policy == "drop-oldest":
+            try:
+                dropped = self.jobs.get_nowait()
+                self.jobs.task_done()
+                with self.lock:
+                    self.stats_counts["dropped"] += 1
+                PROFILER.count("writes_dropped")
+                self._finish(dropped, False, "dropped")
+            except queue.Empty:
+                pass
+            self.jobs.put(job)
+        else:
+            self._spill(job)
+        return path
+
+    def _spill(self, job):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        spill_path = os.path.join(self.spill_dir, f"{job.seq:06d}.npy")
+        np.save(spill_path, job.frame)
+        with self.lock:
+            self.spilled.append(job._replace(frame=spill_path))
+            self.stats_counts["spilled"] += 1
+
+    def _next_job(self):
+        try:
+            return self.jobs.get(timeout=0.1), True
+        except queue.Empty:
+            pass
+        with self.lock:
+            if self.spilled:
+                job = self.spilled.popleft()
+            else:
+                return None, False
+        return job, False
+
+    @staticmethod
+    def _load_spilled(spill_path):
+        """Baca frame yang di-spill; file .npy selalu dihapus, berhasil atau tidak."""
+        try:
+            return np.load(spill_path)
+        finally:
+            try:
+                os.remove(spill_path)
+            except OSError:
+                pass
+
+    def _worker(self):
+        while True:
+            job, from_queue = self._next_job()
+            if job is None:
+                continue
+            if job.frame is None:  # sinyal berhenti
+                self.jobs.task_done()
+                return
+            ok, error, size = False, None, 0
+            try:
+                if isinstance(job.frame, str):  # frame di-spill ke disk
+                    job = job._replace(frame=self._load_spilled(job.frame))
+                with PROFILER.span("encode+write"):
+                    size = job.encoder.write(job.path, job.frame)
+                ok = True
+                if self.manifest is not None:
+                    self.manifest.append(job.path, job.frame, size, job.meta)
+            except Exception as e:
+                error = str(e)
+            finally:
+                # Satu job gagal tidak boleh mematikan worker atau membuat
+                # `pending` tidak pernah nol (join() akan menggantung).
+                with self.lock:
+                    self.stats_counts["written" if ok else "failed"] += 1
+                    self.stats_counts["bytes"] += size
+                self._finish(job, ok, error)
+                if from_queue:
+                    self.jobs.task_done()
+
+    def _finish(self, job, ok, error):
+        try:
+            if self.on_complete is not None:
+                self.on_complete(WriteResult(job.seq, job.path, ok, error, job.meta))
+        finally:
+            with self.idle:
+                self.pending -= 1
+                self.idle.notify_all()
+
+    def join(self, timeout=None):
+        """Tunggu semua job (termasuk yang di-spill) selesai ditulis."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self.idle:
+            while self.pending > 0:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.idle.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        self.join(timeout)
+        for _ in self.threads:
+            self.jobs.put(WriteJob(None, None, None, None, None))
+        for t in self.threads:
+            t.join(1.0)
+
+    def stats(self):
+        with self.lock:
+            return dict(self.stats_counts, queued=self.jobs.qsize() + len(self.spilled))
+
+
+# ---------------------------------------------------
+# ---------------- Spool Frame Mentah ---------------
+# ---------------------------------------------------
+SPOOL_EMPTY, SPOOL_WRITTEN = 0, 1
+
+SPOOL_HEADER_DTYPE = np.dtype([("magic", "S8"), ("slots", "<u4"), ("slot_size", "<u8")])
+SPOOL_INDEX_DTYPE = np.dtype([
+    ("seq", "<u8"),
+    ("timestamp", "<f8"),
+    ("height", "<u4"),
+    ("width", "<u4"),
+    ("state", "<u1"),
+    ("mirror", "<u1"),
+    ("brightness", "<i2"),
+    ("camera_id", "S32"),
+])
+
+
+class FrameSpool:
+    """Ring buffer frame BGR mentah di satu file memory-mapped.
+
+    Layout file: header, tabel index (satu record SPOOL_INDEX_DTYPE per slot:
+    timestamp, ukuran, mode, brightness), lalu data slot berukuran tetap.
+    `reserve()` memberi view slot sehingga kamera bisa membaca langsung ke
+    file (cap.read(view)) tanpa salinan. Mirror/brightness hanya dicatat dan
+    baru diterapkan saat encode. Slot yang belum di-encode tidak ditimpa.
+    """
+    MAGIC = b"OSPOOL1"
+
+    def __init__(self, path=SPOOL_FILE, slots=None, slot_size=None):
+        self.path = path
+        self.lock = threading.Lock()
+        if not os.path.exists(path):
+            if not slots or not slot_size:
+                raise FileNotFoundError(f"Spool tidak ditemukan: {path}")
+            self._create(slots, slot_size)
+        self._open()
+        if slot_size and slot_size > self.slot_size and not len(self.pending()):
+            # Slot lama terlalu kecil untuk resolusi ini dan tidak ada yang tertunda: buat ulang
+            self.close()
+            self._create(slots or self.slots, slot_size)
+            self._open()
+
+        # Lanjutkan nomor urut dan posisi tulis dari frame terakhir di file
+        self.seq = int(self.index["seq"].max())
+        self.head = (int(np.argmax(self.index["seq"])) + 1) % self.slots if self.seq else 0
+
+    def _create(self, slots, slot_size):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.truncate(self._data_offset(slots) + slots * slot_size)
+            f.write(np.array([(self.MAGIC, slots, slot_size)], dtype=SPOOL_HEADER_DTYPE).tobytes())
+
+    @staticmethod
+    def _data_offset(slots):
+        # Data slot dimulai di batas halaman agar setiap slot rata untuk mmap
+        end = SPOOL_HEADER_DTYPE.itemsize + slots * SPOOL_INDEX_DTYPE.itemsize
+        return (end + mmap.PAGESIZE - 1) // mmap.PAGESIZE * mmap.PAGESIZE
+
+    def _open(self):
+        header = np.fromfile(self.path, dtype=SPOOL_HEADER_DTYPE, count=1)[0]
+        if header["magic"] != self.MAGIC:
+            raise ValueError(f"Bukan file spool: {self.path}")
+        self.slots = int(header["slots"])
+        self.slot_size = int(header["slot_size"])
+        self.index = np.memmap(self.path, dtype=SPOOL_INDEX_DTYPE, mode="r+",
+                               offset=SPOOL_HEADER_DTYPE.itemsize, shape=(self.slots,))
+        self.data = np.memmap(self.path, dtype=np.uint8, mode="r+",
+                              offset=self._data_offset(self.slots), shape=(self.slots, self.slot_size))
+
+    @classmethod
+    def for_resolution(cls, width, height, size_mb=SPOOL_SIZE_MB, path=SPOOL_FILE):
+        slot_size = width * height * 3
+        slots = max(2, size_mb * 1024 * 1024 // slot_size)
+        return cls(path, slots, slot_size)
+
+    def reserve(self, shape):
+        """(slot, view) untuk frame berikutnya, atau None jika ring penuh."""
+        size = int(np.prod(shape))
+        if size > self.slot_size:
+            raise ValueError(f"Frame {shape} lebih besar dari slot spool ({self.slot_size} byte)")
+        with self.lock:
+            slot = self.head
+            if self.index[slot]["state"] == SPOOL_WRITTEN:
+                return None
+            self.head = (slot + 1) % self.slots
+        return slot, self.data[slot, :size].reshape(shape)
+
+    def commit(self, slot, shape, timestamp, mode=MODES[0], brightness=0, camera_id=""):
+        with self.lock:
+            self.seq += 1
+            record = self.index[slot:slot + 1]
+            record["seq"] = self.seq
+            record["timestamp"] = timestamp
+            record["height"], record["width"] = shape[:2]
+            record["mirror"] = mode == "Mirror"
+            record["brightness"] = brightness
+            record["camera_id"] = str(camera_id).encode()[:32]
+            record["state"] = SPOOL_WRITTEN  # ditulis terakhir: slot lengkap
+
+    def append(self, frame, timestamp, mode=MODES[0], brightness=0, camera_id=""):
+        """Salin frame ke spool. Kembalikan False jika ring penuh."""
+        reserved = self.reserve(frame.shape)
+        if reserved is None:
+            return False
+        slot, view = reserved
+        np.copyto(view, frame)
+        self.commit(slot, frame.shape, timestamp, mode, brightness, camera_id)
+        return True
+
+    def frame(self, slot):
+        record = self.index[slot]
+        shape = (int(record["height"]), int(record["width"]), 3)
+        return self.data[slot, :int(np.prod(shape))].reshape(shape)
+
+    def pending(self):
+        """Slot yang belum di-encode, urut sesuai waktu capture."""
+        slots = np.flatnonzero(self.index["state"] == SPOOL_WRITTEN)
+        return slots[np.argsort(self.index["seq"][slots])]
+
+    def release(self, slot):
+        with self.lock:
+            self.index[slot:slot + 1]["state"] = SPOOL_EMPTY
+
+    def flush(self):
+        self.index.flush()
+        self.data.flush()
+
+    def close(self):
+        self.flush()
+        del self.index, self.data
+
+
+_spool_worker = None
+
+
+def _init_spool_worker(path):
+    global _spool_worker
+    cv2.setNumThreads(1)
+    _spool_worker = FrameSpool(path)
+
+
+def _encode_spool_slot(job):
+    """Encode satu slot di proses worker; frame dibaca langsung dari mmap."""
+    slot, out_path, fmt, level = job
+    record = _spool_worker.index[slot]
+    mode = "Mirror" if record["mirror"] else MODES[0]
+    frame = process_frame(_spool_worker.frame(slot), mode, int(record["brightness"]))
+    size = get_encoder(fmt, level).write(out_path, frame)
+    return slot, out_path, size, dhash(frame)
+
+
+def encode_spool(path=SPOOL_FILE, out_dir=SAVE_DIR, fmt="jpg", level=None, workers=None,
+                 manifest=None, on_progress=None):
+    """Encode semua frame tertunda di spool ke `out_dir` memakai semua core."""
+    spool = FrameSpool(path)
+    encoder = get_encoder(fmt, level)
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = []
+    for slot in spool.pending():
+        record = spool.index[slot]
+        stamp = datetime.fromtimestamp(float(record["timestamp"])).strftime("%Y%m%d_%H%M%S_%f")
+        name = f"image_{stamp}_{int(record['seq']):06d}{encoder.ext}"
+        jobs.append((int(slot), os.path.join(out_dir, name), fmt, encoder.level))
+    spool.flush()
+
+    done = 0
+    with Pool(workers or os.cpu_count() or 1, initializer=_init_spool_worker, initargs=(path,)) as pool:
+        for slot, out_path, size, phash in pool.imap_unordered(_encode_spool_slot, jobs, chunksize=4):
+            record = spool.index[slot]
+            if manifest is not None:
+                manifest.append(out_path, spool.frame(slot), size, {
+                    "captured_at": float(record["timestamp"]),
+                    "camera_id": record["camera_id"].decode(),
+                    "mode": "Mirror" if record["mirror"] else MODES[0],
+                    "resolution": f"{int(record['width'])}x{int(record['height'])}",
+                    "brightness": int(record["brightness"]),
+                    "format": fmt,
+                    "level": encoder.level,
+                    "phash": phash,
+                    "source": "spool",
+                })
+            spool.release(slot)
+            done += 1
+            if on_progress is not None:
+                on_progress(done, len(jobs))
+    spool.close()
+    return done
+
+
+# ---------------------------------------------------
+# ---------------- Manifest Capture -----------------
+# ---------------------------------------------------
+def dhash(frame, hash_size=8):
+    """Perceptual difference hash 64-bit dari frame BGR (dalam hex 16 karakter)."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return f"{int(np.packbits(bits).view('>u8')[0]):016x}"
+
+
+MANIFEST_COLUMNS = [
+    "path", "captured_at", "camera_id", "mode", "resolution", "width", "height",
+    "brightness", "format", "level", "file_size", "phash", "session", "source",
+]
+
+
+class CaptureManifest:
+    """Manifest append-only (SQLite) untuk setiap frame yang tersimpan.
+
+    `append()` hanya memasukkan baris ke antrean; thread khusus menulis ke
+    database dan commit per batch (MANIFEST_BATCH baris atau
+    MANIFEST_FLUSH_INTERVAL detik), sehingga tidak memperlambat capture.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS captures (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE,
+            captured_at REAL,
+            camera_id TEXT,
+            mode TEXT,
+            resolution TEXT,
+            width INTEGER,
+            height INTEGER,
+            brightness INTEGER,
+            format TEXT,
+            level INTEGER,
+            file_size INTEGER,
+            phash TEXT,
+            session TEXT,
+            source TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_captures_settings ON captures (camera_id, resolution, mode);
+        CREATE INDEX IF NOT EXISTS idx_captures_time ON captures (captured_at);
+        CREATE INDEX IF NOT EXISTS idx_captures_phash ON captures (phash);
+        CREATE TABLE IF NOT EXISTS tags (
+            path TEXT,
+            tag TEXT,
+            PRIMARY KEY (path, tag)
+        );
+    """
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.session = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.rows = queue.Queue()
+        self.appended = 0
+        self.thread = threading.Thread(target=self._run, name="CaptureManifest", daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def connect(path=MANIFEST_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")  # pembaca (query) tidak memblokir penulis
+        conn.executescript(CaptureManifest.SCHEMA)
+        return conn
+
+    def append(self, path, frame, file_size, meta=None):
+        """Catat satu file tersimpan (aman dipanggil dari thread writer)."""
+        meta = meta or {}
+        row = dict(
+            meta,
+            path=os.path.abspath(path),
+            captured_at=meta.get("captured_at", time.time()),
+            width=frame.shape[1],
+            height=frame.shape[0],
+            file_size=file_size,
+            phash=meta.get("phash") or dhash(frame),
+            session=self.session,
+        )
+        self.rows.put(tuple(row.get(col) for col in MANIFEST_COLUMNS))
+        self.appended += 1
+
+    def _run(self):
+        conn = self.connect(self.path)
+        sql = f"INSERT OR IGNORE INTO captures ({', '.join(MANIFEST_COLUMNS)}) VALUES ({', '.join('?' * len(MANIFEST_COLUMNS))})"
+        batch = []
+        last_flush = time.time()
+        running = True
+        while running:
+            try:
+                row = self.rows.get(timeout=MANIFEST_FLUSH_INTERVAL)
+                if row is None:
+                    running = False
+                else:
+                    batch.append(row)
+            except queue.Empty:
+                pass
+            if batch and (not running or len(batch) >= MANIFEST_BATCH
+                          or time.time() - last_flush >= MANIFEST_FLUSH_INTERVAL):
+                conn.executemany(sql, batch)
+                conn.commit()
+                batch = []
+                last_flush = time.time()
+        conn.close()
+
+    def close(self, timeout=5.0):
+        self.rows.put(None)
+        self.thread.join(timeout)
+
+
+def query_manifest(path=MANIFEST_FILE, camera_id=None, mode=None, resolution=None, fmt=None,
+                   since=None, until=None, session=None, tag=None, limit=None):
+    """Filter baris manifest tanpa membuka file gambar. Kembalikan list dict."""
+    filters, params = [], []
+    if tag is not None:
+        filters.append("path IN (SELECT path FROM tags WHERE tag = ?)")
+        params.append(tag)
+    for column, value in (("camera_id", camera_id), ("mode", mode), ("resolution", resolution),
+                          ("format", fmt), ("session", session)):
+        if value is not None:
+            filters.append(f"{column} = ?")
+            params.append(str(value))
+    if since is not None:
+        filters.append("captured_at >= ?")
+        params.append(since)
+    if until is not None:
+        filters.append("captured_at < ?")
+        params.append(until)
+
+    sql = "SELECT * FROM captures"
+    if filters:
+        sql += " WHERE " + " AND ".join(filters)
+    sql += " ORDER BY captured_at"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+
+    conn = CaptureManifest.connect(path)
+    try:
+        conn.row_factory = sqlite3.Row
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def tag_captures(paths, tag, path=MANIFEST_FILE):
+    """Beri tag pada file (tabel tags di manifest)."""
+    conn = CaptureManifest.connect(path)
+    try:
+        conn.executemany("INSERT OR IGNORE INTO tags (path, tag) VALUES (?, ?)",
+                         [(os.path.abspath(p), tag) for p in paths])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_tags(path=MANIFEST_FILE):
+    """{path absolut: set(tag)} dari tabel tags di manifest."""
+    if not os.path.exists(path):
+        return {}
+    conn = CaptureManifest.connect(path)
+    try:
+        tags = {}
+        for file_path, tag in conn.execute("SELECT path, tag FROM tags"):
+            tags.setdefault(file_path, set()).add(tag)
+        return tags
+    finally:
+        conn.close()
+
+
+def forget_captures(paths, path=MANIFEST_FILE):
+    """Hapus baris manifest (dan tag) untuk file yang sudah dihapus."""
+    rows = [(os.path.abspath(p),) for p in paths]
+    conn = CaptureManifest.connect(path)
+    try:
+        conn.executemany("DELETE FROM captures WHERE path = ?", rows)
+        conn.executemany("DELETE FROM tags WHERE path = ?", rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """BK-tree untuk pencarian hash dalam radius Hamming tertentu.
+
+    Setiap node menyimpan (hash, item, anak per jarak); pencarian hanya
+    menelusuri anak dengan jarak dalam [d - radius, d + radius], sehingga
+    cukup O(log n) per query untuk radius kecil.
+    """
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value, item=None):
+        node = [value, item, {}]
+        self.size += 1
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            dist = hamming(value, current[0])
+            child = current[2].get(dist)
+            if child is None:
+                current[2][dist] = node
+                return
+            current = child
+
+    def find(self, value, radius):
+        """(jarak, item) pertama dalam radius, atau None."""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            dist = hamming(value, node[0])
+            if dist <= radius:
+                return dist, node[1]
+            for d in range(dist - radius, dist + radius + 1):
+                child = node[2].get(d)
+                if child is not None:
+                    stack.append(child)
+        return None
+
+
+class FrameDeduplicator:
+    """Tolak frame yang hampir identik dengan capture sebelumnya di sesi ini.
+
+    Hash dari manifest hanya dipakai jika `manifest_path` diberikan (opt-in),
+    agar scene statis yang pernah di-capture tidak ditolak selamanya.
+    """
+    def __init__(self, threshold=DEDUP_THRESHOLD, manifest_path=None):
+        self.threshold = threshold
+        self.tree = BKTree()
+        self.lock = threading.Lock()
+        self.checked = 0
+        self.skipped = 0
+        if manifest_path and os.path.exists(manifest_path):
+            conn = CaptureManifest.connect(manifest_path)
+            try:
+                for path, phash in conn.execute("SELECT path, phash FROM captures WHERE phash IS NOT NULL"):
+                    self.tree.add(int(phash, 16), path)
+            finally:
+                conn.close()
+
+    def check(self, frame, item=None):
+        """Kembalikan (duplikat_dari, phash). `duplikat_dari` None jika frame baru."""
+        phash = dhash(frame)
+        return self.check_hash(phash, item), phash
+
+    def check_hash(self, phash, item=None):
+        value = int(phash, 16)
+        with self.lock:
+            self.checked += 1
+            match = self.tree.find(value, self.threshold)
+            if match is not None:
+                self.skipped += 1
+                return match[1]
+            self.tree.add(value, item if item is not None else phash)
+            return None
+
+    def stats(self):
+        with self.lock:
+            ratio = self.skipped / self.checked if self.checked else 0.0
+            return {"checked": self.checked, "skipped": self.skipped, "ratio": ratio, "known": len(self.tree)}
+
+
+# ---------------------------------------------------
+# --------------------- Galeri ----------------------
+# ---------------------------------------------------
+def list_images(folder):
+    """File gambar di folder, terbaru dulu (nama file diawali timestamp)."""
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        (entry.path for entry in os.scandir(folder)
+         if entry.is_file() and entry.name.lower().endswith(ReplaySource.IMAGE_EXTENSIONS)),
+        reverse=True,
+    )
+
+
+class ThumbnailCache:
+    """Thumbnail kecil: content-addressed di disk + LRU di memori.
+
+    Kunci thumbnail = sha1 isi file, sehingga file yang dipindah atau diganti
+    nama tetap memakai thumbnail yang sama. Pemetaan path -> (size, mtime, sha1)
+    disimpan di index.json agar file yang tidak berubah tidak perlu dibaca ulang.
+    JPEG di-decode langsung pada skala 1/2..1/8 (PIL draft) lalu diperkecil.
+    """
+    def __init__(self, cache_dir=THUMB_CACHE_DIR, size=THUMB_SIZE,
+                 memory_items=THUMB_MEMORY_ITEMS, workers=THUMB_WORKERS):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.memory_items = memory_items
+        self.memory = OrderedDict()   # path -> array RGB
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.wanted = set()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Thumbnail")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.index_dirty = False
+        try:
+            with open(self.index_path, "r") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def get(self, path):
+        """Thumbnail dari memori, atau None jika belum dimuat."""
+        with self.lock:
+            thumb = self.memory.get(path)
+            if thumb is not None:
+                self.memory.move_to_end(path)
+            return thumb
+
+    def request(self, paths, on_ready):
+        """Muat thumbnail `paths` di background; `on_ready(path)` dipanggil dari thread worker.
+
+        Permintaan lama yang tidak ada lagi di `paths` (sudah di-scroll lewat) dilewati.
+        """
+        with self.lock:
+            self.wanted = set(paths)
+            for path in paths:
+                if path in self.memory or path in self.pending:
+                    continue
+                self.pending.add(path)
+                self.pool.submit(self._load_worker, path, on_ready)
+
+    def _load_worker(self, path, on_ready):
+        with self.lock:
+            if path not in self.wanted:
+                self.pending.discard(path)
+                return
+        try:
+            with PROFILER.span("thumbnail"):
+                thumb = self.load(path)
+        except (OSError, ValueError):
+            thumb = None
+        with self.lock:
+            self.pending.discard(path)
+            if thumb is None:
+                return
+            self.memory[path] = thumb
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+        on_ready(path)
+
+    def load(self, path):
+        """Thumbnail RGB untuk `path`, dari cache disk atau dibuat baru."""
+        from PIL import Image
+
+        key = self.content_key(path)
+        thumb_path = os.path.join(self.cache_dir, key[:2], f"{key}.jpg")
+        if os.path.exists(thumb_path):
+            with Image.open(thumb_path) as img:
+                return np.asarray(img.convert("RGB"))
+
+        with Image.open(path) as img:
+            img.draft("RGB", self.size)  # decode JPEG diperkecil, jauh lebih cepat dari ukuran penuh
+            img = img.convert("RGB")
+            img.thumbnail(self.size)
+        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+        img.save(thumb_path, "JPEG", quality=80)
+        return np.asarray(img)
+
+    def content_key(self, path):
+        stat = os.stat(path)
+        abs_path = os.path.abspath(path)
+        with self.lock:
+            entry = self.index.get(abs_path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime:
+            return entry[2]
+
+        sha1 = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha1.update(chunk)
+        key = sha1.hexdigest()
+        with self.lock:
+            self.index[abs_path] = [stat.st_size, stat.st_mtime, key]
+            self.index_dirty = True
+        return key
+
+    def forget(self, path):
+        with self.lock:
+            self.memory.pop(path, None)
+            if self.index.pop(os.path.abspath(path), None) is not None:
+                self.index_dirty = True
+
+    def save_index(self):
+        with self.lock:
+            if not self.index_dirty:
+                return
+            data = json.dumps(self.index)
+            self.index_dirty = False
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, self.index_path)
+
+    def close(self):
+        with self.lock:
+            self.wanted = set()
+        self.pool.shutdown(wait=False)
+        self.save_index()
+
+
+class GalleryWindow:
+    """Galeri thumbnail dataset/raw dengan scroll tervirtualisasi.
+
+    Hanya sel yang terlihat yang digambar dan di-decode; daftar file dipindai
+    sekali saat dibuka lalu diperbarui langsung saat capture, hapus, atau tag.
+    Tag dari manifest ditampilkan di bawah thumbnail dan bisa dipakai sebagai filter.
+    """
+    ALL_TAGS = "Semua"
+
+    def __init__(self, app, folder=SAVE_DIR):
+        self.app = app
+        self.folder = folder
+        self.cache = app.thumbnail_cache
+        self.all_paths = list_images(folder)
+        self.tags = load_tags()  # path absolut -> set(tag)
+        self.filter_tag = None
+        self.paths = self.all_paths
+        self.selected = set()
+        self.photos = {}        # path -> PhotoImage untuk sel yang sedang terlihat
+        self.columns = 1
+        self.refresh_pending = False
+
+        self.window = ctk.CTkToplevel(app.root)
+        self.window.title(f"Gallery - {folder}")
+        self.window.geometry("760x620")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        toolbar = ctk.CTkFrame(self.window, fg_color="transparent")
+        toolbar.pack(fill="x", padx=10, pady=(10, 5))
+        self.count_label = ctk.CTkLabel(toolbar, text="", font=("Arial", 12), anchor="w")
+        self.count_label.pack(side="left")
+        ctk.CTkButton(toolbar, text="Hapus", width=80, fg_color="#c0392b",
+                      command=self.delete_selected).pack(side="right", padx=(5, 0))
+        ctk.CTkButton(toolbar, text="Tag", width=60, command=self.tag_selected).pack(side="right", padx=(5, 0))
+        self.tag_entry = ctk.CTkEntry(toolbar, width=140, placeholder_text="tag, misal blur")
+        self.tag_entry.pack(side="right")
+        self.filter_menu = ctk.CTkOptionMenu(toolbar, width=110, values=self.tag_choices(),
+                                             command=self.set_filter)
+        self.filter_menu.set(self.ALL_TAGS)
+        self.filter_menu.pack(side="right", padx=(0, 10))
+
+        body = ctk.CTkFrame(self.window, fg_color="transparent")
+        body.pack(expand=True, fill="both", padx=10, pady=(0, 10))
+        self.scrollbar = ctk.CTkScrollbar(body)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas = ctk.CTkCanvas(body, bg="white", highlightthickness=0,
+                                    yscrollcommand=self.on_scroll)
+        self.canvas.pack(side="left", expand=True, fill="both")
+        self.scrollbar.configure(command=self.canvas.yview)
+
+        self.canvas.bind("<Configure>", lambda event: self.layout())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<MouseWheel>", lambda event: self.canvas.yview_scroll(-event.delta // 120, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+        self.layout()
+
+    def tags_of(self, path):
+        return self.tags.get(os.path.abspath(path), set())
+
+    def tag_choices(self):
+        return [self.ALL_TAGS] + sorted(set().union(*self.tags.values()))
+
+    def set_filter(self, choice):
+        self.filter_tag = None if choice == self.ALL_TAGS else choice
+        self.canvas.yview_moveto(0)
+        self.apply_filter()
+
+    def apply_filter(self):
+        if self.filter_tag is None:
+            self.paths = self.all_paths
+        else:
+            self.paths = [p for p in self.all_paths if self.filter_tag in self.tags_of(p)]
+        self.layout()
+
+    def layout(self):
+        """Hitung ulang jumlah kolom dan tinggi area scroll (tanpa menggambar semua sel)."""
+        width = max(1, self.canvas.winfo_width())
+        cell_w, cell_h = GALLERY_CELL
+        self.columns = max(1, width // cell_w)
+        rows = math.ceil(len(self.paths) / self.columns)
+        self.canvas.configure(scrollregion=(0, 0, width, rows * cell_h), yscrollincrement=cell_h // 2)
+        self.update_count_label()
+        self.schedule_refresh()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        # Gabungkan banyak event scroll/thumbnail selesai menjadi satu redraw
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.window.after(15, self.refresh)
+
+    def visible_range(self):
+        cell_h = GALLERY_CELL[1]
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(0, int(top // cell_h) * self.columns)
+        last = min(len(self.paths), (int(bottom // cell_h) + 1) * self.columns)
+        return first, last
+
+    def refresh(self):
+        """Gambar ulang hanya sel yang terlihat; thumbnail yang belum ada diminta ke cache."""
+        self.refresh_pending = False
+        if not self.window.winfo_exists():
+            return
+        cell_w, cell_h = GALLERY_CELL
+        first, last = self.visible_range()
+        visible = self.paths[first:last]
+        photos = {}
+        missing = []
+
+        self.canvas.delete("cell")
+        for index, path in enumerate(visible, start=first):
+            row, column = divmod(index, self.columns)
+            cx, cy = column * cell_w + cell_w // 2, row * cell_h + cell_h // 2
+            photo = self.photos.get(path)
+            if photo is None:
+                thumb = self.cache.get(path)
+                if thumb is not None:
+                    photo = ImageTk.PhotoImage(Image.fromarray(thumb))
+            if photo is None:
+                missing.append(path)
+                self.canvas.create_rectangle(cx - 60, cy - 45, cx + 60, cy + 45,
+                                             fill="#e0e0e0", outline="", tags="cell")
+            else:
+                photos[path] = photo
+                self.canvas.create_image(cx, cy, image=photo, tags="cell")
+            tags = self.tags_of(path)
+            if tags:
+                # Tag ditulis di bagian bawah thumbnail dengan latar agar terbaca
+                text = self.canvas.create_text(cx, cy + cell_h // 2 - 6, text=", ".join(sorted(tags)),
+                                               anchor="s", fill="white", font=("Arial", 9), tags="cell")
+                x1, y1, x2, y2 = self.canvas.bbox(text)
+                background = self.canvas.create_rectangle(x1 - 3, y1 - 1, x2 + 3, y2 + 1,
+                                                          fill="#1f6aa5", outline="", tags="cell")
+                self.canvas.tag_lower(background, text)
+            if path in self.selected:
+                self.canvas.create_rectangle(cx - cell_w // 2 + 3, cy - cell_h // 2 + 3,
+                                             cx + cell_w // 2 - 3, cy + cell_h // 2 - 3,
+                                             outline="#1f6aa5", width=3, tags="cell")
+        self.photos = photos
+
+        # Minta juga satu layar di bawah agar scroll terasa mulus
+        prefetch = self.paths[last:last + (last - first)]
+        self.cache.request(missing + prefetch, self.on_thumbnail_ready)
+
+    def on_thumbnail_ready(self, path):
+        self.app.run_on_ui(self.schedule_refresh)
+
+    def on_click(self, event):
+        cell_w, cell_h = GALLERY_CELL
+        column = int(event.x // cell_w)
+        row = int(self.canvas.canvasy(event.y) // cell_h)
+        index = row * self.columns + column
+        if column >= self.columns or index >= len(self.paths):
+            return
+        path = self.paths[index]
+        self.selected.symmetric_difference_update({path})
+        self.update_count_label()
+        self.schedule_refresh()
+
+    def update_count_label(self):
+        self.count_label.configure(text=f"{len(self.paths)} gambar | {len(self.selected)} dipilih")
+
+    def add(self, path):
+        """Tambahkan hasil capture baru di urutan teratas tanpa memindai folder."""
+        if os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.folder):
+            self.all_paths.insert(0, path)
+            if self.filter_tag is None:
+                self.layout()  # capture baru belum punya tag, tidak lolos filter tag
+
+    def delete_selected(self):
+        if not self.selected:
+            return
+        if not messagebox.askyesno("Hapus Gambar", f"Hapus {len(self.selected)} gambar terpilih?",
+                                   parent=self.window):
+            return
+        deleted = []
+        for path in self.selected:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[WARN] Gagal menghapus {path}: {e}")
+                continue
+            deleted.append(path)
+            self.cache.forget(path)
+        removed = set(deleted)
+        self.all_paths = [p for p in self.all_paths if p not in removed]
+        self.selected -= removed
+        for path in deleted:
+            self.tags.pop(os.path.abspath(path), None)
+        threading.Thread(target=forget_captures, args=(deleted,), daemon=True).start()
+        self.apply_filter()
+
+    def tag_selected(self):
+        tag = self.tag_entry.get().strip()
+        if not tag or not self.selected:
+            return
+        paths = list(self.selected)
+        threading.Thread(target=tag_captures, args=(paths, tag), daemon=True).start()
+        # Tampilkan langsung tanpa menunggu manifest
+        for path in paths:
+            self.tags.setdefault(os.path.abspath(path), set()).add(tag)
+        self.filter_menu.configure(values=self.tag_choices())
+        self.selected.clear()
+        self.update_count_label()
+        self.schedule_refresh()
+
+    def close(self):
+        self.cache.save_index()
+        self.app.gallery = None
+        self.window.destroy()
 
 
 # ---------------------------------------------------
@@ -34,8 +2316,10 @@ ctk.set_default_color_theme("blue")
 # ---------------------------------------------------
 class CameraApp:
     """Aplikasi GUI pengambilan gambar dengan webcam."""
-    def __init__(self, root):
+    def __init__(self, root, source=None, profile_startup=False):
         self.root = root
+        self.profile_startup = profile_startup
+        self.exit_code = 0
         # Hitung ukuran layar
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
@@ -54,28 +2338,86 @@ class CameraApp:
         self.selected_camera_id = ctk.StringVar(value="0")
         self.selected_mode = ctk.StringVar(value=MODES[1])
         self.selected_resolution = ctk.StringVar(value="640x480")
-        self.available_camera_ids = detect_available_cameras()
+        # Daftar kamera diisi dari cache lalu diperbarui di background
+        self.camera_discovery = CameraDiscovery()
+        self.available_camera_ids = self.camera_discovery.cameras or ["0"]
+        self.discovery_started = False
+        self.camera_lost = False        # grabber gagal; kamera sedang dicoba dibuka ulang
+        self.reopen_at = 0.0
+        self.source = source
         self.brightness_value = ctk.IntVar(value=0)
 
         self.current_camera_id = 0
         self.window_width = int(screen_width * 0.85)
         self.setting_info_label = None
+        self.pipeline_stats_label = None
+
+        # Callback dari thread background dijalankan di main loop Tk lewat antrean ini
+        self.ui_calls = queue.Queue()
+        self.switching_camera = False
+        self.capture_profile = None
+        self.preview_latency = 0.0
+        self.inference_worker = None
+        self.checklist = None
 
-        # Inisialisasi kamera
-        self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-        self.set_resolution("640x480")
+        # Kamera dibuka di background (bisa beberapa detik dengan CAP_DSHOW) agar
+        # jendela langsung tampil; frame mulai mengalir setelah _swap_camera
+        self.cap = None
+        self.grabber = None
+        self.switching_camera = True
+        threading.Thread(
+            target=self._open_camera_worker,
+            args=(0, self.selected_resolution.get(), source),
+            name="CameraOpen",
+            daemon=True
+        ).start()
         self.is_updating = True  # flag untuk pause/resume update_frame
+        self.current_frame = None       # stream preview (ukuran canvas)
+        self.current_raw = None         # frame kamera asli dari decode yang sama
+        self.current_settings = (MODES[0], 0)
+        self.current_timestamp = None
+        self.current_frame_seq = 0
+        self.preprocessor = FramePreprocessor((CANVAS_WIDTH, CANVAS_HEIGHT))
+        self.last_saved_seq = 0
+
+        # Writer pool: hasil simpan dikirim ke antrean lalu dibaca main loop Tk
+        self.write_results = queue.Queue()
+        self.manifest = CaptureManifest()
+        self.writer = ImageWriterPool(on_complete=self.write_results.put, manifest=self.manifest)
+        self.total_images = 0
+        self.images_done = 0
+        self.deduplicator = None
+        self.burst_id = 0               # burst aktif; callback after() dari burst lama diabaikan
+        self.burst_running = False
+        self.duplicate_streak = 0
+        self.motion_trigger = None
+        self.gallery = None
+        self.thumbnail_cache = None
+        self.spool = None
+        # Hanya satu encode spool berjalan; burst yang selesai saat encode jalan ditandai untuk diulang
+        self.spool_encode_lock = threading.Lock()
+        self.spool_encode_running = False
+        self.spool_encode_requested = None
 
         # Inisialisasi nilai default untuk settingan pengambilan gambar
         self.capture_settings = {
             "count": 1,
             "delay": 2,
+            "format": "jpg",
+            "level": IMAGE_FORMATS["jpg"]["default"],
+            "dedup": False,
+            "trigger": False,
+            "spool": False,
         }
 
         self.root.title("OutReady - Capture Image")
         self.build_ui()
         self.update_frame()
+        self.update_pipeline_stats()
+        self.poll_write_results()
+        self.poll_ui_calls()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.bind("<Map>", lambda event: STARTUP.mark("window"), add="+")
 
     # -------------------------------------------
     # --------------- Build UI ------------------
@@ -127,6 +2469,7 @@ class CameraApp:
         # Builder section terpisah
         self.feature_builders = [
             self.build_brightness_control,
+            self.build_detection_control,
             # Tambahkan fungsi-fungsi kontrol lain di sini
             # self.build_contrast_control,
             # self.build_zoom_control,
@@ -154,6 +2497,8 @@ class CameraApp:
         self.feature_builders = [
             # Tambahkan fungsi-fungsi kontrol lain di sini
             self.build_setting_info_section,
+            self.build_checklist_section,
+            self.build_profiler_section,
         ]
 
         # Bangun tiap section di dalam panel kiri
@@ -170,6 +2515,7 @@ class CameraApp:
         """Bangun area tampilan kamera."""
         self.image_label = ctk.CTkLabel(self.root, text="")
         self.image_label.pack(expand=False, fill="both", pady=10)
+        self.renderer = PreviewRenderer(self.image_label)
 
     def build_buttons(self):
         """Bangun tombol kontrol bawah."""
@@ -200,86 +2546,336 @@ class CameraApp:
         )
         self.capture_setting_btn.pack(side="left", padx=10, expand=True)
 
+        self.gallery_btn = ctk.CTkButton(
+            button_frame,
+            text="Gallery",
+            font=("Arial", 14),
+            command=self.open_gallery,
+            corner_radius=32,
+            height=40,
+            width=150
+        )
+        self.gallery_btn.pack(side="left", padx=10, expand=True)
+
+    def open_gallery(self):
+        if self.gallery is not None:
+            self.gallery.window.focus_force()
+            return
+        if self.thumbnail_cache is None:
+            self.thumbnail_cache = ThumbnailCache()
+        self.gallery = GalleryWindow(self)
+
     def update_frame(self):
-        """Ambil frame dari kamera, olah, dan tampilkan."""
-        if self.is_updating and self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if not ret:
+        """Ambil frame terbaru dari grabber, olah, dan tampilkan."""
+        if self.is_updating and self.grabber:
+            if self.grabber.failed:
+                # Tetap dijadwalkan ulang agar preview pulih begitu kamera terbuka lagi
+                self.reopen_lost_camera()
+
+            item = self.grabber.latest()
+            # Lewati jika belum ada frame baru sejak tick terakhir
+            if item is not None and item.seq > self.current_frame_seq:
+                self.current_frame_seq = item.seq
+                # Latensi = umur frame sejak dibaca dari kamera sampai ditampilkan
+                age = time.time() - item.timestamp
+                self.preview_latency = 0.9 * self.preview_latency + 0.1 * age
+
+                # Resize ke ukuran canvas + mirror + brightness + RGB tanpa alokasi baru
+                settings = (self.selected_mode.get(), self.brightness_value.get())
+                with PROFILER.span("process"):
+                    processed, frame_rgb = self.preprocessor.process(item.image, *settings)
+
+                # Simpan frame preview (double buffer) dan frame asli untuk stream simpan
+                self.current_frame = processed
+                self.current_raw = item.image
+                self.current_settings = settings
+                self.current_timestamp = item.timestamp
+
+                # Mode trigger: frame mentah (tanpa mirror/brightness) supaya slider tidak memicu capture
+                if self.motion_trigger is not None:
+                    self.check_motion_trigger(item.image, item.timestamp)
+
+                # Deteksi berjalan di worker terpisah; di sini hanya kirim frame & gambar hasil terakhir
+                if self.inference_worker is not None:
+                    if self.inference_worker.due():
+                        self.inference_worker.submit(item.seq, processed.copy())
+                    result = self.inference_worker.latest_result()
+                    if result is not None:
+                        draw_detections(frame_rgb, result.detections)
+
+                # Tulis piksel ke PhotoImage yang sama (tanpa CTkImage baru)
+                with PROFILER.span("render"):
+                    self.renderer.render(frame_rgb)
+                if "first_frame" not in STARTUP.marks:
+                    self.on_first_frame()
+            else:
+                self.renderer.skip()
+
+        # Item yang tidak terdeteksi lagi tetap bisa "missing" walau hasil inferensi berhenti datang
+        if self.checklist is not None:
+            self.checklist.check()
+
+        # Laju polling mengikuti fps kamera terukur
+        fps = self.grabber.fps if self.grabber else 0
+        self.root.after(self.renderer.next_delay_ms(fps), self.update_frame)
+
+    def reopen_lost_camera(self):
+        """Buka ulang kamera aktif di background setelah grabber berhenti karena error."""
+        if self.switching_camera or time.time() < self.reopen_at:
+            return
+        if not self.camera_lost:
+            self.camera_lost = True
+            self.setting_info_label.configure(text="Kamera terputus, mencoba membuka ulang...")
+        self.switching_camera = True
+        threading.Thread(
+            target=self._open_camera_worker,
+            args=(self.current_camera_id, self.selected_resolution.get(), self.source),
+            name="CameraReopen",
+            daemon=True
+        ).start()
+
+    def on_first_frame(self):
+        STARTUP.mark("first_frame")
+        if self.profile_startup:
+            print(f"Startup: {STARTUP.report()}")
+            self.root.after(0, self.on_closing)
+
+    def process_frame(self, frame):
+        """Proses frame sesuai mode dan brightness yang dipilih di GUI."""
+        return process_frame(frame, self.selected_mode.get(), self.brightness_value.get())
+
+    def start_capture_process(self):
+        """Inisiasi proses capture burst dengan indikator visual non-blocking."""
+        if self.motion_trigger is not None:
+            # Tombol berfungsi sebagai Stop selama mode trigger aktif
+            self.stop_motion_trigger()
+            return
+        if self.burst_running:
+            # Tombol berfungsi sebagai Stop selama burst berjalan
+            self.finish_burst("Pengambilan dihentikan")
+            return
+        self.image_index = 0
+        self.images_done = 0
+        self.duplicate_streak = 0
+        self.total_images = self.capture_settings["count"]
+        self.delay_ms = int(self.capture_settings["delay"] * 1000)  # dalam milidetik
+        self.capture_encoder = get_encoder(self.capture_settings["format"], self.capture_settings["level"])
+        # Pembanding duplikat hanya frame dari burst/sesi trigger ini
+        self.deduplicator = FrameDeduplicator() if self.capture_settings["dedup"] else None
+        if self.spool is not None:
+            # Frame tertunda tetap di file dan ikut di-encode setelah burst berikutnya
+            self.spool.close()
+            self.spool = None
+        if self.capture_settings["spool"] and self.current_raw is not None:
+            height, width = self.current_raw.shape[:2]
+            try:
+                self.spool = FrameSpool.for_resolution(width, height)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Spool tidak bisa dibuka, memakai writer biasa: {e}")
+                self.spool = None
+        if self.capture_settings["trigger"]:
+            # Delay dipakai sebagai cooldown antar capture; berjalan sampai Stop ditekan
+            self.total_images = 0
+            self.motion_trigger = MotionTrigger(cooldown=self.capture_settings["delay"])
+            self.start_btn.configure(text="Stop")
+            self.setting_info_label.configure(text="Menunggu perubahan scene...")
+            return
+        self.burst_id += 1
+        self.burst_running = True
+        self.start_btn.configure(text="Stop")
+        self.capture_loop(self.burst_id)
+
+    def finish_burst(self, message=None):
+        """Akhiri burst (selesai, dihentikan, atau gagal) dan encode spool jika ada."""
+        self.burst_running = False
+        self.start_btn.configure(text="Start")
+        # Progres dihitung dari gambar yang benar-benar dikirim ke writer/spool
+        self.total_images = self.image_index
+        self.start_spool_encode()
+        if message is not None and self.setting_info_label is not None:
+            self.setting_info_label.configure(text=message)
+
+    def capture_loop(self, burst_id):
+        """Mengambil sejumlah gambar dengan jeda tertentu untuk kebutuhan dataset burst."""
+        """Loop pengambilan gambar secara non-blocking + indikator visual."""
+        # try:
+        if burst_id != self.burst_id or not self.burst_running:
+            return  # burst sudah dihentikan
+        if self.image_index < self.total_images:
+            if self.grabber is None or self.grabber.failed or self.current_raw is None:
                 messagebox.showerror("Gagal", "Tidak dapat mengambil gambar.")
-                self.is_updating = True
+                self.finish_burst()
                 return
 
-            if ret:
-                # Resize frame ke ukuran canvas tetap
-                resized = cv2.resize(frame, (CANVAS_WIDTH, CANVAS_HEIGHT))
+            # Pastikan tiap gambar berasal dari frame kamera yang berbeda
+            if self.current_frame_seq <= self.last_saved_seq:
+                self.root.after(10, self.capture_loop, burst_id)
+                return
+            self.last_saved_seq = self.current_frame_seq
+
+            if not self.save_current_frame():
+                # Duplikat tidak dihitung; coba lagi dengan frame berikutnya, dengan batas
+                self.duplicate_streak += 1
+                if self.duplicate_streak >= DEDUP_MAX_CONSECUTIVE:
+                    self.finish_burst(f"Scene tidak berubah ({self.duplicate_streak} frame duplikat), "
+                                      f"berhenti di {self.image_index}/{self.capture_settings['count']}")
+                    return
+                self.root.after(10, self.capture_loop, burst_id)
+                return
+            self.duplicate_streak = 0
+            self.image_index += 1
+
+            # ⏳ Delay antar capture, non-blocking
+            if self.image_index < self.total_images:
+                self.root.after(self.delay_ms, self.capture_loop, burst_id)
+            else:
+                self.finish_burst()
+
+        # except Exception as e:
+        #     messagebox.showerror("[ERROR]", f"Terjadi kesalahan saat menyimpan gambar.\n{e}")
 
-                # Simpan frame terakhir untuk disimpan saat klik tombol
-                processed = self.process_frame(resized)
-                self.current_frame = processed.copy()
+    def save_current_frame(self):
+        """Simpan frame terakhir di background; progres dilaporkan lewat poll_write_results.
 
-                # Convert ke ImageTk
-                frame_rgb = cv2.cvtColor(processed, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(frame_rgb)
-                imgtk = ctk.CTkImage(light_image=img, size=(CANVAS_WIDTH, CANVAS_HEIGHT))
+        Kembalikan False jika frame dilewati sebagai duplikat.
+        """
+        if self.grabber is not None:
+            self.grabber.mark_captured(self.current_frame_seq)
+        if self.spool is not None:
+            # Mode spool: hanya salin frame mentah, encode setelah burst selesai
+            with PROFILER.span("capture.spool"):
+                mode, brightness = self.current_settings
+                try:
+                    spooled = self.spool.append(self.current_raw, self.current_timestamp, mode, brightness,
+                                                self.current_camera_id)
+                except ValueError:
+                    spooled = False  # resolusi berubah melebihi ukuran slot
+            if spooled:
+                self.images_done += 1
+                self.update_capture_progress()
+                return True
+            # Spool penuh: lanjut lewat writer biasa
 
-                self.image_label.configure(image=imgtk)
-                self.image_label.image = imgtk
+        # Simpan di resolusi kamera asli dengan mirror/brightness yang sama dengan preview
+        with PROFILER.span("capture.submit"):
+            frame = self.preprocessor.process_native(self.current_raw, *self.current_settings)
+            meta = self.get_capture_meta()
+            duplicate = None
+            if self.capture_settings["dedup"]:
+                with PROFILER.span("capture.dedup"):
+                    duplicate, meta["phash"] = self.deduplicator.check(frame)
+            if duplicate is not None:
+                # Frame hampir identik: tidak di-encode dan tidak dihitung
+                return False
+            self.writer.submit(frame, SAVE_DIR, self.capture_encoder, meta=meta)
+            return True
 
-        self.root.after(10, self.update_frame)
+    def check_motion_trigger(self, frame, timestamp):
+        with PROFILER.span("trigger"):
+            reason = self.motion_trigger.update(frame, timestamp)
+        if reason is None:
+            return
+        if self.save_current_frame():
+            self.total_images += 1
 
-    def process_frame(self, frame):
-        """Proses frame: mirror dan brightness."""
-        # Mirror jika dipilih
-        if self.selected_mode.get() == "Mirror":
-            frame = cv2.flip(frame, 1)
+    def stop_motion_trigger(self):
+        self.motion_trigger = None
+        self.start_btn.configure(text="Start")
+        self.start_spool_encode()
 
-        # Brightness adjustment
-        brightness = self.brightness_value.get()
-        return cv2.convertScaleAbs(frame, alpha=1.0, beta=brightness)
+    def start_spool_encode(self):
+        """Encode isi spool ke dataset/raw di background memakai semua core."""
+        if self.spool is None:
+            return
+        self.spool.close()
+        self.spool = None
+        with self.spool_encode_lock:
+            self.spool_encode_requested = (self.capture_settings["format"], self.capture_settings["level"])
+            if self.spool_encode_running:
+                # Encode yang sedang jalan mengambil ulang slot tertunda setelah selesai
+                return
+            self.spool_encode_running = True
+        threading.Thread(target=self._encode_spool_worker, name="SpoolEncode", daemon=True).start()
 
-    def start_capture_process(self):
-        """Inisiasi proses capture burst dengan indikator visual non-blocking."""
-        self.image_index = 0
-        self.total_images = self.capture_settings["count"]
-        self.delay_ms = int(self.capture_settings["delay"] * 1000)  # dalam milidetik
-        self.capture_loop()
+    def _encode_spool_worker(self):
+        def progress(done, total):
+            text = f"Encode spool {done}/{total}"
+            self.run_on_ui(lambda: self.setting_info_label.configure(text=text))
+        while True:
+            with self.spool_encode_lock:
+                if self.spool_encode_requested is None:
+                    self.spool_encode_running = False
+                    break
+                fmt, level = self.spool_encode_requested
+                self.spool_encode_requested = None
+            try:
+                encode_spool(SPOOL_FILE, SAVE_DIR, fmt, level, manifest=self.manifest, on_progress=progress)
+            except Exception as e:
+                self.run_on_ui(messagebox.showerror, "Gagal Encode Spool", str(e))
+        self.run_on_ui(lambda: self.setting_info_label.configure(text="Pengambilan selesai ✅"))
 
-    def capture_loop(self):
-        """Mengambil sejumlah gambar dengan jeda tertentu untuk kebutuhan dataset burst."""
-        """Loop pengambilan gambar secara non-blocking + indikator visual."""
-        # try:
-        if self.image_index < self.total_images:
-            ret, frame = self.cap.read()
-            if not ret:
-                messagebox.showerror("Gagal", "Tidak dapat mengambil gambar.")
-                return
+    def get_capture_meta(self):
+        """Pengaturan capture untuk dicatat di manifest (sama dengan panel info)."""
+        mode, brightness = self.current_settings
+        return {
+            "captured_at": self.current_timestamp,
+            "camera_id": str(self.current_camera_id),
+            "mode": mode,
+            "resolution": self.selected_resolution.get(),
+            "brightness": brightness,
+            "format": self.capture_settings["format"],
+            "level": self.capture_settings["level"],
+            "source": "gui",
+        }
 
-            # Simpan gambar
-            save_dir = os.path.join(SAVE_DIR)
-            os.makedirs(save_dir, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"image_{timestamp}.jpg" # Tambahkan settingan milih jpg atau png atau yang lain
-            path = os.path.join(SAVE_DIR, filename)
-            cv2.imwrite(path, self.current_frame)
+    def run_on_ui(self, fn, *args):
+        """Jadwalkan `fn(*args)` di main loop Tk (aman dipanggil dari thread lain)."""
+        self.ui_calls.put((fn, args))
 
-            # ✅ Update label info capture (misalnya di panel kiri)
-            if hasattr(self, "setting_info_label"):
-                self.setting_info_label.configure(
-                    text=f"Mengambil gambar {self.image_index + 1}/{self.total_images}"
-                )
+    def poll_ui_calls(self):
+        while True:
+            try:
+                fn, args = self.ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            fn(*args)
+        self.root.after(50, self.poll_ui_calls)
 
-            self.image_index += 1
+    def poll_write_results(self):
+        """Baca hasil writer pool dan perbarui label progres capture."""
+        updated = False
+        while True:
+            try:
+                result = self.write_results.get_nowait()
+            except queue.Empty:
+                break
+            self.images_done += 1
+            updated = True
+            if not result.ok:
+                print(f"[WARN] Gagal menyimpan {result.path}: {result.error}")
+            elif self.gallery is not None:
+                self.gallery.add(result.path)
 
-            # ⏳ Delay antar capture, non-blocking
-            self.root.after(self.delay_ms, self.capture_loop)
+        if updated:
+            self.update_capture_progress()
 
+        self.root.after(50, self.poll_write_results)
+
+    def update_capture_progress(self):
+        if self.setting_info_label is None:
+            return
+        if self.motion_trigger is not None:
+            self.setting_info_label.configure(
+                text=f"Trigger: {self.images_done} tersimpan, menunggu perubahan scene..."
+            )
+        elif self.images_done < self.total_images:
+            # ✅ Update label info capture (misalnya di panel kiri)
+            self.setting_info_label.configure(
+                text=f"Mengambil gambar {self.images_done}/{self.total_images}"
+            )
         else:
             # ✅ Setelah selesai ambil semua gambar
-            if hasattr(self, "setting_info_label"):
-                self.setting_info_label.configure(text="Pengambilan selesai ✅")
-
-        # except Exception as e:
-        #     messagebox.showerror("[ERROR]", f"Terjadi kesalahan saat menyimpan gambar.\n{e}")
+            self.setting_info_label.configure(text="Pengambilan selesai ✅")
 
     # ------------------------------------------------------
     # ----------- Fitur-Fitur Panel Kontrol Atas -----------
@@ -303,51 +2899,123 @@ class CameraApp:
             text="Camera ID:",
             font=("Arial", 12)
             ).pack(anchor="w")
-        camera_menu = ctk.CTkOptionMenu(
+        self.camera_menu = ctk.CTkOptionMenu(
             parent,
             values=self.available_camera_ids,
             variable=self.selected_camera_id,
             command=self.change_camera
         )
-        camera_menu.pack()
-
-    def change_camera(self, selected_id):
-        try:
-            selected_id = int(selected_id)
-            if selected_id == self.current_camera_id:
-                return  # Kamera sama, tidak perlu ganti
+        self.camera_menu.pack()
 
-            if not self.is_camera_available(selected_id):
-                raise ValueError("Kamera tidak tersedia.")
+    def add_camera_id(self, camera_id):
+        """Tambahkan kamera ke menu begitu probing background menemukannya."""
+        if camera_id not in self.available_camera_ids:
+            self.set_camera_ids(self.available_camera_ids + [camera_id])
 
-            # Pause update frame
-            self.is_updating = False
+    def set_camera_ids(self, camera_ids):
+        # Kamera yang sedang aktif selalu tetap ada di menu
+        ids = set(camera_ids) | {str(self.current_camera_id)}
+        self.available_camera_ids = sorted(ids, key=int)
+        self.camera_menu.configure(values=self.available_camera_ids)
 
-            if self.cap.isOpened():
-                self.cap.release()
-                time.sleep(0.3)
+    def start_camera_discovery(self):
+        """Mulai deteksi kamera setelah pembukaan kamera awal selesai (sekali saja).
 
-            self.cap = cv2.VideoCapture(selected_id)
-            self.change_resolution(self.selected_resolution.get())
+        Probing bersamaan dengan pembukaan kamera awal bisa membuat kamera itu
+        gagal di-probe lalu hilang dari cache, jadi ditunggu sampai selesai.
+        """
+        if self.discovery_started:
+            return
+        self.discovery_started = True
+        in_use = [self.current_camera_id] if self.cap is not None and self.source is None else []
+        self.camera_discovery.start(
+            on_found=lambda cid: self.run_on_ui(self.add_camera_id, cid),
+            on_done=lambda cams: self.run_on_ui(self.set_camera_ids, cams),
+            in_use=in_use,
+        )
 
-            # Update ID kamera aktif
-            self.current_camera_id = selected_id
+    def change_camera(self, selected_id):
+        """Buka kamera baru di background lalu tukar begitu frame pertama tiba."""
+        selected_id = int(selected_id)
+        if selected_id == self.current_camera_id or self.switching_camera:
+            return  # Kamera sama atau masih proses ganti
 
-            self.is_updating = True  # resume update
-            self.update_setting_info_display()
+        self.switching_camera = True
+        threading.Thread(
+            target=self._open_camera_worker,
+            args=(selected_id, self.selected_resolution.get()),
+            name="CameraSwitch",
+            daemon=True
+        ).start()
 
+    def _open_camera_worker(self, camera_id, resolution, source=None):
+        cap = open_source(source) if source is not None else open_camera(camera_id)
+        grabber = None
+        try:
+            if not cap.isOpened():
+                raise ValueError("Kamera tidak tersedia.")
+            width, height = RESOLUTIONS[resolution]
+            profile = configure_capture(cap, camera_id, width, height)
+            grabber = FrameGrabber(cap).start()
+            if grabber.wait_for(0, timeout=3.0) is None:
+                raise ValueError("Kamera tidak mengirim frame.")
         except Exception as e:
-            messagebox.showerror(
-                "Gagal Mengganti Kamera",
-                f"Tidak bisa mengakses kamera ID {selected_id}.\n\n{e}"
+            release_camera(cap, grabber)
+            self.run_on_ui(self._camera_switch_failed, camera_id, e)
+            return
+        self.run_on_ui(self._swap_camera, camera_id, cap, grabber, profile)
+
+    def _swap_camera(self, camera_id, cap, grabber, profile):
+        """Tukar kamera aktif secara atomik di main loop Tk."""
+        old_cap, old_grabber = self.cap, self.grabber
+        self.cap, self.grabber = cap, grabber
+        self.capture_profile = profile
+        self.current_frame_seq = 0
+        self.last_saved_seq = 0
+
+        # Update ID kamera aktif
+        self.current_camera_id = camera_id
+        self.switching_camera = False
+        self.camera_lost = False
+        self.update_setting_info_display()
+        self.start_camera_discovery()
+
+        # Kamera lama dilepas di background agar UI tidak tertahan
+        threading.Thread(target=release_camera, args=(old_cap, old_grabber), daemon=True).start()
+
+    def _camera_switch_failed(self, camera_id, error):
+        self.switching_camera = False
+        self.start_camera_discovery()
+        if self.cap is None:
+            self._startup_camera_failed(error)
+            return
+        if self.camera_lost and camera_id == self.current_camera_id:
+            # Kamera aktif terputus: jangan dihapus dari cache, coba lagi nanti
+            self.reopen_at = time.time() + CAMERA_REOPEN_DELAY
+            self.setting_info_label.configure(
+                text=f"Kamera terputus: {error}\nMencoba lagi dalam {CAMERA_REOPEN_DELAY:.0f} detik..."
             )
+            return
+        self.selected_camera_id.set(str(self.current_camera_id))
+        self.camera_discovery.forget(camera_id)
+        messagebox.showerror(
+            "Gagal Mengganti Kamera",
+            f"Tidak bisa mengakses kamera ID {camera_id}.\n\n{error}"
+        )
 
-    def is_camera_available(self, index):
-        test_cap = cv2.VideoCapture(index)
-        if test_cap is None or not test_cap.isOpened():
-            return False
-        test_cap.release()
-        return True
+    def _startup_camera_failed(self, error):
+        """Kamera awal gagal dibuka: belum ada kamera lain, jadi ID tidak dihapus dari daftar."""
+        if self.profile_startup:
+            STARTUP.mark("camera_failed")
+            print(f"Startup: {STARTUP.report()}\n[ERROR] Kamera gagal dibuka: {error}", file=sys.stderr)
+            self.exit_code = 1
+            self.root.after(0, self.on_closing)
+            return
+        messagebox.showerror(
+            "Gagal Membuka Kamera",
+            f"Kamera tidak bisa dibuka saat aplikasi dimulai.\n"
+            f"Pilih kamera lain dari menu Camera ID.\n\n{error}"
+        )
 
     def build_resolution_selector(self, parent):
         ctk.CTkLabel(
@@ -361,27 +3029,42 @@ class CameraApp:
         )
         resolution_menu.pack()
 
-    def change_resolution(self, selected_resolution):
-        try:
-            width, height = map(int, selected_resolution.split("x"))
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        except Exception as e:
-            messagebox.showerror("Resolusi Gagal", f"Resolusi tidak bisa diatur: {e}")
-
     def set_resolution(self, resolution):
-        self.is_updating = False
         try:
             width, height = RESOLUTIONS[resolution]
             if self.cap and self.cap.isOpened():
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+                # Negosiasi profil membaca frame, jadi dijalankan di background
+                self.capture_profile = None
+                threading.Thread(
+                    target=self._configure_capture_worker,
+                    args=(self.grabber, self.current_camera_id, width, height),
+                    name="CaptureProfile",
+                    daemon=True
+                ).start()
 
-            self.is_updating = True
             self.update_setting_info_display()
         except Exception as e:
             messagebox.showerror("Gagal Mengatur Resolusi", str(e))
 
+    def _configure_capture_worker(self, grabber, camera_id, width, height):
+        def progress(fourcc, index, total):
+            text = f"Menyesuaikan kamera: {fourcc} ({index}/{total})..."
+            self.run_on_ui(lambda: self.setting_info_label.configure(text=text))
+        try:
+            # Grabber berhenti membaca selama lock dipegang; frame uji tetap dikirim ke preview
+            with grabber.cap_lock:
+                profile = configure_capture(grabber.cap, camera_id, width, height,
+                                            on_frame=grabber.feed, on_progress=progress)
+        except Exception as e:
+            self.run_on_ui(messagebox.showerror, "Gagal Mengatur Resolusi", str(e))
+            return
+        self.run_on_ui(self._set_capture_profile, grabber, profile)
+
+    def _set_capture_profile(self, grabber, profile):
+        if grabber is self.grabber:  # abaikan jika kamera sudah diganti
+            self.capture_profile = profile
+            self.update_setting_info_display()
+
     # ------------------------------------------------------
     # ----------- Fitur-Fitur Panel Kontrol Kanan ----------
     # ------------------------------------------------------
@@ -443,6 +3126,59 @@ class CameraApp:
         self.brightness_value.set(0)
         self.update_brightness_label(0)
 
+    def build_detection_control(self, parent):
+        """Kontrol deteksi real-time (model YOLO ONNX, CPU)."""
+        ctk.CTkLabel(
+            parent,
+            text="Detection",
+            font=("Arial", 12),
+            anchor="w"
+            ).pack(fill="x", padx=5)
+
+        self.detection_enabled = ctk.BooleanVar(value=False)
+        ctk.CTkSwitch(
+            parent,
+            text="Aktifkan",
+            variable=self.detection_enabled,
+            command=self.toggle_detection
+        ).pack(anchor="w", padx=5, pady=5)
+
+    def toggle_detection(self):
+        if self.detection_enabled.get():
+            # Memuat model bisa lama, jadi dilakukan di background
+            threading.Thread(target=self._load_detector_worker, args=(MODEL_PATH,), daemon=True).start()
+        elif self.inference_worker is not None:
+            self.inference_worker.stop()
+            self.inference_worker = None
+            self.checklist = None
+
+    def _load_detector_worker(self, model_path):
+        try:
+            detector = YoloDetector(model_path)
+            # Checklist diperbarui di thread inferensi; UI hanya menerima event transisi
+            checklist = PackChecklist(detector.labels)
+            checklist.subscribe(lambda event: self.run_on_ui(self.on_checklist_event, event))
+            worker = InferenceWorker(
+                detector,
+                on_result=lambda result: checklist.update(result.detections, result.timestamp)
+            ).start()
+        except Exception as e:
+            self.run_on_ui(self._detection_failed, e)
+            return
+        self.run_on_ui(self._set_inference_worker, worker, checklist)
+
+    def _set_inference_worker(self, worker, checklist):
+        if not self.detection_enabled.get():  # dimatikan selagi model dimuat
+            worker.stop()
+            return
+        self.inference_worker = worker
+        self.checklist = checklist
+        self.update_checklist_display()
+
+    def _detection_failed(self, error):
+        self.detection_enabled.set(False)
+        messagebox.showerror("Gagal Memuat Model", f"Model deteksi tidak dapat dimuat.\n\n{error}")
+
     # ------------------------------------------------------
     # ----------- Fitur-Fitur Panel Kontrol Kiri -----------
     # ------------------------------------------------------
@@ -469,16 +3205,161 @@ class CameraApp:
         )
         self.setting_info_label.pack(fill="x", pady=(0, 5))
 
+        # Label statistik pipeline kamera (diperbarui berkala)
+        self.pipeline_stats_label = ctk.CTkLabel(
+            label_row,
+            text="",
+            font=("Arial", 11),
+            text_color="gray",
+            justify="left",
+            anchor="w"
+        )
+        self.pipeline_stats_label.pack(fill="x", pady=(0, 5))
+
+    def build_checklist_section(self, parent):
+        """Checklist barang bawaan, diperbarui hanya saat ada event transisi."""
+        ctk.CTkLabel(
+            parent,
+            text="Pack Checklist",
+            font=("Arial", 12, "bold"),
+            anchor="w"
+        ).pack(fill="x", padx=5, pady=(5, 5))
+
+        self.checklist_label = ctk.CTkLabel(
+            parent,
+            text="Aktifkan Detection\nuntuk memulai",
+            font=("Arial", 12),
+            justify="left",
+            anchor="w"
+        )
+        self.checklist_label.pack(fill="x", padx=5)
+
+        self.checklist_event_label = ctk.CTkLabel(
+            parent,
+            text="",
+            font=("Arial", 11),
+            text_color="gray",
+            anchor="w"
+        )
+        self.checklist_event_label.pack(fill="x", padx=5, pady=(5, 0))
+
+    def on_checklist_event(self, event):
+        """Dipanggil di main loop Tk untuk setiap transisi (misal "wallet missing")."""
+        self.checklist_event_label.configure(text=describe_event(event))
+        self.update_checklist_display()
+
+    def update_checklist_display(self):
+        if self.checklist is None:
+            return
+        lines = [
+            f"{'✅' if present else '❌'} {item}"
+            for item, (present, _) in self.checklist.status().items()
+        ]
+        self.checklist_label.configure(text="\n".join(lines) or "Model tanpa label")
+
+    def build_profiler_section(self, parent):
+        """Overlay profiler: waktu p50/p99 per tahap, counter, dan ekspor trace."""
+        self.profiler_enabled = ctk.BooleanVar(value=PROFILER.enabled)
+        ctk.CTkCheckBox(
+            parent,
+            text="Profiler",
+            font=("Arial", 12, "bold"),
+            variable=self.profiler_enabled,
+            command=self.toggle_profiler
+        ).pack(anchor="w", padx=5, pady=(5, 5))
+
+        self.profiler_label = ctk.CTkLabel(
+            parent,
+            text="",
+            font=("Arial", 11),
+            justify="left",
+            anchor="w"
+        )
+        self.profiler_label.pack(fill="x", padx=5)
+
+        ctk.CTkButton(
+            parent,
+            text="Export Trace",
+            font=("Arial", 12),
+            command=self.export_profiler_trace,
+            height=20
+        ).pack(side="bottom", pady=5)
+
+    def toggle_profiler(self):
+        PROFILER.enabled = self.profiler_enabled.get()
+        PROFILER.tracing = PROFILER.enabled
+        if PROFILER.enabled:
+            PROFILER.reset()
+        else:
+            self.profiler_label.configure(text="")
+
+    def export_profiler_trace(self):
+        path = os.path.join(CACHE_DIR, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        count = PROFILER.export_trace(path)
+        messagebox.showinfo("Trace Tersimpan", f"{count} event disimpan ke:\n{os.path.abspath(path)}")
+
     def get_capture_setting_text(self):
         return (
             f"Total Image: {self.capture_settings['count']}\n"
             f"Delay: {self.capture_settings['delay']} s\n"
+            f"Format: {self.capture_settings['format']} ({self.capture_settings['level']})\n"
+            f"Skip Duplikat: {'On' if self.capture_settings['dedup'] else 'Off'}\n"
+            f"Trigger: {'Motion' if self.capture_settings['trigger'] else 'Off'}\n"
+            f"Spool: {'On' if self.capture_settings['spool'] else 'Off'}\n"
             f"Camera ID: {self.selected_camera_id.get()}\n"
             f"Mode: {self.selected_mode.get()}\n"
             f"Resolution: {self.selected_resolution.get()}\n"
             f"Brightness: {self.brightness_value.get()}\n"
         )
 
+    def get_pipeline_stats_text(self):
+        if self.grabber is None:
+            return "Membuka kamera...\n"
+        stats = self.grabber.stats()
+        writer = self.writer.stats()
+        return (
+            f"Profile: {describe_profile(self.capture_profile)}\n"
+            f"Camera FPS: {stats['fps']:.1f}\n"
+            f"Latency: {self.preview_latency * 1000:.0f} ms\n"
+            f"Rendered: {self.renderer.rendered} (skip {self.renderer.skipped})\n"
+            f"Frames: {stats['frames']}\n"
+            f"Dropped: {stats['dropped']}\n"
+            f"Stale: {stats['stale']}\n"
+            f"Write queue: {writer['queued']}\n"
+            f"{self.get_dedup_stats_text()}"
+            f"{self.get_trigger_stats_text()}"
+            f"{self.get_inference_stats_text()}"
+        )
+
+    def get_dedup_stats_text(self):
+        if self.deduplicator is None:
+            return ""
+        stats = self.deduplicator.stats()
+        return f"Duplikat: {stats['skipped']}/{stats['checked']} ({stats['ratio'] * 100:.0f}% skip)\n"
+
+    def get_trigger_stats_text(self):
+        if self.motion_trigger is None:
+            return ""
+        stats = self.motion_trigger.stats()
+        return f"Trigger: {stats['triggers']} capture (scene {stats['score'] * 100:.1f}%)\n"
+
+    def get_inference_stats_text(self):
+        if self.inference_worker is None:
+            return ""
+        stats = self.inference_worker.stats()
+        return (
+            f"Inference: {stats['fps']:.1f} fps, {stats['latency_ms']:.0f} ms\n"
+            f"Input size: {stats['input_size']} (skip {stats['dropped']})\n"
+        )
+
+    def update_pipeline_stats(self):
+        """Perbarui label statistik pipeline setiap detik."""
+        if self.pipeline_stats_label is not None:
+            self.pipeline_stats_label.configure(text=self.get_pipeline_stats_text())
+        if PROFILER.enabled and getattr(self, "profiler_label", None) is not None:
+            self.profiler_label.configure(text=PROFILER.overlay_text())
+        self.root.after(1000, self.update_pipeline_stats)
+
     def update_setting_info_display(self):
         try:
             self.setting_info_label.configure(text=self.get_capture_setting_text())
@@ -502,7 +3383,7 @@ class CameraApp:
 
         popup = ctk.CTkToplevel(self.root)
         popup.title("Pengaturan Capture Gambar")
-        popup.geometry("420x250")
+        popup.geometry("420x430")
         popup.transient(self.root)         # Supaya tetap di depan
         popup.grab_set()                   # Modal: tidak bisa interaksi jendela utama
         popup.focus_force()
@@ -545,6 +3426,66 @@ class CameraApp:
         delay_entry.insert(0, "0.2")
         delay_entry.grid(row=1, column=1, sticky="ew", padx=5, pady=(10, 0))
 
+        # INPUT : Format file
+        ctk.CTkLabel(
+            content,
+            text="Format:",
+            font=("Arial", 12),
+            anchor="w").grid(row=2, column=0, sticky="w", padx=5, pady=(10, 0))
+
+        format_var = ctk.StringVar(value=self.capture_settings["format"])
+        level_label = ctk.CTkLabel(content, font=("Arial", 12), anchor="w")
+        level_label.grid(row=3, column=0, sticky="w", padx=5, pady=(10, 0))
+
+        def update_level_label(fmt):
+            spec = IMAGE_FORMATS[fmt]
+            level_label.configure(text=f"{spec['option']} ({spec['range'][0]}-{spec['range'][1]}):")
+
+        def on_format_change(fmt):
+            update_level_label(fmt)
+            level_entry.delete(0, "end")
+            level_entry.insert(0, str(IMAGE_FORMATS[fmt]["default"]))
+
+        ctk.CTkOptionMenu(
+            content,
+            values=list(IMAGE_FORMATS.keys()),
+            variable=format_var,
+            command=on_format_change
+        ).grid(row=2, column=1, sticky="ew", padx=5, pady=(10, 0))
+
+        # INPUT : Kualitas / kompresi
+        level_entry = ctk.CTkEntry(content)
+        level_entry.insert(0, str(self.capture_settings["level"]))
+        level_entry.grid(row=3, column=1, sticky="ew", padx=5, pady=(10, 0))
+        update_level_label(format_var.get())
+
+        # INPUT : Lewati frame yang hampir identik
+        dedup_var = ctk.BooleanVar(value=self.capture_settings["dedup"])
+        ctk.CTkCheckBox(
+            content,
+            text="Skip frame duplikat",
+            variable=dedup_var,
+            font=("Arial", 12)
+        ).grid(row=4, column=0, columnspan=2, sticky="w", padx=5, pady=(10, 0))
+
+        # INPUT : Capture hanya saat scene berubah (delay = cooldown)
+        trigger_var = ctk.BooleanVar(value=self.capture_settings["trigger"])
+        ctk.CTkCheckBox(
+            content,
+            text="Trigger gerakan (delay = cooldown)",
+            variable=trigger_var,
+            font=("Arial", 12)
+        ).grid(row=5, column=0, columnspan=2, sticky="w", padx=5, pady=(10, 0))
+
+        # INPUT : Simpan frame mentah dulu, encode setelah burst selesai
+        spool_var = ctk.BooleanVar(value=self.capture_settings["spool"])
+        ctk.CTkCheckBox(
+            content,
+            text="Spool (encode setelah burst)",
+            variable=spool_var,
+            font=("Arial", 12)
+        ).grid(row=6, column=0, columnspan=2, sticky="w", padx=5, pady=(10, 0))
+
         # Tombol Simpan
         def save_settings():
             try:
@@ -556,12 +3497,24 @@ class CameraApp:
             except ValueError:
                 delay = 0.2
 
+            fmt = format_var.get()
+            try:
+                # Encoder membatasi nilai ke rentang yang valid
+                level = get_encoder(fmt, int(level_entry.get())).level
+            except ValueError:
+                level = IMAGE_FORMATS[fmt]["default"]
+
             if not count:
                 messagebox.showwarning("Jumlah Gambar Kosong", "Mohon masukkan jumlah gambar.")
                 return
 
             self.capture_settings["count"] = count
             self.capture_settings["delay"] = delay
+            self.capture_settings["format"] = fmt
+            self.capture_settings["level"] = level
+            self.capture_settings["dedup"] = dedup_var.get()
+            self.capture_settings["trigger"] = trigger_var.get()
+            self.capture_settings["spool"] = spool_var.get()
             self.update_setting_info_display()
 
             popup.destroy()
@@ -575,7 +3528,7 @@ class CameraApp:
             corner_radius=32,
             height=32
         )
-        save_btn.grid(row=2, column=0, columnspan=2, pady=(20, 10))
+        save_btn.grid(row=7, column=0, columnspan=2, pady=(20, 10))
 
         # Handle saat popup ditutup manual
         def on_close():
@@ -587,22 +3540,781 @@ class CameraApp:
 # ------------------------------------------------------
     def on_closing(self):
         """Lepaskan kamera dan keluar aplikasi."""
-        if self.cap.isOpened():
-            self.cap.release()
+        if self.inference_worker is not None:
+            self.inference_worker.stop()
+        release_camera(self.cap, self.grabber)
+        if self.thumbnail_cache is not None:
+            self.thumbnail_cache.close()
+        self.writer.close(timeout=5.0)
+        self.manifest.close()
         self.root.destroy()
 
 
-def detect_available_cameras(max_tested=5):
-    available = []
-    for i in range(max_tested):
-        cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-        if cap.isOpened():
-            available.append(str(i))
+# ---------------------------------------------------
+# ------------------ Mode Headless ------------------
+# ---------------------------------------------------
+def parse_resolution(value):
+    """Ubah teks "WxH" menjadi tuple (width, height)."""
+    try:
+        width, height = map(int, value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Resolusi tidak valid: {value} (contoh: 1280x720)")
+    return width, height
+
+
+def run_headless_capture(args):
+    """Burst capture tanpa GUI dengan penjadwalan fps yang dikoreksi drift."""
+    if args.spool:
+        return run_spool_capture(args)
+    cap = open_source(args.source) if args.source else open_camera(args.camera)
+    if not cap.isOpened():
+        print(f"[ERROR] Sumber {args.source or args.camera} tidak dapat dibuka.", file=sys.stderr)
+        return 1
+
+    width, height = source_resolution(args.res, args.source)
+    profile = configure_capture(cap, args.camera, width, height)
+    print(f"Profil kamera: {describe_profile(profile)}")
+    grabber = FrameGrabber(cap).start()
+    manifest = CaptureManifest(os.path.join(args.out, os.path.basename(MANIFEST_FILE)))
+    writer = ImageWriterPool(workers=args.workers, policy=args.policy, manifest=manifest)
+    deduplicator = None
+    if args.dedup is not None:
+        deduplicator = FrameDeduplicator(args.dedup, manifest_path=manifest.path if args.dedup_history else None)
+    trigger = None
+    if args.trigger:
+        trigger = MotionTrigger(args.trigger_threshold, args.cooldown, args.max_interval)
+    encoder = get_encoder(args.format, args.quality)
+    meta = {
+        "camera_id": args.source or str(args.camera),
+        "mode": args.mode,
+        "resolution": f"{width}x{height}",
+        "brightness": args.brightness,
+        "format": encoder.fmt,
+        "level": encoder.level,
+        "source": "headless",
+    }
+    print(f"Encoder: {encoder.describe()}")
+
+    # Mode trigger memeriksa setiap frame kamera; fps hanya untuk mode burst
+    period = 1.0 / args.fps if args.fps > 0 and trigger is None else 0.0
+    saved = 0
+    skipped = 0
+    duplicate_streak = 0
+    attempts = 0
+    late = 0
+    last_seq = 0
+    start = time.perf_counter()
+    try:
+        # Hanya frame yang benar-benar disimpan dihitung terhadap --count
+        while saved < args.count:
+            # Jadwal absolut (start + i * period) supaya error tidak menumpuk
+            target = start + attempts * period
+            attempts += 1
+            now = time.perf_counter()
+            if now < target:
+                time.sleep(target - now)
+            elif period and now - target > period:
+                late += 1
+
+            item = grabber.wait_for(last_seq, timeout=2.0)
+            if item is None:
+                print("[ERROR] Tidak ada frame dari kamera.", file=sys.stderr)
+                return 1
+            last_seq = item.seq
+
+            if trigger is not None:
+                with PROFILER.span("trigger"):
+                    if trigger.update(item.image, item.timestamp) is None:
+                        continue
+
+            with PROFILER.span("process"):
+                frame = process_frame(item.image, args.mode, args.brightness)
+            frame_meta = dict(meta, captured_at=item.timestamp)
+            if deduplicator is not None:
+                with PROFILER.span("dedup"):
+                    duplicate, frame_meta["phash"] = deduplicator.check(frame)
+                if duplicate is not None:
+                    skipped += 1
+                    duplicate_streak += 1
+                    if trigger is None and duplicate_streak >= args.dedup_max_skips:
+                        print(f"[WARN] Scene tidak berubah selama {duplicate_streak} frame; berhenti di "
+                              f"{saved}/{args.count}.", file=sys.stderr)
+                        break
+                    continue
+            duplicate_streak = 0
+            writer.submit(frame, args.out, encoder, meta=frame_meta)
+            grabber.mark_captured(item.seq)
+            saved += 1
+
+        capture_elapsed = time.perf_counter() - start
+        writer.join()
+        total_elapsed = time.perf_counter() - start
+    except KeyboardInterrupt:
+        capture_elapsed = total_elapsed = time.perf_counter() - start
+        print("\nDibatalkan.")
+    finally:
+        release_camera(cap, grabber)
+        writer.close()
+        manifest.close()
+
+    grab_stats = grabber.stats()
+    write_stats = writer.stats()
+    print(
+        f"Selesai: {saved} frame dalam {capture_elapsed:.2f} s "
+        f"({saved / capture_elapsed if capture_elapsed else 0:.2f} fps, target {args.fps:g} fps)\n"
+        f"Duplikat dilewati: {skipped}"
+        f"{f' | frame diperiksa trigger: {trigger.frames}' if trigger is not None else ''}\n"
+        f"Tersimpan: {write_stats['written']} | gagal: {write_stats['failed']} | "
+        f"dibuang writer: {write_stats['dropped']} | spill: {write_stats['spilled']}\n"
+        f"Frame kamera: {grab_stats['frames']} | dropped: {grab_stats['dropped']} | "
+        f"terlambat: {late} | total termasuk flush: {total_elapsed:.2f} s"
+    )
+    return 0
+
+
+def run_spool_capture(args):
+    """Burst ke spool memory-mapped pada laju penuh kamera; encode batch sesudahnya.
+
+    Frame dibaca langsung ke slot spool (cap.read(view)), tanpa grabber,
+    salinan, atau encode di jalur capture.
+    """
+    cap = open_source(args.source) if args.source else open_camera(args.camera)
+    if not cap.isOpened():
+        print(f"[ERROR] Sumber {args.source or args.camera} tidak dapat dibuka.", file=sys.stderr)
+        return 1
+    width, height = source_resolution(args.res, args.source)
+    profile = configure_capture(cap, args.camera, width, height)
+    print(f"Profil kamera: {describe_profile(profile)}")
+
+    ret, first = cap.read()
+    if not ret:
+        cap.release()
+        print("[ERROR] Tidak ada frame dari kamera.", file=sys.stderr)
+        return 1
+    shape = first.shape
+    try:
+        spool = FrameSpool.for_resolution(shape[1], shape[0], args.spool_size, args.spool)
+    except (OSError, ValueError) as e:
+        cap.release()
+        print(f"[ERROR] Spool tidak bisa dibuka: {e}", file=sys.stderr)
+        return 1
+    if int(np.prod(shape)) > spool.slot_size:
+        # Spool masih berisi frame tertunda dari resolusi yang lebih kecil
+        print(f"[ERROR] Frame {shape[1]}x{shape[0]} lebih besar dari slot spool dan masih ada "
+              f"{len(spool.pending())} frame tertunda; jalankan spool-encode dulu.", file=sys.stderr)
+        cap.release()
+        spool.close()
+        return 1
+    camera_id = args.source or str(args.camera)
+    print(f"Spool: {args.spool} ({spool.slots} slot, {len(spool.pending())} tertunda)")
+
+    period = 1.0 / args.fps if args.fps > 0 else 0.0
+    saved = 0
+    start = time.perf_counter()
+    try:
+        while saved < args.count:
+            target = start + saved * period
+            now = time.perf_counter()
+            if now < target:
+                time.sleep(target - now)
+
+            reserved = spool.reserve(shape)
+            if reserved is None:
+                print("[WARN] Spool penuh; encode dulu (spool-encode) atau perbesar --spool-size.")
+                break
+            slot, view = reserved
+            with PROFILER.span("cap.read"):
+                ret, frame = cap.read(view)
+            if not ret:
+                print("[ERROR] Gagal membaca frame.", file=sys.stderr)
+                break
+            if frame is not view:
+                if frame.shape != shape:
+                    print(f"[ERROR] Ukuran frame berubah: {frame.shape}", file=sys.stderr)
+                    break
+                np.copyto(view, frame)  # backend tidak bisa menulis ke buffer kita
+            spool.commit(slot, shape, time.time(), args.mode, args.brightness, camera_id)
+            saved += 1
+    except KeyboardInterrupt:
+        print("\nDibatalkan.")
+    finally:
+        cap.release()
+        spool.close()
+    capture_elapsed = time.perf_counter() - start
+    print(f"Spool: {saved} frame dalam {capture_elapsed:.2f} s "
+          f"({saved / capture_elapsed if capture_elapsed else 0:.1f} fps)")
+
+    if args.defer:
+        print(f"Encode ditunda; jalankan: python app.py spool-encode --spool {args.spool}")
+        return 0
+    # --workers milik writer biasa; encode batch memakai semua core
+    return report_spool_encode(args.spool, args.out, args.format, args.quality)
+
+
+def run_spool_encode(args):
+    if not os.path.exists(args.spool):
+        print(f"[ERROR] Spool tidak ditemukan: {args.spool}", file=sys.stderr)
+        return 1
+    return report_spool_encode(args.spool, args.out, args.format, args.quality, args.workers)
+
+
+def report_spool_encode(path, out_dir, fmt, quality, workers=None):
+    """Encode frame tertunda di spool ke folder output dan cetak throughput."""
+    manifest = CaptureManifest(os.path.join(out_dir, os.path.basename(MANIFEST_FILE)))
+    start = time.perf_counter()
+    try:
+        done = encode_spool(path, out_dir, fmt, quality, workers, manifest)
+    finally:
+        manifest.close()
+    elapsed = time.perf_counter() - start
+    print(f"Encode: {done} gambar dalam {elapsed:.2f} s "
+          f"({done / elapsed if elapsed else 0:.1f} gambar/s, {workers or os.cpu_count()} proses)")
+    return 0
+
+
+def parse_camera_list(value):
+    """'0,1,synthetic:640x480@30' -> ['0', '1', 'synthetic:640x480@30']."""
+    cameras = [c.strip() for c in value.split(",") if c.strip()]
+    if len(set(cameras)) != len(cameras) or len(cameras) < 2:
+        raise argparse.ArgumentTypeError("Minimal dua kamera berbeda, misal 0,1")
+    return cameras
+
+
+def run_multi_capture(args):
+    """Capture serentak dari beberapa kamera; satu set frame berbagi nomor urut."""
+    resolutions = {spec: source_resolution(args.res, spec) for spec in args.cameras}
+    caps = {}
+    try:
+        for spec in args.cameras:
+            cap = open_camera(int(spec)) if spec.isdigit() else open_source(spec)
+            if not cap.isOpened():
+                print(f"[ERROR] Sumber {spec} tidak dapat dibuka.", file=sys.stderr)
+                return 1
+            caps[spec] = cap
+            width, height = resolutions[spec]
+            profile = configure_capture(cap, int(spec) if spec.isdigit() else spec, width, height)
+            print(f"Kamera {spec}: {describe_profile(profile)}")
+    except Exception:
+        for cap in caps.values():
             cap.release()
-    return available
+        raise
 
+    period = 1.0 / args.fps if args.fps > 0 else 0.0
+    # Grabber yang mengatur jadwal: hanya set yang akan disimpan yang di-decode
+    grabber = MultiCameraGrabber(caps, period=period).start()
+    manifest = CaptureManifest(os.path.join(args.out, os.path.basename(MANIFEST_FILE)))
+    writer = ImageWriterPool(workers=args.workers, policy=args.policy, manifest=manifest)
+    encoder = get_encoder(args.format, args.quality)
+    meta = {
+        "mode": args.mode,
+        "brightness": args.brightness,
+        "format": encoder.fmt,
+        "level": encoder.level,
+        "source": "multi",
+    }
 
-if __name__ == "__main__":
+    saved = 0
+    last_seq = 0
+    start = time.perf_counter()
+    try:
+        while saved < args.count:
+            frame_set = grabber.wait_for(last_seq, timeout=max(2.0, 2 * period))
+            if frame_set is None:
+                reason = grabber.error or "Tidak ada frame set lengkap dari kamera."
+                print(f"[ERROR] {reason}", file=sys.stderr)
+                return 1
+            last_seq = frame_set.seq
+
+            saved += 1
+            for camera_id, image in frame_set.frames.items():
+                with PROFILER.span("process"):
+                    frame = process_frame(image, args.mode, args.brightness)
+                # Nama file: set<nomor bersama>_cam<id>_..., nomor set sama untuk semua kamera
+                label = camera_id if camera_id.isdigit() else str(list(caps).index(camera_id))
+                writer.submit(
+                    frame, args.out, encoder,
+                    meta=dict(
+                        meta, camera_id=camera_id, captured_at=frame_set.timestamp,
+                        resolution="{}x{}".format(*resolutions[camera_id]),
+                    ),
+                    prefix=f"set{frame_set.seq:06d}_cam{label}",
+                )
+        elapsed = time.perf_counter() - start
+        writer.join()
+    except KeyboardInterrupt:
+        elapsed = time.perf_counter() - start
+        print("\nDibatalkan.")
+    finally:
+        grabber.stop()
+        writer.close()
+        manifest.close()
+        for cap in caps.values():
+            cap.release()
+
+    stats = grabber.stats()
+    write_stats = writer.stats()
+    per_camera = ", ".join(f"{cid}: {fps:.1f}" for cid, fps in stats["camera_fps"].items())
+    print(
+        f"Selesai: {saved} set x {len(caps)} kamera dalam {elapsed:.2f} s "
+        f"({saved / elapsed if elapsed else 0:.2f} set/s)\n"
+        f"FPS per kamera: {per_camera} | set lengkap: {stats['sets']} (tidak lengkap {stats['incomplete']})\n"
+        f"Skew antar kamera: rata-rata {stats['skew_avg_ms']:.1f} ms, maks {stats['skew_max_ms']:.1f} ms\n"
+        f"Tersimpan: {write_stats['written']} | gagal: {write_stats['failed']} | "
+        f"dibuang writer: {write_stats['dropped']}"
+    )
+    return 0
+
+
+# ---------------------------------------------------
+# -------------------- Benchmark --------------------
+# ---------------------------------------------------
+def time_per_frame(fn, frames, repeat, rounds=3):
+    """Waktu (ms) per pemanggilan `fn(frame)`, diambil ronde tercepat agar stabil."""
+    for frame in frames[:2]:  # warm-up
+        fn(frame)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for frame in frames:
+                fn(frame)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / (repeat * len(frames))
+
+
+def run_preprocess_benchmark(args):
+    """Bandingkan jalur preview lama (process_frame) dengan FramePreprocessor."""
+    rng = np.random.default_rng(0)
+    canvas = (CANVAS_WIDTH, CANVAS_HEIGHT)
+
+    def legacy(frame):
+        resized = cv2.resize(frame, canvas)
+        processed = process_frame(resized, args.mode, args.brightness)
+        current = processed.copy()
+        return current, cv2.cvtColor(processed, cv2.COLOR_BGR2RGB)
+
+    print(f"mode={args.mode} brightness={args.brightness} repeat={args.repeat}")
+    for name, (width, height) in RESOLUTIONS.items():
+        frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+        pre = FramePreprocessor(canvas)
+
+        expected_bgr, expected_rgb = legacy(frames[0])
+        bgr, rgb = pre.process(frames[0], args.mode, args.brightness)
+        identical = np.array_equal(expected_bgr, bgr) and np.array_equal(expected_rgb, rgb)
+
+        legacy_ms = time_per_frame(legacy, frames, args.repeat)
+        fused_ms = time_per_frame(lambda f: pre.process(f, args.mode, args.brightness), frames, args.repeat)
+        print(
+            f"{name:>9}: process_frame {legacy_ms:6.3f} ms | preprocessor {fused_ms:6.3f} ms | "
+            f"speedup {legacy_ms / fused_ms:4.2f}x | identik: {identical}"
+        )
+    return 0
+
+
+def load_sample_frames(source, limit):
+    """Baca beberapa gambar dari folder dataset untuk bahan benchmark."""
+    names = sorted(n for n in os.listdir(source) if n.lower().endswith((".jpg", ".jpeg", ".png", ".webp")))
+    frames = []
+    for name in names[:limit]:
+        frame = cv2.imread(os.path.join(source, name))
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+def run_encode_benchmark(args):
+    """Bandingkan waktu encode dan ukuran file semua backend encoder."""
+    frames = load_sample_frames(args.source, args.limit) if os.path.isdir(args.source) else []
+    if not frames:
+        print(f"[ERROR] Tidak ada gambar di {args.source}", file=sys.stderr)
+        return 1
+
+    shape = frames[0].shape
+    print(f"{len(frames)} frame dari {args.source} ({shape[1]}x{shape[0]}), repeat={args.repeat}")
+    for fmt, backends in ENCODERS.items():
+        for cls in backends:
+            if not cls.available():
+                print(f"{fmt:>5} {cls.backend:<10}: tidak tersedia")
+                continue
+            encoder = cls(args.level if args.level is not None else None)
+            size = sum(len(encoder.encode(f)) for f in frames) / len(frames)
+            ms = time_per_frame(encoder.encode, frames, args.repeat)
+            print(f"{fmt:>5} {cls.backend:<10}: {ms:7.2f} ms/frame | {size / 1024:8.1f} KiB/frame | level {encoder.level}")
+    return 0
+
+
+def peak_rss_mb():
+    """Puncak memori (RSS) proses dalam MB, atau None jika tidak bisa diukur."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize_timings(samples):
+    values = np.asarray(samples) * 1000
+    return {
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def run_pipeline_benchmark(args):
+    """Jalankan read -> process -> render -> encode tanpa GUI dan laporkan per tahap."""
+    cap = open_source(args.source)
+    if not cap.isOpened():
+        print(f"[ERROR] Sumber {args.source} tidak dapat dibuka.", file=sys.stderr)
+        return 1
+    if args.res:
+        apply_capture_profile(cap, *args.res)
+    if isinstance(cap, ReplaySource) and args.source_fps is None:
+        cap.set(cv2.CAP_PROP_FPS, 0)  # replay dibaca secepatnya kecuali diminta lain
+    elif args.source_fps is not None:
+        cap.set(cv2.CAP_PROP_FPS, args.source_fps)
+
+    from PIL import Image  # render diukur tanpa memuat modul GUI lain
+
+    preprocessor = FramePreprocessor((CANVAS_WIDTH, CANVAS_HEIGHT))
+    encoder = get_encoder(args.format)
+    stages = {"read": [], "process": [], "render": [], "encode": []}
+    frames = 0
+    start = time.perf_counter()
+    try:
+        while frames < args.frames:
+            t0 = time.perf_counter()
+            ret, frame = cap.read()
+            t1 = time.perf_counter()
+            if not ret:
+                break
+            _, frame_rgb = preprocessor.process(frame, args.mode, args.brightness)
+            native = preprocessor.process_native(frame, args.mode, args.brightness)
+            t2 = time.perf_counter()
+            # Render tanpa Tk: konversi ke PIL.Image + salin piksel seperti PhotoImage.paste
+            Image.fromarray(frame_rgb).tobytes()
+            t3 = time.perf_counter()
+            encoder.encode(native)
+            t4 = time.perf_counter()
+
+            stages["read"].append(t1 - t0)
+            stages["process"].append(t2 - t1)
+            stages["render"].append(t3 - t2)
+            stages["encode"].append(t4 - t3)
+            frames += 1
+    finally:
+        cap.release()
+    elapsed = time.perf_counter() - start
+
+    if not frames:
+        print("[ERROR] Tidak ada frame yang terbaca.", file=sys.stderr)
+        return 1
+
+    rss = peak_rss_mb()
+    result = {
+        "source": args.source,
+        "frames": frames,
+        "shape": list(frame.shape) if frame is not None else None,
+        "encoder": encoder.describe(),
+        "fps": round(frames / elapsed, 2),
+        "stages": {name: summarize_timings(samples) for name, samples in stages.items()},
+        "peak_rss_mb": round(rss, 1) if rss is not None else None,
+    }
+
+    print(f"Sumber: {args.source} | {frames} frame | {result['fps']} fps | peak RSS: {result['peak_rss_mb']} MB")
+    for name, stat in result["stages"].items():
+        print(f"{name:>8}: p50 {stat['p50_ms']:8.3f} ms | p99 {stat['p99_ms']:8.3f} ms | mean {stat['mean_ms']:8.3f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        min_fps = baseline["fps"] * (1 - args.tolerance)
+        if result["fps"] < min_fps:
+            print(f"[REGRESI] fps {result['fps']} < {min_fps:.2f} (baseline {baseline['fps']})", file=sys.stderr)
+            return 2
+    return 0
+
+
+def parse_date(value):
+    """Terima "YYYY-mm-dd", "YYYY-mm-dd HH:MM", atau epoch detik."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Tanggal tidak valid: {value}")
+
+
+def run_manifest_query(args):
+    """Filter dan ekspor subset capture berdasarkan manifest (tanpa membaca piksel)."""
+    if not os.path.exists(args.manifest):
+        print(f"[ERROR] Manifest tidak ditemukan: {args.manifest}", file=sys.stderr)
+        return 1
+    rows = query_manifest(
+        args.manifest, camera_id=args.camera, mode=args.mode, resolution=args.res,
+        fmt=args.format, since=args.since, until=args.until, session=args.session, tag=args.tag,
+        limit=args.limit,
+    )
+
+    if args.copy_to:
+        os.makedirs(args.copy_to, exist_ok=True)
+        for row in rows:
+            dst = os.path.join(args.copy_to, os.path.basename(row["path"]))
+            if os.path.exists(dst) or not os.path.exists(row["path"]):
+                continue
+            try:
+                os.link(row["path"], dst)
+            except OSError:
+                shutil.copy2(row["path"], dst)
+        print(f"{len(rows)} file diekspor ke {args.copy_to}")
+    elif args.output == "paths":
+        for row in rows:
+            print(row["path"])
+    elif args.output == "json":
+        for row in rows:
+            print(json.dumps(row))
+    else:
+        total = sum(row["file_size"] or 0 for row in rows)
+        print(f"{len(rows)} capture | {total / (1024 * 1024):.1f} MB")
+        groups = {}
+        for row in rows:
+            key = (row["camera_id"], row["mode"], f"{row['width']}x{row['height']}", row["format"])
+            groups[key] = groups.get(key, 0) + 1
+        for (camera_id, mode, size, fmt), count in sorted(groups.items(), key=str):
+            print(f"  camera {camera_id} | {mode:<7} | {size:>9} | {fmt}: {count}")
+    return 0
+
+
+def hash_image_file(path):
+    """dHash dari file gambar; decode JPEG diperkecil (1/8) agar cepat."""
+    image = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    return None if image is None else dhash(image)
+
+
+def run_dedupe(args):
+    """Cari (dan opsional pindahkan) gambar hampir identik di folder yang sudah ada.
+
+    File diurutkan berdasarkan nama (= urutan waktu capture), yang pertama
+    dipertahankan. Semua hash dihitung paralel dari file dengan decode yang sama
+    (hash manifest berasal dari frame resolusi penuh, jadi tidak sebanding);
+    tiap file cukup satu query BK-tree sehingga total waktunya hampir linear.
+    File yang dipindah/dihapus juga dihapus dari manifest folder tersebut.
+    """
+    if not os.path.isdir(args.folder):
+        print(f"[ERROR] Folder tidak ditemukan: {args.folder}", file=sys.stderr)
+        return 1
+    names = sorted(n for n in os.listdir(args.folder) if n.lower().endswith(ReplaySource.IMAGE_EXTENSIONS))
+    paths = [os.path.join(args.folder, n) for n in names]
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+        hashes = dict(zip(paths, pool.map(hash_image_file, paths)))
+
+    deduplicator = FrameDeduplicator(args.threshold)
+    duplicates = []
+    for path in paths:
+        phash = hashes[path]
+        if phash is None:
+            continue
+        original = deduplicator.check_hash(phash, path)
+        if original is not None:
+            duplicates.append((path, original))
+
+    for path, original in duplicates:
+        if args.move_to:
+            os.makedirs(args.move_to, exist_ok=True)
+            shutil.move(path, os.path.join(args.move_to, os.path.basename(path)))
+        elif args.delete:
+            os.remove(path)
+        else:
+            print(f"{path}  ~  {original}")
+
+    manifest_path = os.path.join(args.folder, os.path.basename(MANIFEST_FILE))
+    if (args.move_to or args.delete) and duplicates and os.path.exists(manifest_path):
+        forget_captures([path for path, _ in duplicates], manifest_path)
+
+    action = "dipindahkan" if args.move_to else "dihapus" if args.delete else "ditemukan"
+    print(f"{len(duplicates)} dari {len(paths)} gambar duplikat {action}")
+    return 0
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="OutReady - Capture Image")
+    parser.add_argument("--source", default=None,
+                        help="Sumber preview GUI selain kamera 0: synthetic[:WxH][@FPS], file video, atau folder gambar")
+    parser.add_argument("--profile", action="store_true", help="Aktifkan profiler per tahap sejak awal")
+    parser.add_argument("--trace", default=None, help="Simpan Chrome trace ke file ini saat keluar")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Ukur waktu sampai jendela tampil dan frame pertama, lalu keluar")
+    subparsers = parser.add_subparsers(dest="command")
+
+    capture = subparsers.add_parser("capture", help="Burst capture headless tanpa GUI")
+    capture.add_argument("--camera", type=int, default=0, help="ID kamera")
+    # --source juga ada di parser utama; SUPPRESS agar nilai sebelum subcommand tidak tertimpa default
+    capture.add_argument("--source", default=argparse.SUPPRESS,
+                         help="Sumber lain: synthetic[:WxH][@FPS], file video, atau folder gambar")
+    capture.add_argument("--res", type=parse_resolution, default=None,
+                         help="Resolusi WxH, misal 1280x720 (default: ukuran spec synthetic, atau 640x480)")
+    capture.add_argument("--count", type=int, default=100, help="Jumlah gambar")
+    capture.add_argument("--fps", type=float, default=15.0, help="Target frame per detik (0 = secepatnya)")
+    capture.add_argument("--mode", choices=MODES, default=MODES[0], help="Mode kamera")
+    capture.add_argument("--brightness", type=int, default=0, help="Brightness -100..100")
+    capture.add_argument("--out", default=SAVE_DIR, help="Folder penyimpanan")
+    capture.add_argument("--workers", type=int, default=WRITER_WORKERS, help="Jumlah worker penyimpan")
+    capture.add_argument("--policy", choices=WRITER_POLICIES, default="block",
+                         help="Perilaku saat antrean writer penuh")
+    capture.add_argument("--format", choices=list(IMAGE_FORMATS.keys()), default="jpg", help="Format file")
+    capture.add_argument("--dedup", type=int, nargs="?", const=DEDUP_THRESHOLD, default=None,
+                         help=f"Lewati frame hampir identik (threshold Hamming, default {DEDUP_THRESHOLD})")
+    capture.add_argument("--dedup-max-skips", type=int, default=DEDUP_MAX_CONSECUTIVE,
+                         help="Berhenti jika sebanyak ini frame duplikat berturut-turut")
+    capture.add_argument("--dedup-history", action="store_true",
+                         help="Bandingkan juga dengan hash capture lama di manifest")
+    capture.add_argument("--trigger", action="store_true",
+                         help="Simpan hanya saat scene berubah (count = jumlah capture maksimum)")
+    capture.add_argument("--trigger-threshold", type=float, default=TRIGGER_THRESHOLD,
+                         help="Fraksi piksel berubah untuk memicu capture")
+    capture.add_argument("--cooldown", type=float, default=TRIGGER_COOLDOWN, help="Detik minimum antar capture")
+    capture.add_argument("--max-interval", type=float, default=TRIGGER_MAX_INTERVAL,
+                         help="Simpan paksa tiap N detik tanpa perubahan (0 = nonaktif)")
+    capture.add_argument("--quality", type=int, default=None,
+                         help="Kualitas (jpg/webp) atau level kompresi (png); default per format")
+    capture.add_argument("--spool", nargs="?", const=SPOOL_FILE, default=None,
+                         help="Tulis frame mentah ke spool memory-mapped, encode setelah capture")
+    capture.add_argument("--spool-size", type=int, default=SPOOL_SIZE_MB, help="Ukuran spool (MB)")
+    capture.add_argument("--defer", action="store_true", help="Dengan --spool: jangan encode sekarang")
+
+    spool_encode = subparsers.add_parser("spool-encode", help="Encode frame tertunda di spool")
+    spool_encode.add_argument("--spool", default=SPOOL_FILE, help="File spool")
+    spool_encode.add_argument("--out", default=SAVE_DIR, help="Folder penyimpanan")
+    spool_encode.add_argument("--format", choices=list(IMAGE_FORMATS.keys()), default="jpg", help="Format file")
+    spool_encode.add_argument("--quality", type=int, default=None,
+                              help="Kualitas (jpg/webp) atau level kompresi (png); default per format")
+    spool_encode.add_argument("--workers", type=int, default=None, help="Jumlah proses (default semua core)")
+
+    multi = subparsers.add_parser("multi-capture", help="Capture serentak dari beberapa kamera")
+    multi.add_argument("--cameras", type=parse_camera_list, required=True,
+                       help="Daftar ID kamera/sumber dipisah koma, misal 0,1,2")
+    multi.add_argument("--res", type=parse_resolution, default=None,
+                       help="Resolusi WxH untuk semua kamera (default: ukuran spec synthetic, atau 640x480)")
+    multi.add_argument("--count", type=int, default=50, help="Jumlah set frame")
+    multi.add_argument("--fps", type=float, default=5.0, help="Target set per detik (0 = secepatnya)")
+    multi.add_argument("--mode", choices=MODES, default=MODES[0], help="Mode kamera")
+    multi.add_argument("--brightness", type=int, default=0, help="Brightness -100..100")
+    multi.add_argument("--out", default=SAVE_DIR, help="Folder penyimpanan")
+    multi.add_argument("--workers", type=int, default=WRITER_WORKERS, help="Jumlah worker penyimpan")
+    multi.add_argument("--policy", choices=WRITER_POLICIES, default="block",
+                       help="Perilaku saat antrean writer penuh")
+    multi.add_argument("--format", choices=list(IMAGE_FORMATS.keys()), default="jpg", help="Format file")
+    multi.add_argument("--quality", type=int, default=None,
+                       help="Kualitas (jpg/webp) atau level kompresi (png); default per format")
+
+    bench = subparsers.add_parser("bench-preprocess", help="Benchmark preprocessing frame preview")
+    bench.add_argument("--mode", choices=MODES, default=MODES[1], help="Mode kamera")
+    bench.add_argument("--brightness", type=int, default=20, help="Brightness -100..100")
+    bench.add_argument("--repeat", type=int, default=200, help="Jumlah pengulangan")
+
+    bench_encode = subparsers.add_parser("bench-encode", help="Benchmark backend encoder gambar")
+    bench_encode.add_argument("--source", default=argparse.SUPPRESS, help=f"Folder gambar contoh (default {SAVE_DIR})")
+    bench_encode.add_argument("--limit", type=int, default=10, help="Jumlah gambar contoh")
+    bench_encode.add_argument("--level", type=int, default=None, help="Kualitas/kompresi (default per format)")
+    bench_encode.add_argument("--repeat", type=int, default=5, help="Jumlah pengulangan")
+
+    bench = subparsers.add_parser("bench", help="Benchmark pipeline read/process/render/encode tanpa GUI")
+    bench.add_argument("--source", default=argparse.SUPPRESS,
+                       help=f"synthetic[:WxH][@FPS] (FPS 0 = tanpa batas), file video, folder gambar, atau ID kamera "
+                            f"(default {BENCH_SOURCE})")
+    bench.add_argument("--res", type=parse_resolution, default=None, help="Paksa resolusi sumber WxH")
+    bench.add_argument("--source-fps", type=float, default=None,
+                       help="Batasi fps sumber (default: replay tanpa batas, synthetic sesuai spec)")
+    bench.add_argument("--frames", type=int, default=300, help="Jumlah frame")
+    bench.add_argument("--mode", choices=MODES, default=MODES[1], help="Mode kamera")
+    bench.add_argument("--brightness", type=int, default=20, help="Brightness -100..100")
+    bench.add_argument("--format", choices=list(IMAGE_FORMATS.keys()), default="jpg", help="Format encode")
+    bench.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    bench.add_argument("--baseline", default=None, help="File JSON hasil sebelumnya untuk cek regresi")
+    bench.add_argument("--tolerance", type=float, default=0.10, help="Toleransi penurunan fps terhadap baseline")
+
+    manifest = subparsers.add_parser("manifest", help="Query manifest capture tanpa membaca gambar")
+    manifest.add_argument("--manifest", default=MANIFEST_FILE, help="File manifest SQLite")
+    manifest.add_argument("--camera", default=None, help="ID kamera")
+    manifest.add_argument("--mode", choices=MODES, default=None, help="Mode kamera")
+    manifest.add_argument("--res", default=None, help="Resolusi yang dipilih saat capture, misal 1280x720")
+    manifest.add_argument("--format", choices=list(IMAGE_FORMATS.keys()), default=None, help="Format file")
+    manifest.add_argument("--session", default=None, help="ID sesi capture")
+    manifest.add_argument("--tag", default=None, help="Tag yang diberikan lewat galeri")
+    manifest.add_argument("--since", type=parse_date, default=None, help="Mulai tanggal (YYYY-mm-dd)")
+    manifest.add_argument("--until", type=parse_date, default=None, help="Sampai tanggal (YYYY-mm-dd)")
+    manifest.add_argument("--limit", type=int, default=None, help="Batas jumlah baris")
+    manifest.add_argument("--output", choices=["summary", "paths", "json"], default="summary")
+    manifest.add_argument("--copy-to", default=None, help="Ekspor subset (hard link/copy) ke folder ini")
+
+    dedupe = subparsers.add_parser("dedupe", help="Cari gambar hampir identik di folder yang sudah ada")
+    dedupe.add_argument("folder", nargs="?", default=SAVE_DIR, help="Folder gambar")
+    dedupe.add_argument("--threshold", type=int, default=DEDUP_THRESHOLD, help="Jarak Hamming maksimum dHash")
+    dedupe.add_argument("--move-to", nargs="?", const=DEDUP_DIR, default=None, help="Pindahkan duplikat ke folder ini")
+    dedupe.add_argument("--delete", action="store_true", help="Hapus duplikat")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.source is None:
+        # Default --source per subcommand (boleh ditulis sebelum atau sesudah subcommand)
+        args.source = {"bench": BENCH_SOURCE, "bench-encode": SAVE_DIR}.get(args.command)
+    if args.profile or args.trace:
+        PROFILER.enabled = True
+        PROFILER.tracing = bool(args.trace)
+    try:
+        return run_command(args)
+    finally:
+        if PROFILER.enabled and args.command:
+            print(PROFILER.overlay_text())
+        if args.trace:
+            count = PROFILER.export_trace(args.trace)
+            print(f"Trace: {count} event disimpan ke {args.trace}")
+
+
+def run_command(args):
+    if args.command == "capture":
+        return run_headless_capture(args)
+    if args.command == "bench-preprocess":
+        return run_preprocess_benchmark(args)
+    if args.command == "bench-encode":
+        return run_encode_benchmark(args)
+    if args.command == "bench":
+        return run_pipeline_benchmark(args)
+    if args.command == "spool-encode":
+        return run_spool_encode(args)
+    if args.command == "multi-capture":
+        return run_multi_capture(args)
+    if args.command == "manifest":
+        return run_manifest_query(args)
+    if args.command == "dedupe":
+        return run_dedupe(args)
+
+    load_gui_modules()
+    STARTUP.mark("import")
     root = ctk.CTk()
-    app = CameraApp(root)
+    app = CameraApp(root, source=args.source, profile_startup=args.profile_startup)
+    STARTUP.mark("init")
     root.mainloop()
+    return app.exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
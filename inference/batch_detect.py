@@ -0,0 +1,278 @@
+"""Inferensi batch offline untuk seluruh folder dataset (pra-anotasi / re-scoring).
+
+Gambar di-decode dan di-letterbox paralel di beberapa proses (prefetch),
+digabung menjadi batch berukuran tetap untuk detektor, dan hasilnya ditulis
+per gambar begitu selesai. Checkpoint mencatat gambar yang sudah diproses
+(ukuran + mtime + model), sehingga run berikutnya hanya memproses gambar
+baru atau yang berubah.
+
+Contoh:
+    python -m inference.batch_detect --model training/model/best.onnx --source dataset/raw --format labelstudio
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from multiprocessing import Pool
+
+import cv2
+import numpy as np
+
+from inference.detect import MODEL_PATH, CONF_THRESHOLD, YoloDetector, letterbox, read_labels
+
+# ---------------------------------------------------
+# --------------- Konfigurasi Awal ------------------
+# ---------------------------------------------------
+SOURCE_DIR = "dataset/raw"
+OUTPUT_DIR = "dataset/predictions"
+CHECKPOINT_FILE = "checkpoint.json"
+LABEL_STUDIO_TASKS_FILE = "label_studio_tasks.json"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+OUTPUT_FORMATS = ["yolo", "labelstudio"]
+BATCH_SIZE = 8
+CHECKPOINT_EVERY = 64  # simpan checkpoint tiap N gambar
+
+
+def list_images(source):
+    """Semua gambar di folder (rekursif), urut berdasarkan path relatif."""
+    paths = []
+    for root, _, files in os.walk(source):
+        for name in files:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.relpath(os.path.join(root, name), source))
+    return sorted(paths)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime_ns)}
+
+
+def model_signature(model_path, input_size, conf, save_conf=False):
+    """Hash isi model + parameter output; hasil lama dianggap basi jika ini berubah."""
+    digest = hashlib.sha1()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(f"{input_size}:{conf}:{int(save_conf)}".encode())
+    return digest.hexdigest()
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"model": None, "images": {}}
+
+
+def save_checkpoint(checkpoint, path):
+    # Tulis ke file sementara lalu ganti, agar checkpoint tidak rusak jika proses terhenti
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def _init_decoder():
+    cv2.setNumThreads(1)  # paralelisme sudah dari jumlah proses
+
+
+def decode_and_letterbox(job):
+    """Dijalankan di proses worker: baca gambar + letterbox ke ukuran input model."""
+    rel_path, abs_path, size = job
+    image = cv2.imread(abs_path)
+    if image is None:
+        return rel_path, None, None, None, None
+    padded, scale, pad = letterbox(image, size)
+    return rel_path, padded, scale, pad, image.shape[:2]
+
+
+# ---------------------------------------------------
+# ----------------- Penulis Output ------------------
+# ---------------------------------------------------
+def output_path(out_dir, rel_path, ext):
+    path = os.path.join(out_dir, os.path.splitext(rel_path)[0] + ext)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def write_yolo(out_dir, rel_path, detections, shape, save_conf=False):
+    """Satu baris per box: class cx cy w h (ternormalisasi 0..1), opsional + confidence."""
+    height, width = shape
+    with open(output_path(out_dir, rel_path, ".txt"), "w", encoding="utf-8") as f:
+        for det in detections:
+            x1, y1, x2, y2 = det.box
+            cx, cy = (x1 + x2) / 2 / width, (y1 + y2) / 2 / height
+            w, h = (x2 - x1) / width, (y2 - y1) / height
+            line = f"{det.class_id} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}"
+            f.write(line + (f" {det.confidence:.4f}\n" if save_conf else "\n"))
+
+
+def label_studio_task(rel_path, detections, shape, args):
+    """Task Label Studio dengan prediksi rectanglelabels (koordinat dalam persen)."""
+    height, width = shape
+    results = []
+    for det in detections:
+        x1, y1, x2, y2 = det.box
+        results.append({
+            "from_name": args.from_name,
+            "to_name": args.to_name,
+            "type": "rectanglelabels",
+            "original_width": width,
+            "original_height": height,
+            "image_rotation": 0,
+            "score": round(det.confidence, 4),
+            "value": {
+                "x": x1 / width * 100,
+                "y": y1 / height * 100,
+                "width": (x2 - x1) / width * 100,
+                "height": (y2 - y1) / height * 100,
+                "rotation": 0,
+                "rectanglelabels": [det.label],
+            },
+        })
+    image_path = os.path.join(args.source, rel_path).replace(os.sep, "/")
+    score = float(np.mean([d.confidence for d in detections])) if detections else 0.0
+    return {
+        "data": {args.image_key: args.image_root + image_path},
+        "predictions": [{"model_version": args.model_version, "score": round(score, 4), "result": results}],
+    }
+
+
+def write_label_studio(out_dir, rel_path, detections, shape, args):
+    with open(output_path(out_dir, rel_path, ".json"), "w", encoding="utf-8") as f:
+        json.dump(label_studio_task(rel_path, detections, shape, args), f)
+
+
+def merge_label_studio_tasks(out_dir, rel_paths):
+    """Gabungkan task per gambar menjadi satu file import Label Studio (ditulis streaming)."""
+    merged = os.path.join(out_dir, LABEL_STUDIO_TASKS_FILE)
+    count = 0
+    with open(merged, "w", encoding="utf-8") as out:
+        out.write("[\n")
+        for rel_path in rel_paths:
+            path = os.path.join(out_dir, os.path.splitext(rel_path)[0] + ".json")
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                out.write((",\n" if count else "") + f.read())
+            count += 1
+        out.write("\n]\n")
+    return merged, count
+
+
+# ---------------------------------------------------
+# -------------------- Inferensi --------------------
+# ---------------------------------------------------
+def run_batch(detector, batch):
+    """Jalankan detektor untuk satu batch hasil decode; kembalikan daftar deteksi per gambar."""
+    blob = cv2.dnn.blobFromImages([item[1] for item in batch], 1 / 255.0, swapRB=True)
+    # Model dengan batch tetap (N): potong per N, batch terakhir yang kurang diisi nol
+    step = detector.max_batch or len(batch)
+    outputs = []
+    for start in range(0, len(batch), step):
+        chunk = blob[start:start + step]
+        count = len(chunk)
+        if detector.max_batch and count < step:
+            chunk = np.concatenate([chunk, np.zeros((step - count,) + chunk.shape[1:], dtype=chunk.dtype)])
+        result = detector.forward(chunk)
+        outputs.extend(result[i:i + 1] for i in range(count))
+    return [
+        detector.postprocess(output, scale, pad, shape)
+        for output, (_, _, scale, pad, shape) in zip(outputs, batch)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OutReady - Inferensi batch untuk folder dataset")
+    parser.add_argument("--model", default=MODEL_PATH, help="Path model ONNX")
+    parser.add_argument("--labels", default=None, help="File nama kelas (opsional jika ada di metadata)")
+    parser.add_argument("--source", default=SOURCE_DIR, help="Folder gambar")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="Folder output prediksi")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="yolo", help="Format output")
+    parser.add_argument("--size", type=int, default=640, help="Ukuran input model")
+    parser.add_argument("--conf", type=float, default=CONF_THRESHOLD, help="Ambang confidence")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Ukuran batch detektor")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="Jumlah proses decode")
+    parser.add_argument("--save-conf", action="store_true", help="Tambahkan confidence di output YOLO txt")
+    parser.add_argument("--force", action="store_true", help="Abaikan checkpoint, proses ulang semua")
+    parser.add_argument("--from-name", default="label", help="Nama tag RectangleLabels di config Label Studio")
+    parser.add_argument("--to-name", default="image", help="Nama tag Image di config Label Studio")
+    parser.add_argument("--image-key", default="image", help="Key data gambar di task Label Studio")
+    parser.add_argument("--image-root", default="/data/local-files/?d=", help="Prefix URL gambar Label Studio")
+    args = parser.parse_args(argv)
+
+    labels = read_labels(args.labels) if args.labels else None
+    detector = YoloDetector(args.model, labels, args.size, args.conf)
+    size = detector.input_size
+    args.model_version = os.path.basename(args.model)
+
+    os.makedirs(args.out, exist_ok=True)
+    checkpoint_path = os.path.join(args.out, CHECKPOINT_FILE)
+    signature = model_signature(args.model, size, args.conf, args.save_conf)
+    checkpoint = load_checkpoint(checkpoint_path)
+    if args.force or checkpoint.get("model") != signature or checkpoint.get("format") != args.format:
+        checkpoint = {"model": signature, "format": args.format, "images": {}}
+
+    all_images = list_images(args.source)
+    todo = []
+    for rel_path in all_images:
+        sig = file_signature(os.path.join(args.source, rel_path))
+        if checkpoint["images"].get(rel_path) != sig:
+            todo.append((rel_path, sig))
+    print(f"{len(all_images)} gambar, {len(todo)} baru/berubah | backend {detector.backend} | input {size}")
+
+    signatures = dict(todo)
+    jobs = [(rel_path, os.path.join(args.source, rel_path), size) for rel_path, _ in todo]
+    done = failed = 0
+    since_checkpoint = 0
+    start = time.perf_counter()
+    with Pool(args.workers, initializer=_init_decoder) as pool:
+        batch = []
+        # imap menjaga urutan dan mem-prefetch hasil decode selagi detektor bekerja
+        decoded = pool.imap(decode_and_letterbox, jobs, chunksize=4)
+        for item in decoded:
+            if item[1] is None:
+                print(f"[WARN] Gagal membaca {item[0]}", file=sys.stderr)
+                failed += 1
+            else:
+                batch.append(item)
+            if len(batch) < args.batch and done + failed + len(batch) < len(jobs):
+                continue
+            if not batch:
+                continue
+
+            for item, detections in zip(batch, run_batch(detector, batch)):
+                rel_path, shape = item[0], item[4]
+                if args.format == "yolo":
+                    write_yolo(args.out, rel_path, detections, shape, args.save_conf)
+                else:
+                    write_label_studio(args.out, rel_path, detections, shape, args)
+                checkpoint["images"][rel_path] = signatures[rel_path]
+            done += len(batch)
+            since_checkpoint += len(batch)
+            batch = []
+
+            if since_checkpoint >= CHECKPOINT_EVERY:
+                save_checkpoint(checkpoint, checkpoint_path)
+                since_checkpoint = 0
+                elapsed = time.perf_counter() - start
+                print(f"{done}/{len(jobs)} gambar ({done / elapsed:.1f} img/s)")
+
+    save_checkpoint(checkpoint, checkpoint_path)
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"Selesai: {done} gambar diproses, {failed} gagal, {elapsed:.1f} s ({rate:.1f} img/s)")
+
+    if args.format == "labelstudio":
+        merged, count = merge_label_studio_tasks(args.out, all_images)
+        print(f"{count} task Label Studio digabung ke {merged}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Checklist barang bawaan dari deteksi per frame dengan debouncing temporal.
+
+Setiap item menyimpan skor confidence yang meluruh eksponensial terhadap
+waktu, plus status ada/tidak dengan hysteresis (ambang naik > ambang turun),
+sehingga deteksi yang berkedip tidak membuat status berganti-ganti.
+
+Update per frame hanya menyentuh item yang terdeteksi (O(deteksi)). Peluruhan
+item lain dihitung lazy dari timestamp; kapan skor item akan jatuh di bawah
+ambang turun dihitung di muka dan disimpan di heap, jadi transisi "missing"
+tetap terdeteksi tanpa memindai seluruh checklist tiap frame. `check()`
+dipanggil berkala (misal dari loop UI) agar item tetap bisa "missing" saat
+hasil inferensi berhenti datang; `update()` dan `check()` aman dipanggil dari
+thread berbeda.
+"""
+import math
+import time
+import heapq
+import threading
+from collections import namedtuple
+
+# ---------------------------------------------------
+# --------------- Konfigurasi Awal ------------------
+# ---------------------------------------------------
+HALF_LIFE = 1.0        # detik sampai skor tinggal separuh tanpa deteksi
+ON_THRESHOLD = 0.5     # skor minimal agar item dianggap ada
+OFF_THRESHOLD = 0.2    # skor di bawah ini item dianggap hilang
+SMOOTHING = 0.5        # bobot confidence baru saat item terdeteksi
+
+ChecklistEvent = namedtuple("ChecklistEvent", ["item", "present", "score", "timestamp"])
+
+
+def describe_event(event):
+    return f"{event.item} {'found' if event.present else 'missing'}"
+
+
+class _ItemState:
+    __slots__ = ("score", "updated", "present", "version")
+
+    def __init__(self):
+        self.score = 0.0
+        self.updated = 0.0
+        self.present = False
+        self.version = 0
+
+
+class PackChecklist:
+    """Agregator deteksi -> status checklist, mengirim event hanya saat transisi nyata."""
+    def __init__(self, items, half_life=HALF_LIFE, on_threshold=ON_THRESHOLD,
+                 off_threshold=OFF_THRESHOLD, smoothing=SMOOTHING):
+        if off_threshold >= on_threshold:
+            raise ValueError("off_threshold harus lebih kecil dari on_threshold")
+        self.items = {item: _ItemState() for item in items}
+        self.decay_rate = math.log(2) / half_life
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.smoothing = smoothing
+        self.deadlines = []  # heap (waktu skor < off_threshold, item, versi)
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """`callback(ChecklistEvent)` dipanggil untuk setiap transisi."""
+        self.subscribers.append(callback)
+
+    def _score_at(self, state, timestamp):
+        return state.score * math.exp(-self.decay_rate * max(0.0, timestamp - state.updated))
+
+    def update(self, detections, timestamp=None):
+        """Masukkan deteksi satu frame (objek dengan `.label` dan `.confidence`)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        # Ambil confidence tertinggi per item pada frame ini
+        best = {}
+        for det in detections:
+            if det.label in self.items and det.confidence > best.get(det.label, 0.0):
+                best[det.label] = det.confidence
+
+        with self.lock:
+            events = self._expire(timestamp)
+            for item, confidence in best.items():
+                state = self.items[item]
+                decayed = self._score_at(state, timestamp)
+                state.score = decayed + self.smoothing * (confidence - decayed)
+                state.updated = timestamp
+                state.version += 1
+                if not state.present and state.score >= self.on_threshold:
+                    state.present = True
+                    events.append(ChecklistEvent(item, True, state.score, timestamp))
+                if state.present:
+                    self._schedule(item, state)
+
+        self._emit(events)
+        return events
+
+    def check(self, timestamp=None):
+        """Proses item yang kedaluwarsa tanpa deteksi baru (misal saat detektor dimatikan)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            events = self._expire(timestamp)
+        self._emit(events)
+        return events
+
+    def _schedule(self, item, state):
+        # Waktu saat skor meluruh sampai off_threshold (langsung jika sudah di bawahnya)
+        if state.score <= self.off_threshold:
+            remaining = 0.0
+        else:
+            remaining = math.log(state.score / self.off_threshold) / self.decay_rate
+        heapq.heappush(self.deadlines, (state.updated + remaining, item, state.version))
+
+    def _expire(self, timestamp):
+        events = []
+        while self.deadlines and self.deadlines[0][0] <= timestamp:
+            deadline, item, version = heapq.heappop(self.deadlines)
+            state = self.items[item]
+            if version != state.version or not state.present:
+                continue  # jadwal lama, item sudah diperbarui
+            state.present = False
+            events.append(ChecklistEvent(item, False, self._score_at(state, deadline), deadline))
+        return events
+
+    def _emit(self, events):
+        for event in events:
+            for callback in self.subscribers:
+                callback(event)
+
+    def status(self, timestamp=None):
+        """{item: (ada?, skor saat ini)} untuk tampilan awal."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            return {item: (state.present, self._score_at(state, timestamp)) for item, state in self.items.items()}
+
+    def missing(self):
+        return [item for item, state in self.items.items() if not state.present]
@@ -0,0 +1,380 @@
+"""Inferensi YOLO (ONNX) di CPU untuk deteksi barang bawaan secara real-time.
+
+Model diekspor dari Ultralytics ke ONNX (`yolo export format=onnx`), lalu
+dijalankan dengan ONNX Runtime jika terpasang, atau OpenCV DNN jika tidak.
+
+Contoh:
+    python -m inference.detect --model training/model/best.onnx --source dataset/raw
+"""
+import os
+import ast
+import sys
+import time
+import argparse
+import threading
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+ort = None  # onnxruntime dimuat saat detektor pertama dibuat (lihat load_onnxruntime)
+
+
+def load_onnxruntime():
+    """Import onnxruntime saat dibutuhkan agar import modul ini tetap ringan."""
+    global ort
+    if ort is None:
+        try:
+            import onnxruntime
+        except ImportError:
+            return None
+        ort = onnxruntime
+    return ort
+
+# ---------------------------------------------------
+# --------------- Konfigurasi Awal ------------------
+# ---------------------------------------------------
+MODEL_PATH = "training/model/best.onnx"
+INPUT_SIZES = [320, 416, 512, 640]   # kandidat ukuran input adaptif (kelipatan 32)
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.45
+TARGET_LATENCY_MS = 120              # ukuran input diturunkan jika latensi melebihi ini
+INFERENCE_EVERY_N = 2                # jalankan inferensi tiap N frame preview
+
+Detection = namedtuple("Detection", ["class_id", "label", "confidence", "box"])
+InferenceResult = namedtuple("InferenceResult", ["frame_id", "detections", "latency_ms", "input_size", "timestamp"])
+
+
+def letterbox(image, size, color=(114, 114, 114)):
+    """Resize dengan rasio tetap lalu padding ke `size` x `size`.
+
+    Kembalikan (gambar, skala, (pad_x, pad_y)) untuk memetakan box kembali.
+    """
+    height, width = image.shape[:2]
+    scale = min(size / width, size / height)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    out = np.full((size, size, 3), color, dtype=np.uint8)
+    out[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return out, scale, (pad_x, pad_y)
+
+
+def read_labels(path):
+    """Baca nama kelas dari file teks (satu nama per baris)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class YoloDetector:
+    """Detektor YOLO ONNX (format output YOLOv5 maupun YOLOv8) untuk CPU."""
+    def __init__(self, model_path=MODEL_PATH, labels=None, input_size=640,
+                 conf_threshold=CONF_THRESHOLD, iou_threshold=IOU_THRESHOLD, backend="auto"):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model tidak ditemukan: {model_path}")
+        self.model_path = model_path
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.labels = list(labels) if labels else []
+        self.dynamic = False
+        self.max_batch = 1  # None = batch dinamis
+
+        if backend == "auto":
+            backend = "onnxruntime" if load_onnxruntime() is not None else "opencv"
+        self.backend = backend
+
+        if backend == "onnxruntime":
+            if load_onnxruntime() is None:
+                raise ImportError("onnxruntime belum terpasang (pip install onnxruntime)")
+            self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+            model_input = self.session.get_inputs()[0]
+            self.input_name = model_input.name
+            # Dimensi berupa string/None berarti model diekspor dengan ukuran dinamis
+            batch, height = model_input.shape[0], model_input.shape[2]
+            self.dynamic = not isinstance(height, int)
+            self.max_batch = batch if isinstance(batch, int) else None
+            self.input_size = input_size if self.dynamic else height
+            if not self.labels:
+                self.labels = self._labels_from_metadata()
+        else:
+            self.net = cv2.dnn.readNetFromONNX(model_path)
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            self.input_size = input_size
+
+    def _labels_from_metadata(self):
+        # Ultralytics menyimpan {id: nama} di metadata "names"
+        names = self.session.get_modelmeta().custom_metadata_map.get("names")
+        if not names:
+            return []
+        try:
+            mapping = ast.literal_eval(names)
+        except (ValueError, SyntaxError):
+            return []
+        return [mapping[i] for i in sorted(mapping)]
+
+    def label(self, class_id):
+        return self.labels[class_id] if class_id < len(self.labels) else str(class_id)
+
+    def preprocess(self, image, size):
+        """BGR uint8 -> tensor NCHW float32 RGB 0..1 (ter-letterbox)."""
+        padded, scale, pad = letterbox(image, size)
+        blob = cv2.dnn.blobFromImage(padded, 1 / 255.0, swapRB=True)
+        return blob, scale, pad
+
+    def forward(self, blob):
+        if self.backend == "onnxruntime":
+            return self.session.run(None, {self.input_name: blob})[0]
+        self.net.setInput(blob)
+        return self.net.forward()
+
+    def postprocess(self, output, scale, pad, image_shape):
+        """Ubah output mentah menjadi daftar Detection di koordinat gambar asli."""
+        pred = np.squeeze(output, axis=0)
+        # YOLOv8: (4 + nc, N) -> (N, 4 + nc). YOLOv5: (N, 5 + nc) dengan objectness.
+        if pred.shape[0] < pred.shape[1]:
+            pred = pred.T
+            scores_all = pred[:, 4:]
+        else:
+            scores_all = pred[:, 5:] * pred[:, 4:5]
+
+        class_ids = np.argmax(scores_all, axis=1)
+        scores = scores_all[np.arange(len(class_ids)), class_ids]
+        keep = scores >= self.conf_threshold
+        if not np.any(keep):
+            return []
+
+        boxes, scores, class_ids = pred[keep, :4], scores[keep], class_ids[keep]
+        # cx, cy, w, h (ruang input) -> x, y, w, h (ruang gambar asli)
+        pad_x, pad_y = pad
+        xywh = np.empty_like(boxes)
+        xywh[:, 0] = (boxes[:, 0] - boxes[:, 2] / 2 - pad_x) / scale
+        xywh[:, 1] = (boxes[:, 1] - boxes[:, 3] / 2 - pad_y) / scale
+        xywh[:, 2] = boxes[:, 2] / scale
+        xywh[:, 3] = boxes[:, 3] / scale
+
+        indices = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), self.conf_threshold, self.iou_threshold)
+        height, width = image_shape[:2]
+        detections = []
+        for i in np.array(indices).flatten():
+            x, y, w, h = xywh[i]
+            box = (
+                int(max(0, x)), int(max(0, y)),
+                int(min(width - 1, x + w)), int(min(height - 1, y + h)),
+            )
+            class_id = int(class_ids[i])
+            detections.append(Detection(class_id, self.label(class_id), float(scores[i]), box))
+        return detections
+
+    def detect(self, image, input_size=None):
+        """Deteksi objek pada gambar BGR. `input_size` hanya berlaku untuk model dinamis."""
+        size = input_size if (input_size and self.dynamic) else self.input_size
+        blob, scale, pad = self.preprocess(image, size)
+        output = self.forward(blob)
+        return self.postprocess(output, scale, pad, image.shape)
+
+
+class InferenceWorker:
+    """Thread inferensi dengan semantik frame terbaru.
+
+    `submit()` hanya menyimpan satu frame tertunda; frame lama yang belum
+    sempat diproses ditimpa (dihitung `dropped`). Hasil terakhir dibaca
+    lewat `latest_result()` tanpa pernah menunggu inferensi selesai.
+    Ukuran input diturunkan/dinaikkan otomatis agar latensi mendekati
+    `target_ms` (hanya untuk model dengan input dinamis). Jika diberikan,
+    `on_result(InferenceResult)` dipanggil dari thread worker tiap hasil baru.
+    """
+    def __init__(self, detector, every_n=INFERENCE_EVERY_N, sizes=INPUT_SIZES,
+                 target_ms=TARGET_LATENCY_MS, on_result=None):
+        self.detector = detector
+        self.on_result = on_result
+        self.every_n = max(1, every_n)
+        self.sizes = sorted(sizes)
+        self.size_index = len(self.sizes) - 1
+        if detector.input_size in self.sizes:
+            self.size_index = self.sizes.index(detector.input_size)
+        self.target_ms = target_ms
+
+        self.lock = threading.Lock()
+        self.pending = threading.Condition(self.lock)
+        self.slot = None
+        self.result = None
+        self.running = False
+        self.thread = None
+
+        self.offered = 0
+        self.submitted = 0
+        self.dropped = 0
+        self.processed = 0
+        self.latency_ms = 0.0
+        self.fps = 0.0
+        self.last_done = None
+
+    @property
+    def input_size(self):
+        return self.sizes[self.size_index] if self.detector.dynamic else self.detector.input_size
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="InferenceWorker", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        with self.pending:
+            self.running = False
+            self.pending.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def due(self):
+        """True setiap N frame; panggil sekali per frame sebelum menyalin frame untuk submit."""
+        self.offered += 1
+        return self.offered % self.every_n == 0
+
+    def submit(self, frame_id, frame):
+        """Serahkan frame (milik worker, jangan diubah setelahnya)."""
+        with self.pending:
+            if self.slot is not None:
+                self.dropped += 1
+            self.slot = (frame_id, frame)
+            self.submitted += 1
+            self.pending.notify()
+
+    def _run(self):
+        while True:
+            with self.pending:
+                while self.running and self.slot is None:
+                    self.pending.wait()
+                if not self.running:
+                    return
+                frame_id, frame = self.slot
+                self.slot = None
+
+            size = self.input_size
+            start = time.perf_counter()
+            try:
+                detections = self.detector.detect(frame, size)
+            except Exception as e:
+                print(f"[WARN] Inferensi gagal: {e}", file=sys.stderr)
+                detections = []
+            done = time.perf_counter()
+            self._update_stats(start, done)
+
+            result = InferenceResult(frame_id, detections, (done - start) * 1000, size, time.time())
+            with self.lock:
+                self.result = result
+            if self.on_result is not None:
+                self.on_result(result)
+
+    def _update_stats(self, start, done):
+        latency = (done - start) * 1000
+        self.latency_ms = latency if self.processed == 0 else 0.8 * self.latency_ms + 0.2 * latency
+        if self.last_done is not None and done > self.last_done:
+            instant = 1.0 / (done - self.last_done)
+            self.fps = instant if self.fps == 0 else 0.8 * self.fps + 0.2 * instant
+        self.last_done = done
+        self.processed += 1
+
+        # Ukuran input adaptif berdasarkan latensi rata-rata
+        if self.detector.dynamic and self.processed % 5 == 0:
+            if self.latency_ms > self.target_ms and self.size_index > 0:
+                self.size_index -= 1
+            elif self.latency_ms < self.target_ms * 0.5 and self.size_index < len(self.sizes) - 1:
+                self.size_index += 1
+
+    def latest_result(self):
+        with self.lock:
+            return self.result
+
+    def stats(self):
+        return {
+            "fps": self.fps,
+            "latency_ms": self.latency_ms,
+            "input_size": self.input_size,
+            "processed": self.processed,
+            "dropped": self.dropped,
+        }
+
+
+def draw_detections(image, detections, color=(0, 200, 0), scale=1.0):
+    """Gambar box + label ke `image` (in-place). `scale` memetakan koordinat box ke gambar ini."""
+    for det in detections:
+        x1, y1, x2, y2 = (int(v * scale) for v in det.box)
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(
+            image, f"{det.label} {det.confidence:.2f}", (x1, max(12, y1 - 5)),
+            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA
+        )
+    return image
+
+
+# ---------------------------------------------------
+# ----------------------- CLI -----------------------
+# ---------------------------------------------------
+def iter_images(source):
+    """Frame dari folder gambar, file gambar, file video, atau ID kamera."""
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith((".jpg", ".jpeg", ".png", ".webp", ".bmp")):
+                image = cv2.imread(os.path.join(source, name))
+                if image is not None:
+                    yield name, image
+        return
+    if os.path.isfile(source) and source.lower().endswith((".jpg", ".jpeg", ".png", ".webp", ".bmp")):
+        image = cv2.imread(source)
+        if image is not None:
+            yield os.path.basename(source), image
+        return
+
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    index = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield f"frame_{index:06d}", frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OutReady - Deteksi YOLO (CPU)")
+    parser.add_argument("--model", default=MODEL_PATH, help="Path model ONNX")
+    parser.add_argument("--labels", default=None, help="File nama kelas (opsional jika ada di metadata)")
+    parser.add_argument("--source", default="0", help="ID kamera, file video/gambar, atau folder gambar")
+    parser.add_argument("--size", type=int, default=640, help="Ukuran input model")
+    parser.add_argument("--conf", type=float, default=CONF_THRESHOLD, help="Ambang confidence")
+    parser.add_argument("--backend", choices=["auto", "onnxruntime", "opencv"], default="auto")
+    parser.add_argument("--show", action="store_true", help="Tampilkan hasil di jendela OpenCV")
+    args = parser.parse_args(argv)
+
+    labels = read_labels(args.labels) if args.labels else None
+    detector = YoloDetector(args.model, labels, args.size, args.conf, backend=args.backend)
+    print(f"Model: {args.model} | backend: {detector.backend} | input: {detector.input_size}"
+          f"{' (dinamis)' if detector.dynamic else ''}")
+
+    latencies = []
+    for name, image in iter_images(args.source):
+        start = time.perf_counter()
+        detections = detector.detect(image)
+        latencies.append((time.perf_counter() - start) * 1000)
+        summary = ", ".join(f"{d.label} {d.confidence:.2f}" for d in detections) or "-"
+        print(f"{name}: {summary} ({latencies[-1]:.1f} ms)")
+        if args.show:
+            cv2.imshow("OutReady Detect", draw_detections(image, detections))
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                break
+
+    if latencies:
+        mean = float(np.mean(latencies))
+        print(f"{len(latencies)} frame | rata-rata {mean:.1f} ms | {1000 / mean:.1f} fps")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Augmentasi offline dataset YOLO: batch NumPy/OpenCV, process pool, dan cache hasil.
+
+Transformasi sama dengan yang dipakai manual saat capture (brightness slider,
+mode Mirror), ditambah contrast, scale, dan colour jitter (hue/saturation).
+Box YOLO ikut disesuaikan untuk flip dan scale.
+
+Parameter augmentasi diambil deterministik dari (seed, hash sumber, nomor salinan),
+dan nama file output = hash sumber (gambar + label) + hash parameter. Run berikutnya
+dengan seed yang sama hanya memproses gambar baru/berubah; sisanya dipakai ulang.
+
+Contoh:
+    python -m training.augment --dataset dataset/yolo --out dataset/augmented --copies 3
+"""
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+from collections import namedtuple
+from multiprocessing import Pool
+
+import cv2
+import numpy as np
+
+from training.pack_dataset import SPLITS, iter_dataset, load_classes, parse_labels
+from training.prepare_dataset import content_hash, load_json, save_json
+
+# ---------------------------------------------------
+# --------------- Konfigurasi Awal ------------------
+# ---------------------------------------------------
+DATASET_DIR = "dataset/yolo"
+OUTPUT_DIR = "dataset/augmented"
+HASH_CACHE_FILE = "hash_cache.json"
+COPIES = 2
+BATCH_SIZE = 16          # gambar per job worker (diproses sebagai satu array)
+JPEG_QUALITY = 92
+
+BRIGHTNESS_RANGE = (-40, 40)     # satuan sama dengan slider brightness di GUI
+CONTRAST_RANGE = (0.8, 1.2)
+SCALE_RANGE = (0.7, 1.0)         # zoom out, sisa area diisi abu-abu
+HUE_SHIFT = 8                    # satuan hue OpenCV (0-179)
+SATURATION_RANGE = (0.7, 1.3)
+FLIP_PROB = 0.5
+
+AugParams = namedtuple("AugParams", ["flip", "brightness", "contrast", "scale", "hue", "saturation"])
+
+
+# ---------------------------------------------------
+# -------------------- Parameter --------------------
+# ---------------------------------------------------
+def sample_params(seed, source_key, copy):
+    """Parameter deterministik untuk salinan ke-`copy` dari satu sumber."""
+    rng = random.Random(f"{seed}:{source_key}:{copy}")
+    return AugParams(
+        flip=rng.random() < FLIP_PROB,
+        brightness=rng.randint(*BRIGHTNESS_RANGE),
+        contrast=round(rng.uniform(*CONTRAST_RANGE), 3),
+        scale=round(rng.uniform(*SCALE_RANGE), 3),
+        hue=rng.randint(-HUE_SHIFT, HUE_SHIFT),
+        saturation=round(rng.uniform(*SATURATION_RANGE), 3),
+    )
+
+
+def params_key(params):
+    return hashlib.sha1(json.dumps(params._asdict(), sort_keys=True).encode()).hexdigest()[:10]
+
+
+# ---------------------------------------------------
+# ------------------- Transformasi ------------------
+# ---------------------------------------------------
+def augment_batch(images, params):
+    """Augmentasi sekumpulan gambar berukuran sama sekaligus. `images`: (N, H, W, 3) uint8."""
+    n, h, w = images.shape[:3]
+    out = images.copy()
+
+    # Flip horizontal (sama dengan mode Mirror)
+    flips = np.array([p.flip for p in params])
+    out[flips] = out[flips, :, ::-1]
+
+    # Scale (zoom out) per gambar, diletakkan di tengah kanvas abu-abu
+    for i, p in enumerate(params):
+        if p.scale < 1.0:
+            sw, sh = max(1, round(w * p.scale)), max(1, round(h * p.scale))
+            small = cv2.resize(out[i], (sw, sh), interpolation=cv2.INTER_AREA)
+            out[i] = 114
+            x0, y0 = (w - sw) // 2, (h - sh) // 2
+            out[i, y0:y0 + sh, x0:x0 + sw] = small
+
+    # Colour jitter: satu cvtColor untuk seluruh batch (ditumpuk vertikal)
+    hsv = cv2.cvtColor(out.reshape(n * h, w, 3), cv2.COLOR_BGR2HSV).reshape(n, h, w, 3)
+    hue = np.array([p.hue for p in params], dtype=np.int16)[:, None, None]
+    saturation = np.array([p.saturation for p in params], dtype=np.float32)[:, None, None]
+    hsv[..., 0] = ((hsv[..., 0].astype(np.int16) + hue) % 180).astype(np.uint8)
+    hsv[..., 1] = np.clip(hsv[..., 1] * saturation, 0, 255).astype(np.uint8)
+    out = cv2.cvtColor(hsv.reshape(n * h, w, 3), cv2.COLOR_HSV2BGR).reshape(n, h, w, 3)
+
+    # Contrast di sekitar nilai tengah + brightness (beta seperti convertScaleAbs di GUI)
+    contrast = np.array([p.contrast for p in params], dtype=np.float32)[:, None, None, None]
+    brightness = np.array([p.brightness for p in params], dtype=np.float32)[:, None, None, None]
+    out = out.astype(np.float32)
+    out = (out - 128.0) * contrast + 128.0 + brightness
+    return np.clip(out + 0.5, 0, 255).astype(np.uint8)
+
+
+def augment_boxes(boxes, params):
+    """Sesuaikan box YOLO (n, 5): class cx cy w h ternormalisasi."""
+    boxes = boxes.copy()
+    if params.flip:
+        boxes[:, 1] = 1.0 - boxes[:, 1]
+    if params.scale < 1.0:
+        boxes[:, 1:3] = 0.5 + (boxes[:, 1:3] - 0.5) * params.scale
+        boxes[:, 3:5] *= params.scale
+    return boxes
+
+
+def format_boxes(boxes):
+    return "".join(f"{int(c)} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n" for c, cx, cy, w, h in boxes)
+
+
+# ---------------------------------------------------
+# ---------------- Worker (Process Pool) ------------
+# ---------------------------------------------------
+def _init_worker():
+    cv2.setNumThreads(1)
+
+
+def augment_job(job):
+    """Satu job = beberapa (src, label, [(dst_image, dst_label, params)]). Kembalikan (ditulis, gagal)."""
+    groups = {}
+    failed = 0
+    for src, label_path, outputs in job:
+        image = cv2.imread(src)
+        if image is None:
+            print(f"[WARN] Gambar tidak bisa dibaca: {src}", file=sys.stderr)
+            failed += len(outputs)
+            continue
+        boxes = np.zeros((0, 5), dtype=np.float32)
+        if os.path.exists(label_path):
+            with open(label_path, "rb") as f:
+                boxes = parse_labels(f.read())
+        for dst_image, dst_label, params in outputs:
+            groups.setdefault(image.shape, []).append((image, boxes, dst_image, dst_label, params))
+
+    written = 0
+    for items in groups.values():
+        # Semua salinan berukuran sama diproses dalam satu array
+        results = augment_batch(np.stack([item[0] for item in items]), [item[4] for item in items])
+        for result, (_, boxes, dst_image, dst_label, params) in zip(results, items):
+            with open(dst_label, "w", encoding="utf-8") as f:
+                f.write(format_boxes(augment_boxes(boxes, params)))
+            # Gambar ditulis terakhir: keberadaannya menandai output lengkap
+            tmp = dst_image + ".tmp.jpg"
+            cv2.imwrite(tmp, result, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+            os.replace(tmp, dst_image)
+            written += 1
+    return written, failed
+
+
+# ---------------------------------------------------
+# ----------------------- Main ----------------------
+# ---------------------------------------------------
+def plan_jobs(args, hash_cache, stats, expected):
+    """Tentukan output per sumber; yang sudah ada di cache dilewati."""
+    batch = []
+    for split, name, src, label_path in iter_dataset(args.dataset):
+        if split not in args.splits:
+            continue
+        label_bytes = b""
+        if os.path.exists(label_path):
+            with open(label_path, "rb") as f:
+                label_bytes = f.read()
+        # Kunci sumber = isi gambar + isi label, jadi label yang diedit juga memicu ulang
+        source_key = hashlib.sha1((content_hash(src, hash_cache)).encode() + label_bytes).hexdigest()[:12]
+        stem = os.path.splitext(name)[0]
+
+        outputs = []
+        for copy in range(args.copies):
+            params = sample_params(args.seed, source_key, copy)
+            out_name = f"{stem}_{source_key}_{params_key(params)}"
+            dst_image = os.path.join(args.out, "images", split, out_name + ".jpg")
+            dst_label = os.path.join(args.out, "labels", split, out_name + ".txt")
+            expected.add(dst_image)
+            expected.add(dst_label)
+            if os.path.exists(dst_image) and os.path.exists(dst_label):
+                stats["cached"] += 1
+                continue
+            outputs.append((dst_image, dst_label, params))
+
+        if outputs:
+            batch.append((src, label_path, outputs))
+            if sum(len(item[2]) for item in batch) >= BATCH_SIZE:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def write_dataset_yaml(args, classes):
+    """dataset.yaml: data asli + hasil augmentasi untuk train, data asli untuk val."""
+    original = os.path.abspath(args.dataset)
+    with open(os.path.join(args.out, "dataset.yaml"), "w", encoding="utf-8") as f:
+        f.write(f"path: {os.path.abspath(args.out)}\n")
+        f.write(f"train:\n  - {original}/images/train\n")
+        if "train" in args.splits:
+            f.write("  - images/train\n")
+        f.write(f"val: {original}/images/val\n")
+        f.write("names:\n")
+        for i, name in enumerate(classes):
+            f.write(f"  {i}: {name}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OutReady - augmentasi dataset YOLO (batch, cached)")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Folder dataset YOLO (hasil prepare_dataset)")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="Folder output augmentasi")
+    parser.add_argument("--copies", type=int, default=COPIES, help="Jumlah salinan augmentasi per gambar")
+    parser.add_argument("--seed", type=int, default=0, help="Seed parameter augmentasi")
+    parser.add_argument("--splits", nargs="+", choices=SPLITS, default=["train"], help="Split yang diaugmentasi")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Jumlah proses")
+    parser.add_argument("--prune", action="store_true", help="Hapus output yang tidak lagi dipakai")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.dataset):
+        print(f"[ERROR] Dataset tidak ditemukan: {args.dataset}", file=sys.stderr)
+        return 1
+    for split in args.splits:
+        os.makedirs(os.path.join(args.out, "images", split), exist_ok=True)
+        os.makedirs(os.path.join(args.out, "labels", split), exist_ok=True)
+
+    hash_cache_path = os.path.join(args.out, HASH_CACHE_FILE)
+    hash_cache = load_json(hash_cache_path, {})
+    stats = {"cached": 0, "written": 0, "failed": 0}
+    expected = set()
+
+    # Job direncanakan di proses utama (hash cache), dieksekusi di pool
+    jobs = plan_jobs(args, hash_cache, stats, expected)
+    with Pool(args.workers, initializer=_init_worker) as pool:
+        for written, failed in pool.imap_unordered(augment_job, jobs):
+            stats["written"] += written
+            stats["failed"] += failed
+    save_json(hash_cache, hash_cache_path)
+
+    pruned = 0
+    if args.prune:
+        for split in args.splits:
+            for kind in ("images", "labels"):
+                folder = os.path.join(args.out, kind, split)
+                for name in os.listdir(folder):
+                    path = os.path.join(folder, name)
+                    if path not in expected:
+                        os.remove(path)
+                        pruned += 1
+
+    write_dataset_yaml(args, load_classes(args.dataset))
+    print(f"Ditulis {stats['written']} | dari cache {stats['cached']} | gagal {stats['failed']}"
+          f"{f' | dihapus {pruned}' if args.prune else ''}")
+    return 0 if not stats["failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
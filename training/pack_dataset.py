@@ -0,0 +1,412 @@
+"""Pack dataset YOLO (hasil prepare_dataset) ke shard besar yang bisa di-memory-map.
+
+Membaca ribuan file JPEG kecil didominasi overhead filesystem. Di sini gambar
+(byte JPEG apa adanya, tanpa re-encode) dan label YOLO ditulis berurutan ke
+beberapa shard besar, ditambah index offset berukuran tetap:
+
+    dataset/pack/
+        pack.json          metadata (versi, kelas, ukuran shard)
+        index.bin          record tetap INDEX_DTYPE, dibaca lewat np.memmap
+        names.txt          nama item "<split>/<nama file>" per baris (urutan = index)
+        shard-00000.bin    [byte gambar][byte label][byte gambar][byte label]...
+
+Run berikutnya hanya menambahkan item baru atau berubah (ukuran/mtime gambar
+atau label berbeda) di akhir shard terakhir (atau shard baru), shard lama tidak
+ditulis ulang. Record baru menggantikan record lama dengan nama yang sama;
+gambar yang dihapus dari dataset dicatat sebagai record penghapus. Saat dibaca,
+hanya record terakhir per nama yang dipakai. Index ditulis setelah data shard,
+jadi jika proses terhenti, sisa byte di akhir shard diabaikan saja.
+
+Contoh:
+    python -m training.pack_dataset --dataset dataset/yolo --out dataset/pack
+    python -m training.pack_dataset --out dataset/pack --bench --split train
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import random
+import argparse
+from collections import deque
+from multiprocessing import Pool
+
+import cv2
+import numpy as np
+
+# ---------------------------------------------------
+# --------------- Konfigurasi Awal ------------------
+# ---------------------------------------------------
+DATASET_DIR = "dataset/yolo"
+PACK_DIR = "dataset/pack"
+PACK_VERSION = 2
+SHARD_SIZE_MB = 256
+LOADER_CHUNK = 8       # item per tugas worker loader
+LOADER_PREFETCH = 2    # tugas yang boleh antre per worker (batas memori hasil decode)
+SPLITS = ["train", "val"]
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+# Satu record index per item; ukuran tetap agar bisa di-memmap dan di-append.
+# mtime (ns) + ukuran gambar/label menjadi tanda isi untuk mendeteksi perubahan.
+INDEX_DTYPE = np.dtype([
+    ("shard", "<u4"),
+    ("offset", "<u8"),
+    ("image_size", "<u4"),
+    ("label_size", "<u4"),
+    ("split", "<u1"),
+    ("deleted", "<u1"),
+    ("image_mtime", "<i8"),
+    ("label_mtime", "<i8"),
+])
+
+
+# ---------------------------------------------------
+# ---------------------- Pembaca --------------------
+# ---------------------------------------------------
+def parse_labels(data):
+    """Byte label YOLO -> array float32 (n, 5): class cx cy w h."""
+    if not data:
+        return np.zeros((0, 5), dtype=np.float32)
+    return np.array(bytes(data).split(), dtype=np.float32).reshape(-1, 5)
+
+
+class DatasetPack:
+    """Akses acak ke item pack lewat mmap (aman dipakai setelah fork)."""
+    def __init__(self, pack_dir=PACK_DIR):
+        self.pack_dir = pack_dir
+        with open(os.path.join(pack_dir, "pack.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.classes = self.meta.get("classes", [])
+        with open(os.path.join(pack_dir, "names.txt"), "r", encoding="utf-8") as f:
+            self.names = [line.rstrip("\n") for line in f]
+
+        index_path = os.path.join(pack_dir, "index.bin")
+        count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+        count = min(count, len(self.names))
+        records = np.memmap(index_path, dtype=INDEX_DTYPE, mode="r", shape=(count,)) if count else \
+            np.zeros(0, dtype=INDEX_DTYPE)
+        # Record terakhir per nama yang berlaku; record penghapus membuang item
+        latest = resolve_latest(self.names[:count], records)
+        self.index = records[latest]
+        self.names = [self.names[i] for i in latest]
+        self.shards = {}
+        self.pid = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def _shard(self, number):
+        # mmap dibuka per proses; setelah fork, handle lama tidak dipakai lagi
+        if self.pid != os.getpid():
+            self.shards, self.pid = {}, os.getpid()
+        shard = self.shards.get(number)
+        if shard is None:
+            with open(os.path.join(self.pack_dir, f"shard-{number:05d}.bin"), "rb") as f:
+                shard = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.shards[number] = shard
+        return shard
+
+    def raw(self, i):
+        """(byte gambar, byte label) item ke-i sebagai memoryview tanpa salinan."""
+        record = self.index[i]
+        shard = memoryview(self._shard(int(record["shard"])))
+        start = int(record["offset"])
+        middle = start + int(record["image_size"])
+        return shard[start:middle], shard[middle:middle + int(record["label_size"])]
+
+    def __getitem__(self, i):
+        """(nama, gambar BGR, label float32 (n, 5))."""
+        image_bytes, label_bytes = self.raw(i)
+        image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return self.names[i], image, parse_labels(label_bytes)
+
+    def indices(self, split=None):
+        if split is None:
+            return np.arange(len(self.index))
+        return np.flatnonzero(self.index["split"] == SPLITS.index(split))
+
+    def close(self):
+        for shard in self.shards.values():
+            shard.close()
+        self.shards = {}
+
+
+# ---------------------------------------------------
+# --------------- Loader (Process Pool) -------------
+# ---------------------------------------------------
+_worker_pack = None
+
+
+def _init_loader(pack_dir):
+    global _worker_pack
+    cv2.setNumThreads(1)
+    _worker_pack = DatasetPack(pack_dir)
+
+
+def _load_items(indices):
+    return [_worker_pack[i] for i in indices]
+
+
+class PackLoader:
+    """Iterasi batch dari pack dengan urutan acak per epoch dan prefetch di proses worker.
+
+    Decode JPEG berjalan paralel di `workers` proses; hasil diambil sesuai
+    urutan kirim sehingga tetap deterministik untuk `seed` yang sama. Tugas yang
+    belum diambil dibatasi (LOADER_PREFETCH per worker), jadi gambar hasil decode
+    tidak menumpuk di memori saat training lebih lambat dari decode. `workers` <= 1
+    membaca langsung di proses ini (tanpa biaya kirim array antar proses).
+    """
+    def __init__(self, pack_dir=PACK_DIR, split="train", batch_size=16, shuffle=True,
+                 seed=0, workers=os.cpu_count() or 2):
+        self.pack_dir = pack_dir
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.workers = workers
+        self.epoch = 0
+        pack = DatasetPack(pack_dir)
+        self.order = pack.indices(split)
+        pack.close()
+
+    def __len__(self):
+        return (len(self.order) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        order = self.order.tolist()
+        if self.shuffle:
+            random.Random(self.seed + self.epoch).shuffle(order)
+        self.epoch += 1
+
+        batch = []
+        for item in self._iter_items(order):
+            batch.append(item)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _iter_items(self, order):
+        if self.workers <= 1:
+            pack = DatasetPack(self.pack_dir)
+            try:
+                for i in order:
+                    yield pack[i]
+            finally:
+                pack.close()
+            return
+        chunks = (order[i:i + LOADER_CHUNK] for i in range(0, len(order), LOADER_CHUNK))
+        window = self.workers * LOADER_PREFETCH
+        with Pool(self.workers, initializer=_init_loader, initargs=(self.pack_dir,)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_load_items, (chunk,)))
+                if len(pending) >= window:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+
+
+# ---------------------------------------------------
+# ---------------------- Penulis --------------------
+# ---------------------------------------------------
+def iter_dataset(dataset_dir):
+    """Yield (split, nama, path gambar, path label) dari struktur images/<split>, labels/<split>."""
+    for split in SPLITS:
+        image_dir = os.path.join(dataset_dir, "images", split)
+        if not os.path.isdir(image_dir):
+            continue
+        for name in sorted(os.listdir(image_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                label = os.path.join(dataset_dir, "labels", split, os.path.splitext(name)[0] + ".txt")
+                yield split, name, os.path.join(image_dir, name), label
+
+
+def resolve_latest(names, records):
+    """Posisi record terakhir per nama (urutan pertama kali muncul), tanpa item yang dihapus."""
+    latest = {}
+    for position, name in enumerate(names):
+        latest[name] = position
+    return np.array([i for i in latest.values() if not records[i]["deleted"]], dtype=np.int64)
+
+
+def file_stat(path):
+    """(ukuran, mtime ns) file, atau (0, 0) jika tidak ada."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 0, 0
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_classes(dataset_dir):
+    path = os.path.join(dataset_dir, "classes.txt")
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def build_pack(dataset_dir, pack_dir, shard_size_mb=SHARD_SIZE_MB):
+    """Tambahkan item baru/berubah dari dataset ke pack. Kembalikan (ditambah, tidak berubah, dihapus)."""
+    os.makedirs(pack_dir, exist_ok=True)
+    meta_path = os.path.join(pack_dir, "pack.json")
+    names_path = os.path.join(pack_dir, "names.txt")
+    index_path = os.path.join(pack_dir, "index.bin")
+
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            if json.load(f).get("version") != PACK_VERSION:
+                # Format index lama: mulai ulang dari shard pertama
+                for name in os.listdir(pack_dir):
+                    if name == "index.bin" or name == "names.txt" or name.startswith("shard-"):
+                        os.remove(os.path.join(pack_dir, name))
+
+    existing = []
+    if os.path.exists(names_path):
+        with open(names_path, "r", encoding="utf-8") as f:
+            existing = [line.rstrip("\n") for line in f]
+    # Index adalah sumber kebenaran: buang nama/byte sisa run yang terhenti
+    count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+    count = min(count, len(existing))
+    existing = existing[:count]
+    with open(index_path, "ab") as f:
+        f.truncate(count * INDEX_DTYPE.itemsize)
+    with open(names_path, "w", encoding="utf-8") as f:
+        f.write("".join(name + "\n" for name in existing))
+
+    shard, offset = 0, 0
+    known = {}  # nama -> record berlaku
+    if count:
+        records = np.array(np.memmap(index_path, dtype=INDEX_DTYPE, mode="r", shape=(count,)))
+        # Record penghapus tidak menunjuk data; posisi tulis dari record data terakhir
+        data = np.flatnonzero(records["deleted"] == 0)
+        if len(data):
+            last = records[data[-1]]
+            shard = int(last["shard"])
+            offset = int(last["offset"]) + int(last["image_size"]) + int(last["label_size"])
+        known = {existing[i]: records[i] for i in resolve_latest(existing, records)}
+    shard_limit = shard_size_mb * 1024 * 1024
+
+    def append_record(index_file, names_file, key, record):
+        # Data shard di-flush dulu baru index, supaya index tidak menunjuk byte yang belum ada
+        shard_file.flush()
+        index_file.write(np.array([record], dtype=INDEX_DTYPE).tobytes())
+        names_file.write(key + "\n")
+
+    added = unchanged = removed = 0
+    seen = set()
+    shard_file = open(os.path.join(pack_dir, f"shard-{shard:05d}.bin"), "ab")
+    shard_file.truncate(offset)
+    try:
+        with open(index_path, "ab") as index_file, open(names_path, "a", encoding="utf-8") as names_file:
+            for split, name, image_path, label_path in iter_dataset(dataset_dir):
+                key = f"{split}/{name}"
+                seen.add(key)
+                image_size, image_mtime = file_stat(image_path)
+                label_size, label_mtime = file_stat(label_path)
+                current = known.get(key)
+                if current is not None and (
+                    int(current["image_size"]), int(current["image_mtime"]),
+                    int(current["label_size"]), int(current["label_mtime"]),
+                ) == (image_size, image_mtime, label_size, label_mtime):
+                    unchanged += 1
+                    continue
+                with open(image_path, "rb") as f:
+                    image_bytes = f.read()
+                label_bytes = b""
+                if os.path.exists(label_path):
+                    with open(label_path, "rb") as f:
+                        label_bytes = f.read()
+
+                if offset and offset + len(image_bytes) + len(label_bytes) > shard_limit:
+                    shard_file.close()
+                    shard, offset = shard + 1, 0
+                    shard_file = open(os.path.join(pack_dir, f"shard-{shard:05d}.bin"), "wb")
+
+                shard_file.write(image_bytes)
+                shard_file.write(label_bytes)
+                # mtime diambil sebelum dibaca: jika file berubah saat dibaca, run berikutnya mengulang
+                record = (shard, offset, len(image_bytes), len(label_bytes), SPLITS.index(split), 0,
+                          image_mtime, label_mtime)
+                offset += len(image_bytes) + len(label_bytes)
+                append_record(index_file, names_file, key, record)
+                known[key] = np.array(record, dtype=INDEX_DTYPE)
+                added += 1
+
+            # Gambar yang sudah tidak ada di dataset: tambahkan record penghapus
+            for key in [key for key in known if key not in seen]:
+                split = SPLITS.index(key.split("/", 1)[0])
+                append_record(index_file, names_file, key, (0, 0, 0, 0, split, 1, 0, 0))
+                del known[key]
+                removed += 1
+    finally:
+        shard_file.close()
+
+    meta = {
+        "version": PACK_VERSION,
+        "classes": load_classes(dataset_dir),
+        "shard_size_mb": shard_size_mb,
+        "shards": shard + 1,
+        "items": len(known),
+    }
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, meta_path)
+    return added, unchanged, removed
+
+
+def run_bench(args):
+    """Bandingkan throughput loader pack dengan membaca file satu per satu."""
+    loader = PackLoader(args.out, split=args.split, batch_size=args.batch_size, workers=args.workers)
+    start = time.perf_counter()
+    images = sum(len(batch) for batch in loader)
+    elapsed = time.perf_counter() - start
+    print(f"Pack: {images} gambar dalam {elapsed:.2f} s ({images / elapsed if elapsed else 0:.0f} img/s, "
+          f"{args.workers} worker)")
+
+    if args.dataset and os.path.isdir(args.dataset):
+        start = time.perf_counter()
+        files = 0
+        for split, _, image_path, label_path in iter_dataset(args.dataset):
+            if split != args.split:
+                continue
+            cv2.imread(image_path)
+            if os.path.exists(label_path):
+                with open(label_path, "rb") as f:
+                    parse_labels(f.read())
+            files += 1
+        elapsed = time.perf_counter() - start
+        print(f"File: {files} gambar dalam {elapsed:.2f} s ({files / elapsed if elapsed else 0:.0f} img/s, 1 proses)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OutReady - pack dataset YOLO ke shard memory-mapped")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Folder dataset YOLO (hasil prepare_dataset)")
+    parser.add_argument("--out", default=PACK_DIR, help="Folder pack")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE_MB, help="Ukuran maksimum shard (MB)")
+    parser.add_argument("--bench", action="store_true", help="Ukur kecepatan baca pack lewat PackLoader")
+    parser.add_argument("--split", choices=SPLITS, default="train", help="Split untuk --bench")
+    parser.add_argument("--batch-size", type=int, default=16, help="Ukuran batch untuk --bench")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Jumlah proses loader")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        return run_bench(args)
+
+    if not os.path.isdir(args.dataset):
+        print(f"[ERROR] Dataset tidak ditemukan: {args.dataset}", file=sys.stderr)
+        return 1
+    added, unchanged, removed = build_pack(args.dataset, args.out, args.shard_size)
+    pack = DatasetPack(args.out)
+    print(f"{added} item ditambahkan/diperbarui, {removed} dihapus ({unchanged} tidak berubah) | "
+          f"total {len(pack)} item | "
+          f"{pack.meta['shards']} shard di {args.out}")
+    pack.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
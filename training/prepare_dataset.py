@@ -0,0 +1,358 @@
+"""Konversi export Label Studio (JSON) ke dataset YOLO secara streaming dan incremental.
+
+- Export dibaca per task (tidak dimuat utuh ke memori), jadi aman untuk file besar.
+- Box rectanglelabels (persen) dikonversi ke format YOLO (cx cy w h ternormalisasi).
+- Gambar di-resize/di-copy di process pool; jika tidak perlu di-resize, dipakai
+  hard link (fallback copy jika beda drive).
+- Manifest menyimpan hash konten gambar + hash anotasi per task, sehingga run
+  berikutnya hanya memproses task yang baru atau berubah.
+- Item dikunci dengan path relatif terhadap folder gambar; file bernama sama di
+  subfolder berbeda diberi akhiran hash path di nama output agar tidak bertabrakan.
+
+Contoh:
+    python -m training.prepare_dataset --export dataset/labeled/export.json --img-size 640
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import threading
+from urllib.parse import unquote
+from multiprocessing import Pool
+
+import cv2
+
+# ---------------------------------------------------
+# --------------- Konfigurasi Awal ------------------
+# ---------------------------------------------------
+EXPORT_FILE = "dataset/labeled/export.json"
+IMAGE_DIR = "dataset/raw"
+OUTPUT_DIR = "dataset/yolo"
+MANIFEST_FILE = "manifest.json"
+CLASSES_FILE = "classes.txt"
+LOCAL_FILES_PREFIX = "/data/local-files/?d="
+VAL_RATIO = 0.2
+MANIFEST_SAVE_EVERY = 100
+
+
+# ---------------------------------------------------
+# ------------- Pembacaan Export Streaming ----------
+# ---------------------------------------------------
+def iter_json_array(path, chunk_size=1 << 20):
+    """Yield elemen array JSON satu per satu tanpa memuat seluruh file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, started = "", 0, False
+        while True:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            while True:
+                while pos < len(buf) and (buf[pos].isspace() or (started and buf[pos] == ",")):
+                    pos += 1
+                if pos >= len(buf):
+                    break
+                if not started:
+                    if buf[pos] != "[":
+                        raise ValueError(f"{path} bukan array JSON (format export Label Studio 'JSON')")
+                    started = True
+                    pos += 1
+                    continue
+                if buf[pos] == "]":
+                    return
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    break  # elemen terpotong, baca chunk berikutnya
+                yield obj
+                pos = end
+            if eof:
+                if started:
+                    raise ValueError(f"{path} terpotong: array tidak ditutup")
+                return
+
+
+def resolve_image_path(url, image_dir):
+    """Petakan URL gambar Label Studio ke file lokal."""
+    url = unquote(url)
+    if url.startswith(LOCAL_FILES_PREFIX):
+        return url[len(LOCAL_FILES_PREFIX):]
+    name = os.path.basename(url.split("?")[0])
+    candidate = os.path.join(image_dir, name)
+    if os.path.exists(candidate):
+        return candidate
+    # File upload Label Studio diberi prefix acak: "<hash>-nama.jpg"
+    if "-" in name:
+        candidate = os.path.join(image_dir, name.split("-", 1)[1])
+    return candidate
+
+
+def select_annotation(task):
+    """Anotasi terbaru yang tidak dibatalkan."""
+    annotations = [a for a in task.get("annotations", []) if not a.get("was_cancelled")]
+    if not annotations:
+        return None
+    return max(annotations, key=lambda a: a.get("updated_at") or a.get("created_at") or "")
+
+
+def to_yolo_boxes(annotation):
+    """Kembalikan daftar (label, cx, cy, w, h) dari hasil rectanglelabels."""
+    boxes = []
+    for result in annotation.get("result", []):
+        if result.get("type") != "rectanglelabels":
+            continue
+        value = result["value"]
+        if value.get("rotation"):
+            print(f"[WARN] Box berotasi diabaikan rotasinya (id {result.get('id')})", file=sys.stderr)
+        x, y, w, h = (value[k] / 100.0 for k in ("x", "y", "width", "height"))
+        for label in value.get("rectanglelabels", []):
+            boxes.append((label, x + w / 2, y + h / 2, w, h))
+    return boxes
+
+
+# ---------------------------------------------------
+# -------------------- Manifest ---------------------
+# ---------------------------------------------------
+def load_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(data, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+
+def content_hash(path, hash_cache):
+    """SHA1 isi file; dihitung ulang hanya jika ukuran/mtime berubah."""
+    stat = os.stat(path)
+    key = f"{stat.st_size}:{stat.st_mtime_ns}"
+    cached = hash_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    hash_cache[path] = [key, digest.hexdigest()]
+    return hash_cache[path][1]
+
+
+def load_classes(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def item_key(src, image_dir):
+    """Kunci item: path relatif terhadap folder gambar (path absolut jika di luar folder)."""
+    try:
+        rel = os.path.relpath(src, image_dir)
+    except ValueError:  # beda drive di Windows
+        rel = os.path.abspath(src)
+    if rel.startswith(".."):
+        rel = os.path.abspath(src)
+    return rel.replace(os.sep, "/")
+
+
+def output_name(key):
+    """Nama file output; gambar di luar root folder diberi akhiran hash path."""
+    name = os.path.basename(key)
+    if "/" not in key:
+        return name
+    stem, ext = os.path.splitext(name)
+    return f"{stem}_{hashlib.sha1(key.encode()).hexdigest()[:8]}{ext}"
+
+
+def split_for(name, val_ratio):
+    """Split train/val deterministik berdasarkan nama file."""
+    bucket = int(hashlib.md5(name.encode()).hexdigest()[:8], 16) % 1000
+    return "val" if bucket < val_ratio * 1000 else "train"
+
+
+# ---------------------------------------------------
+# ---------------- Worker (Process Pool) ------------
+# ---------------------------------------------------
+def _init_worker():
+    cv2.setNumThreads(1)
+
+
+def export_item(job):
+    """Tulis label YOLO dan gambar (resize atau hard link). Dijalankan di proses worker."""
+    key, src, dst_image, dst_label, lines, img_size = job
+    try:
+        os.makedirs(os.path.dirname(dst_label), exist_ok=True)
+        with open(dst_label, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+
+        os.makedirs(os.path.dirname(dst_image), exist_ok=True)
+        if os.path.exists(dst_image):
+            os.remove(dst_image)
+
+        image = None
+        if img_size:
+            image = cv2.imread(src)
+            if image is None:
+                raise ValueError(f"Gambar tidak bisa dibaca: {src}")
+        if image is not None and max(image.shape[:2]) > img_size:
+            scale = img_size / max(image.shape[:2])
+            size = (round(image.shape[1] * scale), round(image.shape[0] * scale))
+            cv2.imwrite(dst_image, cv2.resize(image, size, interpolation=cv2.INTER_AREA))
+            mode = "resize"
+        else:
+            # Tidak ada perubahan: hard link (tanpa salin data), fallback copy
+            try:
+                os.link(src, dst_image)
+                mode = "link"
+            except OSError:
+                shutil.copy2(src, dst_image)
+                mode = "copy"
+        return key, True, mode
+    except Exception as e:
+        return key, False, str(e)
+
+
+# ---------------------------------------------------
+# ----------------------- Main ----------------------
+# ---------------------------------------------------
+def iter_jobs(args, manifest, classes, stats, seen, lock):
+    """Stream task dari export, yield job hanya untuk task baru/berubah.
+
+    Generator ini dikonsumsi thread feeder milik Pool, jadi perubahan manifest
+    dilakukan di bawah `lock`.
+    """
+    class_index = {name: i for i, name in enumerate(classes)}
+    hash_cache = manifest.setdefault("hash_cache", {})
+    items = manifest.setdefault("items", {})
+
+    for task in iter_json_array(args.export):
+        stats["tasks"] += 1
+        annotation = select_annotation(task)
+        image_url = task.get("data", {}).get(args.image_key)
+        if annotation is None or not image_url:
+            stats["unlabeled"] += 1
+            continue
+
+        src = resolve_image_path(image_url, args.images)
+        if not os.path.exists(src):
+            print(f"[WARN] Gambar tidak ditemukan: {src}", file=sys.stderr)
+            stats["missing"] += 1
+            continue
+
+        lines = []
+        for label, cx, cy, w, h in to_yolo_boxes(annotation):
+            if label not in class_index:
+                # Kelas baru ditambahkan di akhir agar indeks lama tetap stabil
+                class_index[label] = len(classes)
+                classes.append(label)
+            lines.append(f"{class_index[label]} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}")
+
+        name = item_key(src, args.images)
+        out_name = output_name(name)
+        split = split_for(name, args.val_ratio)
+        dst_image = os.path.join(args.out, "images", split, out_name)
+        dst_label = os.path.join(args.out, "labels", split, os.path.splitext(out_name)[0] + ".txt")
+        seen.add(name)
+
+        with lock:
+            signature = hashlib.sha1(
+                (content_hash(src, hash_cache) + "\n".join(lines) + str(args.img_size)).encode()
+            ).hexdigest()
+            previous = items.get(name)
+        if (previous and previous["signature"] == signature
+                and os.path.exists(dst_image) and os.path.exists(dst_label)):
+            stats["unchanged"] += 1
+            continue
+
+        # Hapus output lama jika split/lokasi berubah
+        if previous:
+            for old in (previous["image"], previous["label"]):
+                if old not in (dst_image, dst_label) and os.path.exists(old):
+                    os.remove(old)
+        with lock:
+            items[name] = {"signature": None, "image": dst_image, "label": dst_label, "pending": signature}
+        yield name, src, dst_image, dst_label, lines, args.img_size
+
+
+def write_dataset_yaml(out_dir, classes):
+    """dataset.yaml untuk Ultralytics YOLO."""
+    with open(os.path.join(out_dir, "dataset.yaml"), "w", encoding="utf-8") as f:
+        f.write(f"path: {os.path.abspath(out_dir)}\n")
+        f.write("train: images/train\nval: images/val\n")
+        f.write("names:\n")
+        for i, name in enumerate(classes):
+            f.write(f"  {i}: {name}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OutReady - Label Studio -> dataset YOLO (incremental)")
+    parser.add_argument("--export", default=EXPORT_FILE, help="File export Label Studio (format JSON)")
+    parser.add_argument("--images", default=IMAGE_DIR, help="Folder gambar sumber")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="Folder dataset YOLO")
+    parser.add_argument("--img-size", type=int, default=None, help="Perkecil sisi terpanjang ke ukuran ini")
+    parser.add_argument("--val-ratio", type=float, default=VAL_RATIO, help="Porsi data validasi")
+    parser.add_argument("--image-key", default="image", help="Key data gambar di task Label Studio")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Jumlah proses")
+    parser.add_argument("--prune", action="store_true", help="Hapus output untuk task yang sudah tidak ada")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, MANIFEST_FILE)
+    classes_path = os.path.join(args.out, CLASSES_FILE)
+    manifest = load_json(manifest_path, {})
+    classes = load_classes(classes_path)
+    stats = {"tasks": 0, "unlabeled": 0, "missing": 0, "unchanged": 0, "written": 0, "failed": 0}
+    modes = {}
+    seen = set()
+
+    items = manifest.setdefault("items", {})
+    lock = threading.Lock()
+    with Pool(args.workers, initializer=_init_worker) as pool:
+        jobs = iter_jobs(args, manifest, classes, stats, seen, lock)
+        for done, (name, ok, info) in enumerate(pool.imap_unordered(export_item, jobs, chunksize=8), 1):
+            with lock:
+                item = items[name]
+                pending = item.pop("pending", None)
+                if ok:
+                    item["signature"] = pending
+                    stats["written"] += 1
+                    modes[info] = modes.get(info, 0) + 1
+                else:
+                    print(f"[WARN] Gagal memproses {name}: {info}", file=sys.stderr)
+                    stats["failed"] += 1
+                if done % MANIFEST_SAVE_EVERY == 0:
+                    save_json(manifest, manifest_path)
+
+    if args.prune:
+        for name in [n for n in items if n not in seen]:
+            for path in (items[name]["image"], items[name]["label"]):
+                if os.path.exists(path):
+                    os.remove(path)
+            del items[name]
+
+    save_json(manifest, manifest_path)
+    with open(classes_path, "w", encoding="utf-8") as f:
+        f.write("".join(name + "\n" for name in classes))
+    write_dataset_yaml(args.out, classes)
+
+    print(
+        f"{stats['tasks']} task | ditulis {stats['written']} {modes or ''} | tidak berubah {stats['unchanged']} | "
+        f"tanpa anotasi {stats['unlabeled']} | gambar hilang {stats['missing']} | gagal {stats['failed']}"
+    )
+    print(f"Kelas: {classes}")
+    return 0 if not stats["failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())